@@ -0,0 +1,63 @@
+"""Startup benchmark: import cost and cold vs. warm card database loads.
+
+Each measurement runs in a fresh interpreter so module and registry caches
+start empty, exactly like a new worker process or CLI invocation.
+
+Usage:
+    python -m benchmarks.startup [--repeat N]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+IMPORT_ONLY = "import src.deck_factory"
+FIRST_LOOKUP = "import src.deck_factory as f; f.get_pokemon_by_name('Pikachu')"
+# The pre-registry behaviour: parse the JSON at import time
+JSON_PARSE = "import json; json.load(open('resources/CardList.json', encoding='utf-8'))"
+
+TIMER = """
+import time
+_start = time.perf_counter()
+{code}
+print((time.perf_counter() - _start) * 1000)
+"""
+
+
+def _time_snippet(code: str, cache_dir: str) -> float:
+    env = dict(os.environ, TCG_SIM_CACHE_DIR=cache_dir)
+    out = subprocess.run([sys.executable, '-c', TIMER.format(code=code)], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def run(repeat: int = 5) -> dict:
+    """Measure median milliseconds for each startup scenario."""
+    results = {'json_parse': [], 'import_only': [], 'cold_load': [], 'warm_load': []}
+    for _ in range(repeat):
+        cache_dir = tempfile.mkdtemp(prefix='tcg-cache-')
+        try:
+            results['json_parse'].append(_time_snippet(JSON_PARSE, cache_dir))
+            results['import_only'].append(_time_snippet(IMPORT_ONLY, cache_dir))
+            results['cold_load'].append(_time_snippet(FIRST_LOOKUP, cache_dir))
+            results['warm_load'].append(_time_snippet(FIRST_LOOKUP, cache_dir))
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    return {name: statistics.median(times) for name, times in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    for name, ms in run(args.repeat).items():
+        print(f"{name:<12} {ms:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""Hot-path benchmark suite with JSON baselines.
+
+Measures each hot path on its own and the engine as a whole:
+
+    games           full headless GreedyAgent games per second
+    replay_games    the same games per second, each logged to a replay shard
+    replay_cost     time of a logged game as a % of an unlogged one (100 = free)
+    legal_actions   legal-move generations per second, on mid-game states
+    can_attack      ActivePokemon.can_perform_attack calls per second
+    compact_clone   CompactState.clone calls per second
+    apply_undo      apply_action + GameState.undo pairs per second
+    db_cold_load    card database load without a snapshot, ms (fresh interpreter)
+    db_warm_load    card database load from the marshal snapshot, ms (fresh interpreter)
+    render          BoardView.render frames per second (into a buffer)
+    refresh         BoardView.refresh frames per second, cycling through unrelated
+                    positions so most lines change every frame
+
+Every throughput is the best of --repeat runs, which is the least noisy
+estimate on a busy machine. --save writes the results as a JSON baseline;
+--compare checks a run against one and exits with status 1 if any metric
+got worse by more than --threshold.
+
+Usage:
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --compare baseline.json --threshold 0.1
+    python -m benchmarks.suite --only games legal_actions --quick
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from benchmarks import startup
+from src.actions import apply_action, legal_actions
+from src.board_view import BoardView
+from src.compact_state import CompactState
+from src.deck_factory import create_real_test_deck
+from src.game import Game
+from src.replay import ReplayWriter
+from src.simulator import simulate
+
+SEED = 1234
+
+
+class Result(NamedTuple):
+    value: float
+    unit: str
+    higher_is_better: bool = True
+
+
+def _best_rate(batch: Callable[[], int], repeat: int) -> float:
+    """Best operations per second over repeat runs of batch (which returns its operation count)."""
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ops = batch()
+        best = max(best, ops / (time.perf_counter() - start))
+    return best
+
+
+def _midgame(count: int, turns: int = 6) -> List[Game]:
+    """Games stopped at the start of a main phase after a few turns, for per-state benchmarks."""
+    deck = create_real_test_deck()
+    games = []
+    seed = SEED
+    while len(games) < count:
+        game = Game("Player 1", deck.copy(), "Player 2", deck.copy(), headless=True, seed=seed)
+        seed += 1
+        game.setup_game()
+        for _ in range(turns):
+            game._start_turn_phase()
+            if game.check_win():
+                break
+            game._handle_main_phase()
+            if game.check_win():
+                break
+            game._end_turn_phase()
+        else:
+            game._start_turn_phase()
+            if not game.check_win():
+                games.append(game)
+    return games
+
+
+def bench_games(repeat: int, scale: int) -> Result:
+    deck = create_real_test_deck()
+    games = 20 * scale
+    return Result(_best_rate(lambda: simulate(deck, deck, games, seed=SEED).games, repeat), "games/s")
+
+
+_replay_rates: Dict[str, float] = {}
+
+
+def _replay_runs(repeat: int, scale: int) -> Dict[str, float]:
+    # Logged and unlogged runs alternate, so a busy machine slows both alike
+    if not _replay_rates:
+        deck = create_real_test_deck()
+        games = 20 * scale
+        plain = logged = 0.0
+        with tempfile.TemporaryDirectory() as directory:
+            for index in range(repeat):
+                plain = max(plain, _best_rate(lambda: simulate(deck, deck, games, seed=SEED).games, 1))
+                with ReplayWriter(os.path.join(directory, f'{index}.bin')) as writer:
+                    logged = max(logged, _best_rate(
+                        lambda: simulate(deck, deck, games, seed=SEED, replay=writer).games, 1))
+        _replay_rates.update(plain=plain, logged=logged)
+    return _replay_rates
+
+
+def bench_replay_games(repeat: int, scale: int) -> Result:
+    return Result(_replay_runs(repeat, scale)['logged'], "games/s")
+
+
+def bench_replay_cost(repeat: int, scale: int) -> Result:
+    rates = _replay_runs(repeat, scale)
+    return Result(100 * rates['plain'] / rates['logged'], "%", higher_is_better=False)
+
+
+def bench_legal_actions(repeat: int, scale: int) -> Result:
+    states = [(game.state, game.state.current_player_idx) for game in _midgame(20)]
+
+    def batch():
+        for _ in range(25 * scale):
+            for state, player in states:
+                legal_actions(state, player)
+        return 25 * scale * len(states)
+    return Result(_best_rate(batch, repeat), "ops/s")
+
+
+def bench_can_attack(repeat: int, scale: int) -> Result:
+    pairs = [(pokemon, attack) for game in _midgame(20) for player in (0, 1)
+             for _, pokemon in game.state.board_slots(player) for attack in pokemon.card.attacks]
+
+    def batch():
+        for _ in range(50 * scale):
+            for pokemon, attack in pairs:
+                pokemon.can_perform_attack(attack)
+        return 50 * scale * len(pairs)
+    return Result(_best_rate(batch, repeat), "calls/s")
+
+
+def bench_compact_clone(repeat: int, scale: int) -> Result:
+    states = [CompactState.from_game_state(game.state) for game in _midgame(20)]
+
+    def batch():
+        for _ in range(50 * scale):
+            for state in states:
+                state.clone()
+        return 50 * scale * len(states)
+    return Result(_best_rate(batch, repeat), "clones/s")
+
+
+def bench_apply_undo(repeat: int, scale: int) -> Result:
+    cases = []
+    for game in _midgame(20):
+        state = game.state
+        state.start_recording()
+        cases.append((state, legal_actions(state, state.current_player_idx)))
+
+    def batch():
+        ops = 0
+        for _ in range(10 * scale):
+            for state, actions in cases:
+                for action in actions:
+                    apply_action(state, action)
+                    state.undo()
+                ops += len(actions)
+        return ops
+    return Result(_best_rate(batch, repeat), "pairs/s")
+
+
+_startup_times: Dict[str, float] = {}
+
+
+def _db_loads(repeat: int) -> Dict[str, float]:
+    # Both load benchmarks come from one startup run; it spawns fresh interpreters, so keep it to one
+    if not _startup_times:
+        _startup_times.update(startup.run(repeat))
+    return _startup_times
+
+
+def bench_db_cold_load(repeat: int, scale: int) -> Result:
+    return Result(_db_loads(repeat)['cold_load'], "ms", higher_is_better=False)
+
+
+def bench_db_warm_load(repeat: int, scale: int) -> Result:
+    return Result(_db_loads(repeat)['warm_load'], "ms", higher_is_better=False)
+
+
+def bench_render(repeat: int, scale: int) -> Result:
+    states = [game.state for game in _midgame(5)]
+    view = BoardView(stream=io.StringIO())
+
+    def batch():
+        for _ in range(2 * scale):
+            for state in states:
+                view.render(state)
+        return 2 * scale * len(states)
+    return Result(_best_rate(batch, repeat), "frames/s")
+
+
+def bench_refresh(repeat: int, scale: int) -> Result:
+    states = [game.state for game in _midgame(5)]
+    view = BoardView(stream=io.StringIO())
+
+    def batch():
+        for _ in range(2 * scale):
+            for state in states:
+                view.refresh(state)
+        return 2 * scale * len(states)
+    return Result(_best_rate(batch, repeat), "frames/s")
+
+
+BENCHMARKS: Dict[str, Callable[[int, int], Result]] = {
+    'games': bench_games,
+    'replay_games': bench_replay_games,
+    'replay_cost': bench_replay_cost,
+    'legal_actions': bench_legal_actions,
+    'can_attack': bench_can_attack,
+    'compact_clone': bench_compact_clone,
+    'apply_undo': bench_apply_undo,
+    'db_cold_load': bench_db_cold_load,
+    'db_warm_load': bench_db_warm_load,
+    'render': bench_render,
+    'refresh': bench_refresh,
+}
+
+
+def run(names: Optional[List[str]] = None, repeat: int = 5, scale: int = 5) -> Dict[str, Result]:
+    """Run the named benchmarks (all by default); scale multiplies the work per run."""
+    return {name: BENCHMARKS[name](repeat, scale) for name in (names or BENCHMARKS)}
+
+
+def to_json(results: Dict[str, Result]) -> dict:
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': {name: result._asdict() for name, result in results.items()},
+    }
+
+
+def compare(results: Dict[str, Result], baseline: dict, threshold: float) -> List[str]:
+    """Names of the metrics that are worse than the baseline by more than threshold (a fraction)."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline['results'].get(name)
+        if base is None or not base['value']:
+            continue
+        change = result.value / base['value'] - 1
+        if (-change if result.higher_is_better else change) > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=None, help="benchmarks to run")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per benchmark (the best one counts)")
+    parser.add_argument('--quick', action='store_true', help="a fifth of the work per run, for smoke tests")
+    parser.add_argument('--save', default=None, metavar='JSON', help="write the results as a baseline")
+    parser.add_argument('--compare', default=None, metavar='JSON', help="baseline to check for regressions")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="fraction a metric may get worse before it counts as a regression")
+    args = parser.parse_args()
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    results = run(args.only, args.repeat, 1 if args.quick else 5)
+    for name, result in results.items():
+        line = f"{name:<14} {result.value:>14,.1f} {result.unit:<9}"
+        base = baseline['results'].get(name) if baseline else None
+        if base and base['value']:
+            line += f" {result.value / base['value'] - 1:>+8.1%} vs {base['value']:,.1f}"
+        print(line)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(to_json(results), f, indent=2)
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
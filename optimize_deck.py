@@ -0,0 +1,38 @@
+"""Search for a deck that beats a gauntlet of fixed decks.
+
+    python optimize_deck.py --generations 20 --population 32 --games 60
+    python optimize_deck.py --workers 8 --seed 1 --store results.db
+"""
+import argparse
+
+from src.deck_factory import create_real_test_deck
+from src.deck_optimizer import DeckOptimizer
+from src.result_store import ResultStore
+from src.tournament import DeckEntry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evolve a Pokémon TCG Pocket deck with a genetic search.")
+    parser.add_argument('--generations', type=int, default=10, help="generations to evolve")
+    parser.add_argument('--population', type=int, default=24, help="decks per generation")
+    parser.add_argument('--elite', type=int, default=2, help="best decks carried over unchanged")
+    parser.add_argument('--games', type=int, default=40, help="games per candidate against each gauntlet deck")
+    parser.add_argument('--workers', type=int, default=None, help="simulation processes (0 = in-process)")
+    parser.add_argument('--max-turns', type=int, default=None, help="turn cap per game (draw when reached)")
+    parser.add_argument('--seed', type=int, default=None, help="seed for the search and its games")
+    parser.add_argument('--store', default=None, help="SQLite file to reuse finished games from (and save them to)")
+    args = parser.parse_args()
+
+    test_deck = create_real_test_deck()
+    store = ResultStore(args.store) if args.store else None
+    optimizer = DeckOptimizer([DeckEntry.from_deck("Test deck", test_deck)], population=args.population,
+                              elite=args.elite, games_per_matchup=args.games, workers=args.workers,
+                              max_turns=args.max_turns, seed=args.seed, store=store)
+    report = optimizer.run(args.generations, initial=[tuple(sorted(spec.uid for spec in test_deck.specs))])
+    if store is not None:
+        store.close()
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Run headless games between two test decks and report games/sec.
+
+    python simulate.py --games 200
+    python simulate.py --games 20000 --workers 8 --chunk-size 100
+    python simulate.py --games 20 --mcts-ms 50
+    python simulate.py --games 100000 --batched
+    python simulate.py --games 20000 --workers 8 --replay-dir replays
+    python simulate.py --games 5000 --workers 8 --sprt 0.05
+    python simulate.py --games 5000 --workers 8 --seed 1 --store results.db
+    python simulate.py --games 2000 --workers 8 --instrument phases.json
+    python simulate.py --games 2000 --workers 8 --profile profile
+    python simulate.py --games 10 --spectate 15 --pace 0.05
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from src import instrument, profiling
+
+from src.agents import GreedyAgent
+from src.batch_sim import simulate_batched
+from src.deck_factory import create_real_test_deck
+from src.match_stats import SPRT
+from src.mcts import MCTSAgent, SearchStats
+from src.replay import ReplayWriter
+from src.result_store import ResultStore
+from src.simulator import simulate
+from src.spectator import Spectator
+from src.tournament import DeckEntry, TournamentRunner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate headless Pokémon TCG Pocket games.")
+    parser.add_argument('--games', type=int, default=100, help="number of games to play")
+    parser.add_argument('--max-turns', type=int, default=None, help="turn cap per game (draw when reached)")
+    parser.add_argument('--seed', type=int, default=None, help="campaign seed (random if not given)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="shard games across this many processes (0 = tournament runner in-process)")
+    parser.add_argument('--chunk-size', type=int, default=50, help="games per task sent to a worker")
+    parser.add_argument('--worker-budget', type=int, default=None,
+                        help="games a worker plays before being replaced by a fresh process")
+    parser.add_argument('--mcts-ms', type=float, default=None,
+                        help="player 1 searches with MCTS for this many milliseconds per move")
+    parser.add_argument('--mcts-nodes', type=int, default=None,
+                        help="player 1 searches with MCTS for this many iterations per move")
+    parser.add_argument('--batched', action='store_true',
+                        help="advance greedy-vs-greedy games in lockstep NumPy batches")
+    parser.add_argument('--batch-size', type=int, default=4096, help="games per lockstep batch")
+    parser.add_argument('--replay-dir', default=None,
+                        help="log every game to binary replay shards in this directory")
+    parser.add_argument('--sprt', type=float, default=None, metavar='MARGIN',
+                        help="stop as soon as a sequential test settles which deck is better by this margin "
+                             "(--games becomes the cap; uses the tournament runner)")
+    parser.add_argument('--store', default=None,
+                        help="SQLite file of finished games to reuse (and add to); uses the tournament runner")
+    parser.add_argument('--instrument', nargs='?', const='', default=None, metavar='JSON',
+                        help="time every engine phase and action (across workers) and print a table; "
+                             "also write the counters to JSON if a file is given")
+    parser.add_argument('--profile', default=None, metavar='DIR',
+                        help="profile the games (across workers) into DIR: stacks.folded for flamegraphs "
+                             "and hot.txt ranking the src/ functions")
+    parser.add_argument('--profile-calls', action='store_true',
+                        help="with --profile, also run cProfile (exact call counts; writes profile.pstats)")
+    parser.add_argument('--spectate', nargs='?', type=float, const=10.0, default=None, metavar='FPS',
+                        help="draw the games live at up to FPS frames a second (default 10); "
+                             "keys: p pause, f fast-forward, q stop watching")
+    parser.add_argument('--pace', type=float, default=0.0,
+                        help="with --spectate, seconds to wait after every game step (0: full speed)")
+    args = parser.parse_args()
+    if args.batched and (args.replay_dir or args.sprt or args.store or args.instrument is not None or args.profile):
+        parser.error("--replay-dir, --sprt, --store, --instrument and --profile are not supported with --batched")
+    if args.spectate is not None and (args.batched or args.workers is not None or args.sprt or args.store):
+        parser.error("--spectate runs in-process; it can't be combined with --batched, --workers, --sprt or --store")
+    mcts = args.mcts_ms is not None or args.mcts_nodes is not None
+    in_process = mcts or (args.workers is None and args.sprt is None and args.store is None)
+    replay = ReplayWriter.for_shard(args.replay_dir) if args.replay_dir and in_process else None
+    counters = instrument.enable() if args.instrument is not None and in_process else None
+    instrument_dir = tempfile.mkdtemp() if args.instrument is not None and not in_process else None
+    profiler = None
+    profile_parts = None
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+        # Per-process files go to a fresh directory, so earlier runs into DIR aren't merged in
+        profile_parts = tempfile.mkdtemp(prefix='parts-', dir=args.profile)
+        if in_process:
+            profiler = profiling.Profiler(calls=args.profile_calls)
+            profiler.start()
+
+    deck1 = create_real_test_deck()
+    deck2 = create_real_test_deck()
+    spectator = Spectator(args.spectate, pace=args.pace).start() if args.spectate is not None else None
+    if mcts:
+        searchers = []
+
+        def agent_factory():
+            time_budget = args.mcts_ms / 1000 if args.mcts_ms is not None else None
+            searchers.append(MCTSAgent(time_budget=time_budget, node_budget=args.mcts_nodes))
+            return [searchers[-1], GreedyAgent()]
+
+        report = simulate(deck1, deck2, args.games, agent_factory=agent_factory,
+                          max_turns=args.max_turns, seed=args.seed, replay=replay, spectator=spectator)
+        if spectator is not None:
+            spectator.stop()
+        if replay is not None:
+            replay.close()
+        print(report.summary())
+        print("MCTS:", SearchStats.combine(agent.stats for agent in searchers).summary())
+    elif args.batched:
+        report = simulate_batched(deck1, deck2, args.games, batch_size=args.batch_size,
+                                  max_turns=args.max_turns, seed=args.seed)
+    elif in_process:
+        report = simulate(deck1, deck2, args.games, max_turns=args.max_turns, seed=args.seed, replay=replay,
+                          spectator=spectator)
+        if spectator is not None:
+            spectator.stop()
+        if replay is not None:
+            replay.close()
+    else:
+        runner = TournamentRunner([DeckEntry.from_deck("Deck 1", deck1), DeckEntry.from_deck("Deck 2", deck2)],
+                                  workers=args.workers, chunk_size=args.chunk_size,
+                                  worker_game_budget=args.worker_budget, max_turns=args.max_turns,
+                                  campaign_seed=args.seed, replay_dir=args.replay_dir,
+                                  store=ResultStore(args.store) if args.store else None,
+                                  instrument_dir=instrument_dir, profile_dir=profile_parts,
+                                  profile_calls=args.profile_calls)
+        report = runner.run(games_per_pair=args.games, sprt=SPRT(args.sprt) if args.sprt else None)
+        if runner.store is not None:
+            print(f"{runner.simulated} games simulated, {report.games - runner.simulated} reused from {args.store}")
+            runner.store.close()
+    if profiler is not None:
+        profiler.stop()
+        profiler.save(profile_parts)
+    if not mcts:
+        print(report.summary())
+    if args.profile:
+        print(profiling.write_outputs(args.profile, profile_parts))
+        shutil.rmtree(profile_parts)
+        print(f"Flamegraph input: {os.path.join(args.profile, 'stacks.folded')}")
+    if counters is not None:
+        instrument.disable()
+    if instrument_dir is not None:
+        counters = instrument.Counters.load_dir(instrument_dir)
+        shutil.rmtree(instrument_dir)
+    if counters is not None:
+        print(counters.summary())
+        if args.instrument:
+            counters.save(args.instrument)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Legal move generation and application, independent of any UI.
+
+Actions are small tuples whose first item is an int kind:
+
+    (END_TURN,)
+    (PLAY_BASIC, hand_idx)
+    (EVOLVE, hand_idx, slot)
+    (ATTACH_ENERGY, slot)
+    (RETREAT, bench_idx)
+    (ATTACK, attack_idx)
+    (PROMOTE, bench_idx)
+
+Board slots are 0 for the Active spot and 1-3 for the bench. PROMOTE is only
+legal (and then the only legal kind) when a player's Active spot is empty
+and they still have benched Pokemon, i.e. when no faint callback handled
+the promotion; ``to_move`` tells whose decision that is. A player with no
+Pokemon left has lost, and only END_TURN is open to them, so the list of
+legal actions is never empty.
+"""
+from typing import List, Tuple
+
+from .elementTypes import StatusCondition
+from .game_state import GameState
+
+END_TURN, PLAY_BASIC, EVOLVE, ATTACH_ENERGY, RETREAT, ATTACK, PROMOTE = range(7)
+KIND_NAMES = ('end_turn', 'play_basic', 'evolve', 'attach_energy', 'retreat', 'attack', 'promote')
+
+Action = Tuple[int, ...]
+
+_END_TURN = (END_TURN,)
+MAX_BENCH = 3
+
+
+def to_move(state: GameState) -> int:
+    """The player whose decision is next: a player who must promote, else the current player."""
+    current = state.current_player_idx
+    for player in (current, 1 - current):
+        if state.active_pokemon[player] is None and state.benched_pokemon[player]:
+            return player
+    return current
+
+
+def legal_actions(state: GameState, player_idx: int) -> List[Action]:
+    """All main-phase actions open to a player, END_TURN last; never empty.
+
+    Pure: reads the state without changing it. Actions are ordered by kind
+    (plays, evolutions, attachments, retreats, attacks) and then by index.
+    Two states are special: while a promotion is pending (empty Active spot,
+    Pokemon on the bench) only the PROMOTE actions are legal, and with no
+    Pokemon left at all (the game is lost) only END_TURN is.
+    """
+    active = state.active_pokemon[player_idx]
+    bench = state.benched_pokemon[player_idx]
+    if active is None:
+        if not bench:
+            return [_END_TURN]
+        return [(PROMOTE, i) for i in range(len(bench))]
+
+    actions = []
+    turn = state.turn_number
+    hand = state.players[player_idx].hand if state.players else state.hands[player_idx]
+    bench_open = len(bench) < MAX_BENCH
+    # Lower-cased name -> slots that could evolve this turn, built once per call
+    evolvable = {}
+    if active.turn_played < turn and turn > 2:
+        evolvable[active.card.name.lower()] = [0]
+    for i, pokemon in enumerate(bench):
+        if pokemon.turn_played < turn and turn > 2:
+            evolvable.setdefault(pokemon.card.name.lower(), []).append(i + 1)
+
+    for hand_idx, card in enumerate(hand):
+        spec = card.spec
+        if spec.kind != 'pokemon':
+            continue
+        if spec.evolution_type == 'Basic':
+            if bench_open:
+                actions.append((PLAY_BASIC, hand_idx))
+        elif spec.evolves_from and evolvable:
+            for slot in evolvable.get(spec.evolves_from, ()):
+                actions.append((EVOLVE, hand_idx, slot))
+
+    if state.energy_zones[player_idx] is not None:
+        actions.extend((ATTACH_ENERGY, slot) for slot in range(len(bench) + 1))
+
+    if bench and not state.retreated_this_turn[player_idx] and active.can_retreat():
+        actions.extend((RETREAT, i) for i in range(len(bench)))
+
+    attacks = active.card.attacks
+    if attacks:
+        energies = active.attached_energies
+        total = sum(energies.values())
+        status = active.status
+        # Same rule as ActivePokemon.can_perform_attack
+        if status is not StatusCondition.SLEEP and status is not StatusCondition.PARALYSIS:
+            for attack_idx, attack in enumerate(attacks):
+                if attack.is_affordable(energies, total):
+                    actions.append((ATTACK, attack_idx))
+
+    actions.append(_END_TURN)
+    return actions
+
+
+def apply_action(state: GameState, action: Action) -> bool:
+    """Play an action for the current player through GameState's (reversible) operations.
+
+    END_TURN ends the turn and starts the opponent's (GameState.pass_turn).
+
+    Returns:
+        False if the rules rejected the action (nothing changed)
+    """
+    kind = action[0]
+    if kind == PLAY_BASIC:
+        return state.play_from_hand(action[1])
+    if kind == EVOLVE:
+        return state.play_from_hand(action[1], action[2])
+    if kind == ATTACH_ENERGY:
+        target = state.pokemon_in_slot(state.current_player_idx, action[1])
+        return target is not None and state.add_energy(target, action[1])
+    if kind == RETREAT:
+        return state.retreat(action[1])
+    if kind == ATTACK:
+        attacker = state.active_pokemon[state.current_player_idx]
+        if attacker is None or not attacker.can_perform_attack(attacker.card.attacks[action[1]]):
+            return False
+        state.execute_attack(attacker, attacker.card.attacks[action[1]], state.turn_number, action[1])
+        return True
+    if kind == PROMOTE:
+        return state.promote(to_move(state), action[1])
+    state.pass_turn()
+    return True
+
+
+def describe(action: Action) -> str:
+    """Readable form of an action, e.g. 'evolve(2, 0)'."""
+    return f"{KIND_NAMES[action[0]]}({', '.join(str(arg) for arg in action[1:])})"
@@ -3,6 +3,7 @@ from typing import Dict, Set, Optional
 from enum import Enum
 import random
 from .pokemon import Pokemon, ElementType, StatusCondition
+from .card_spec import AttackSpec
 from .trainer import Tool
 
 class ActivePokemon:
@@ -78,8 +79,13 @@ class ActivePokemon:
         """Get total attached energy count."""
         return sum(self.attached_energies.values())
 
-    def apply_status_effects(self) -> int:
-        """Apply status effects at the end of turn. Returns damage dealt."""
+    def apply_status_effects(self, rng: Optional[random.Random] = None) -> int:
+        """Apply status effects at the end of turn. Returns damage dealt.
+
+        Args:
+            rng: Source of coin flips; defaults to the global random module
+        """
+        rng = rng or random
         total_damage = 0
 
         if not hasattr(self,'statcus_conditions'):
@@ -91,15 +97,19 @@ class ActivePokemon:
         if StatusCondition.BURN in self.status_conditions:
             total_damage += 20
             # Burn requires coin flip to remove
-            if random.choice([True, False]):
+            if rng.choice([True, False]):
                 self.remove_status(StatusCondition.BURN)
                 
         return total_damage
 
-    def can_attack(self) -> bool:
-        """Check if Pokemon can attack based on energy and status."""
+    def can_attack(self, rng: Optional[random.Random] = None) -> bool:
+        """Check if Pokemon can attack based on energy and status.
+
+        Args:
+            rng: Source of the wake-up coin flip; defaults to the global random module
+        """
         if StatusCondition.SLEEP in self.status_conditions:
-            if random.choice([True, False]):
+            if (rng or random).choice([True, False]):
                 self.remove_status(StatusCondition.SLEEP)
                 return True
             return False
@@ -147,37 +157,12 @@ class ActivePokemon:
         self.attached_tool = None
         return tool
 
-    def can_perform_attack(self, attack: dict) -> bool:
+    def can_perform_attack(self, attack) -> bool:
         """Check if this Pokémon can perform the given attack (energy + status)."""
         # Check status conditions
-        if self.status is not None:
-            if self.status == StatusCondition.SLEEP:
-                return False
-            if self.status == StatusCondition.PARALYSIS:
-                return False
-        # Check energy requirements
-        attached = self.attached_energies.copy()
-        cost = attack.get('cost', [])
-        colorless_count = 0
-        # First, satisfy all colored energy requirements
-        for energy in cost:
-            if not isinstance(energy, ElementType):
-                try:
-                    energy = ElementType[energy.upper()]
-                except Exception:
-                    if str(energy).upper() == 'COLORLESS':
-                        colorless_count += 1
-                        continue
-                    return False
-            if energy.name == 'COLORLESS':
-                colorless_count += 1
-                continue
-            if attached.get(energy, 0) > 0:
-                attached[energy] -= 1
-            else:
-                return False
-        # Now check if we have enough remaining energies for colorless
-        if colorless_count > 0:
-            if sum(attached.values()) < colorless_count:
-                return False
-        return True
+        if self.status is StatusCondition.SLEEP or self.status is StatusCondition.PARALYSIS:
+            return False
+        # Check energy requirements against the attack's compiled cost vector
+        if not isinstance(attack, AttackSpec):
+            attack = AttackSpec.from_dict(attack, self.card.name)
+        return attack.is_affordable(self.attached_energies, self.get_total_energy())
@@ -0,0 +1,138 @@
+"""Decision-making agents for non-interactive players."""
+import random
+from typing import List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from .actions import ATTACH_ENERGY, ATTACK, END_TURN, EVOLVE, PLAY_BASIC, RETREAT, Action
+
+if TYPE_CHECKING:
+    from .game_state import GameState
+
+
+class Agent:
+    """Callbacks the engine uses for every decision a non-interactive player makes.
+
+    The base class makes the same choices the old automatic mode did (first
+    Basic as Active, bench the rest, promote the first benched Pokemon) and
+    delegates main-phase play to ``choose_action``, which subclasses implement.
+    """
+
+    def start_game(self, state: 'GameState', player_idx: int) -> None:
+        """Called when a game is created, before setup; ``state.rng`` is the game's RNG."""
+
+    def choose_setup(self, state: 'GameState', player_idx: int, basic_indices: List[int]) -> Tuple[int, List[int]]:
+        """Pick the Active and benched Pokemon at the start of the game.
+
+        Args:
+            basic_indices: Hand indices of the Basic Pokemon in hand
+
+        Returns:
+            (hand index for the Active spot, hand indices to bench - at most 3)
+        """
+        return basic_indices[0], basic_indices[1:4]
+
+    def choose_promotion(self, state: 'GameState', player_idx: int, bench_indices: List[int]) -> int:
+        """Pick the benched Pokemon that replaces a knocked out Active."""
+        return bench_indices[0]
+
+    def choose_energy_target(self, state: 'GameState', player_idx: int, slots: List[int]) -> int:
+        """Pick the board slot to attach the energy zone's energy to."""
+        return slots[0]
+
+    def choose_retreat_target(self, state: 'GameState', player_idx: int, bench_indices: List[int]) -> int:
+        """Pick the benched Pokemon to switch in when retreating."""
+        return bench_indices[0]
+
+    def choose_action(self, state: 'GameState', player_idx: int, actions: Sequence[Action]) -> Action:
+        """Pick the next main-phase action from src.actions.legal_actions; (END_TURN,) is always available."""
+        raise NotImplementedError
+
+    def _targeted(self, state: 'GameState', player_idx: int, actions: Sequence[Action], kind: int) -> Optional[Action]:
+        """Resolve the target of an attach/retreat action through the target callbacks."""
+        options = [action for action in actions if action[0] == kind]
+        if not options:
+            return None
+        targets = [action[1] for action in options]
+        if kind == ATTACH_ENERGY:
+            choice = self.choose_energy_target(state, player_idx, targets)
+        else:
+            choice = self.choose_retreat_target(state, player_idx, targets)
+        return options[targets.index(choice)]
+
+
+def _best_damage(pokemon) -> int:
+    """Highest printed base damage among a Pokemon's attacks."""
+    return max((attack.damage_spec.base for attack in pokemon.card.attacks), default=0)
+
+
+class GreedyAgent(Agent):
+    """Plays every Basic and evolution it can, powers up its Active and attacks as hard as possible.
+
+    An Active with no damaging attack retreats to the benched Pokemon that hits hardest.
+    """
+
+    def choose_energy_target(self, state: 'GameState', player_idx: int, slots: List[int]) -> int:
+        # Keep building the Active until it can pay for its strongest attack
+        active = state.active_pokemon[player_idx]
+        if 0 in slots and active is not None and active.card.attacks:
+            strongest = max(active.card.attacks, key=lambda attack: attack.damage_spec.base)
+            if not strongest.is_affordable(active.attached_energies, active.get_total_energy()) or len(slots) == 1:
+                return 0
+            return slots[1]
+        return slots[0]
+
+    def choose_retreat_target(self, state: 'GameState', player_idx: int, bench_indices: List[int]) -> int:
+        bench = state.benched_pokemon[player_idx]
+        return max(bench_indices, key=lambda idx: _best_damage(bench[idx]))
+
+    def choose_action(self, state: 'GameState', player_idx: int, actions: Sequence[Action]) -> Action:
+        for kind in (PLAY_BASIC, EVOLVE):
+            for action in actions:
+                if action[0] == kind:
+                    return action
+        attach = self._targeted(state, player_idx, actions, ATTACH_ENERGY)
+        if attach is not None:
+            return attach
+        moves = state.active_pokemon[player_idx].card.attacks
+        attacks = [action for action in actions if action[0] == ATTACK and moves[action[1]].damage_spec.base > 0]
+        if attacks:
+            return max(attacks, key=lambda action: moves[action[1]].damage_spec.base)
+        if _best_damage(state.active_pokemon[player_idx]) == 0:
+            retreat = self._targeted(state, player_idx, actions, RETREAT)
+            if retreat is not None and _best_damage(state.benched_pokemon[player_idx][retreat[1]]) > 0:
+                return retreat
+        return (END_TURN,)
+
+
+class RandomAgent(Agent):
+    """Picks uniformly among the legal choices at every decision.
+
+    Without an rng of its own it draws from the game's RNG, so seeded games stay reproducible.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.own_rng = rng
+        self.rng = rng or random.Random()
+
+    def start_game(self, state: 'GameState', player_idx: int) -> None:
+        if self.own_rng is None:
+            self.rng = state.rng
+
+    def choose_setup(self, state: 'GameState', player_idx: int, basic_indices: List[int]) -> Tuple[int, List[int]]:
+        active = self.rng.choice(basic_indices)
+        rest = [idx for idx in basic_indices if idx != active]
+        return active, self.rng.sample(rest, self.rng.randint(0, min(3, len(rest))))
+
+    def choose_promotion(self, state: 'GameState', player_idx: int, bench_indices: List[int]) -> int:
+        return self.rng.choice(bench_indices)
+
+    def choose_energy_target(self, state: 'GameState', player_idx: int, slots: List[int]) -> int:
+        return self.rng.choice(slots)
+
+    def choose_retreat_target(self, state: 'GameState', player_idx: int, bench_indices: List[int]) -> int:
+        return self.rng.choice(bench_indices)
+
+    def choose_action(self, state: 'GameState', player_idx: int, actions: Sequence[Action]) -> Action:
+        action = self.rng.choice(actions)
+        if action[0] == ATTACH_ENERGY or action[0] == RETREAT:
+            return self._targeted(state, player_idx, actions, action[0])
+        return action
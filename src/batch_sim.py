@@ -0,0 +1,384 @@
+"""Lockstep batch simulation of GreedyAgent-vs-GreedyAgent games with NumPy.
+
+``simulate`` plays one ``Game`` at a time, so a large matchup sweep spends
+most of its time in the interpreter. ``BatchSimulator`` instead advances N
+games together: every board, hand and deck lives in a NumPy array with a
+leading game axis, and each phase of a turn (start of turn, one greedy
+decision, attack resolution, knockouts, scoring, end of turn) is a handful
+of array operations over all the games still running.
+
+The rules and the greedy policy are the same as the scalar engine's
+(``Game.run`` with two ``GreedyAgent``s), so per-game results - winner,
+turn count, who went first - follow the same distribution. The random
+streams differ (NumPy's generator instead of ``GameRandom``), so a batch
+game does not replay a scalar game with the same seed.
+
+Only attacks aimed at the opponent's Active Pokemon are supported; decks
+with random-target attacks must use the scalar engine.
+"""
+import time
+from typing import Optional
+
+import numpy as np
+
+from .card_spec import ELEMENT_INDEX
+from .compact_state import EMPTY, SLOTS_PER_PLAYER, SpecCatalog
+from .damage_matrix import DamageMatrix
+from .deck import Deck
+from .game import DEFAULT_MAX_TURNS
+from .rng import new_campaign_seed
+from .simulator import SimulationReport
+
+DECK_SIZE = 20
+MAX_HAND = DECK_SIZE
+OPENING_HAND = 5
+NUM_ELEMENTS = len(ELEMENT_INDEX)
+# A greedy turn takes at most 3 plays, one evolution per hand card, an attach, a retreat and an attack
+_MAX_STEPS_PER_TURN = 3 + MAX_HAND + 3
+
+
+class _CardTables:
+    """Per-card constants as arrays indexed by catalog id.
+
+    Every table has one extra row at the end, so indexing with EMPTY (-1)
+    reads the values of "no card": 0 HP, no attacks, not Basic, ...
+    """
+
+    def __init__(self, catalog: SpecCatalog):
+        specs = catalog.specs
+        rows = len(specs) + 1
+        num_attacks = max([len(spec.attacks) for spec in specs] + [1])
+        self.hp = np.zeros(rows, np.int32)
+        self.points = np.zeros(rows, np.int32)
+        self.element = np.zeros(rows, np.int32)
+        self.retreat_cost = np.zeros(rows, np.int32)
+        self.is_basic = np.zeros(rows, bool)
+        # Lower-cased names as ids; an evolution matches a Pokemon when evolves_from == name_key
+        self.name_key = np.full(rows, -2, np.int32)
+        self.evolves_from = np.full(rows, EMPTY, np.int32)
+        self.attack_damage = np.zeros((rows, num_attacks), np.int32)
+        self.attack_cost = np.zeros((rows, num_attacks, NUM_ELEMENTS), np.int32)
+        self.attack_total = np.zeros((rows, num_attacks), np.int32)
+        self.attack_valid = np.zeros((rows, num_attacks), bool)
+        names = {}
+        for card_id, spec in enumerate(specs):
+            if spec.kind != 'pokemon':
+                continue
+            for attack in spec.attacks:
+                if attack.target != 'opponent_active':
+                    raise ValueError(f"{spec.name}'s {attack.name} targets {attack.target!r}; "
+                                     "the batch simulator only resolves attacks on the Active Pokemon")
+            self.hp[card_id] = spec.hp
+            self.points[card_id] = 2 if spec.is_ex else 1
+            self.element[card_id] = ELEMENT_INDEX[spec.element_type]
+            self.retreat_cost[card_id] = spec.retreat_cost
+            self.is_basic[card_id] = spec.evolution_type == 'Basic'
+            self.name_key[card_id] = names.setdefault(spec.name.lower(), len(names))
+            if spec.evolves_from:
+                self.evolves_from[card_id] = names.setdefault(spec.evolves_from, len(names))
+            for attack_idx, attack in enumerate(spec.attacks):
+                self.attack_damage[card_id, attack_idx] = attack.damage_spec.base
+                self.attack_cost[card_id, attack_idx] = attack.cost_vector
+                self.attack_total[card_id, attack_idx] = attack.total_cost
+                self.attack_valid[card_id, attack_idx] = True
+        # Damage of [attacker, attack, defender] with weakness applied, from the same rows
+        self.damage = DamageMatrix(specs).damage.astype(np.int32)
+        damage = np.where(self.attack_valid, self.attack_damage, -1)
+        self.best_damage = np.maximum(damage.max(axis=1), 0)
+        # GreedyAgent builds energy for the first of the hardest-hitting attacks
+        self.strongest = np.where(self.attack_valid.any(axis=1), damage.argmax(axis=1), EMPTY)
+
+
+def _compact(values: np.ndarray, keep: np.ndarray) -> np.ndarray:
+    """Move the kept entries of each row to the front (in order) and fill the rest with EMPTY."""
+    order = np.argsort(~keep, axis=-1, kind='stable')
+    packed = np.take_along_axis(values, order, axis=-1)
+    packed[~np.take_along_axis(keep, order, axis=-1)] = EMPTY
+    return packed
+
+
+class BatchResult:
+    """Per-game outcomes of a batch, as arrays indexed by game."""
+
+    def __init__(self, winners: np.ndarray, turns: np.ndarray, first_players: np.ndarray,
+                 scores: np.ndarray, elapsed: float):
+        self.winners = winners  # 1, 2 or 0 for a draw, as Game.run returns
+        self.turns = turns  # Final state.turn_number
+        self.first_players = first_players  # 0 or 1
+        self.scores = scores  # [games, 2]
+        self.elapsed = elapsed
+
+    def __len__(self) -> int:
+        return len(self.winners)
+
+
+class BatchSimulator:
+    """Plays a batch of GreedyAgent-vs-GreedyAgent games between two decks in lockstep.
+
+    Args:
+        deck1: Deck for player 1 (never mutated)
+        deck2: Deck for player 2
+        max_turns: Turn cap per game (defaults to the engine's DEFAULT_MAX_TURNS)
+        seed: Seed for the batch's NumPy generator
+    """
+
+    def __init__(self, deck1: Deck, deck2: Deck, max_turns: Optional[int] = None, seed: Optional[int] = None):
+        self.catalog = SpecCatalog()
+        self.deck_ids = np.array([[self.catalog.id_of(card.spec) for card in deck.cards] for deck in (deck1, deck2)],
+                                 np.int32)
+        if self.deck_ids.shape[1] != DECK_SIZE:
+            raise ValueError(f"Decks must contain exactly {DECK_SIZE} cards")
+        self.tables = _CardTables(self.catalog)
+        self.energy_types = [np.array([ELEMENT_INDEX[element] for element in deck.energy_types], np.int32)
+                             for deck in (deck1, deck2)]
+        self.max_turns = DEFAULT_MAX_TURNS if max_turns is None else max_turns
+        self.rng = np.random.default_rng(seed)
+
+    def run(self, games: int) -> BatchResult:
+        """Play ``games`` games to completion and return their outcomes."""
+        start = time.perf_counter()
+        self._setup(games)
+        winners = np.zeros(games, np.int8)
+        turns = np.zeros(games, np.int32)
+        live = np.arange(games)
+        while live.size:
+            self._start_turn(live)
+            acting = live
+            for _ in range(_MAX_STEPS_PER_TURN):
+                acting = self._greedy_step(acting)
+                if not acting.size:
+                    break
+            # Nothing before the main phase or after it can decide a game, so one check covers the turn
+            won = self._winners(live)
+            done = won > 0
+            winners[live[done]] = won[done]
+            turns[live[done]] = self.turn[live[done]]
+            live = live[~done]
+            self.current[live] = 1 - self.current[live]
+            self.turn[live] += 1
+            capped = self.turn[live] > self.max_turns
+            turns[live[capped]] = self.turn[live[capped]]
+            live = live[~capped]
+        return BatchResult(winners, turns, self.first_player.copy(), self.scores.copy(),
+                           time.perf_counter() - start)
+
+    # --- Setup ------------------------------------------------------------------
+
+    def _setup(self, games: int) -> None:
+        tables, rng = self.tables, self.rng
+        shape = (games, 2)
+        # Opening hands: redraw 5 from a reshuffled deck until one holds a Basic
+        order = np.argsort(rng.random(shape + (DECK_SIZE,)), axis=-1)
+        decks = np.take_along_axis(np.broadcast_to(self.deck_ids, shape + (DECK_SIZE,)), order, axis=-1)
+        redraw = ~tables.is_basic[decks[..., :OPENING_HAND]].any(axis=-1)
+        while redraw.any():
+            games_idx, players = np.nonzero(redraw)
+            order = np.argsort(rng.random((len(games_idx), DECK_SIZE)), axis=-1)
+            decks[games_idx, players] = self.deck_ids[players][np.arange(len(players))[:, None], order]
+            redraw = ~tables.is_basic[decks[..., :OPENING_HAND]].any(axis=-1)
+        self.decks = decks
+        self.deck_pos = np.full(shape, OPENING_HAND, np.int32)
+        hands = np.full(shape + (MAX_HAND,), EMPTY, np.int32)
+        hands[..., :OPENING_HAND] = decks[..., :OPENING_HAND]
+
+        # GreedyAgent.choose_setup: the first Basic in hand is Active, the next three go to the bench
+        basic = tables.is_basic[hands]
+        rank = np.cumsum(basic, axis=-1)
+        chosen = basic & (rank <= SLOTS_PER_PLAYER)
+        self.card = np.full(shape + (SLOTS_PER_PLAYER,), EMPTY, np.int32)
+        for slot in range(SLOTS_PER_PLAYER):
+            at_rank = chosen & (rank == slot + 1)
+            self.card[..., slot] = np.where(at_rank.any(axis=-1),
+                                            np.take_along_axis(hands, at_rank.argmax(axis=-1)[..., None], -1)[..., 0],
+                                            EMPTY)
+        self.hands = _compact(hands, (hands != EMPTY) & ~chosen)
+        self.hand_len = (self.hands != EMPTY).sum(axis=-1).astype(np.int32)
+        self.damage = np.zeros(shape + (SLOTS_PER_PLAYER,), np.int32)
+        self.turn_played = np.zeros(shape + (SLOTS_PER_PLAYER,), np.int32)
+        self.energy = np.zeros(shape + (SLOTS_PER_PLAYER, NUM_ELEMENTS), np.int32)
+        self.energy_zone = np.full(shape, EMPTY, np.int32)
+        self.next_energy = np.stack([self._draw_energy(player, games) for player in (0, 1)], axis=1)
+        self.scores = np.zeros(shape, np.int32)
+        self.retreated = np.zeros(games, bool)
+        self.first_player = rng.integers(0, 2, games).astype(np.int8)
+        self.current = self.first_player.astype(np.int32)
+        self.turn = np.ones(games, np.int32)
+
+    def _draw_energy(self, player: int, count: int) -> np.ndarray:
+        types = self.energy_types[player]
+        return types[self.rng.integers(0, len(types), count)]
+
+    # --- Turn phases ----------------------------------------------------------------
+
+    def _start_turn(self, rows: np.ndarray) -> None:
+        """GameState.start_turn: refill the energy zone and draw, except on turn 1."""
+        self.retreated[rows] = False
+        rows = rows[self.turn[rows] > 1]
+        players = self.current[rows]
+        for player in (0, 1):
+            mine = rows[players == player]
+            self.energy_zone[mine, player] = self.next_energy[mine, player]
+            self.next_energy[mine, player] = self._draw_energy(player, len(mine))
+        can_draw = self.deck_pos[rows, players] < DECK_SIZE
+        rows, players = rows[can_draw], players[can_draw]
+        self.hands[rows, players, self.hand_len[rows, players]] = self.decks[rows, players, self.deck_pos[rows, players]]
+        self.hand_len[rows, players] += 1
+        self.deck_pos[rows, players] += 1
+
+    def _greedy_step(self, rows: np.ndarray) -> np.ndarray:
+        """Take one GreedyAgent action in each game; returns the games whose turn goes on."""
+        tables = self.tables
+        players = self.current[rows]
+        turn = self.turn[rows]
+        hands = self.hands[rows, players]
+        board = self.card[rows, players]
+        active = board[:, 0]
+        bench_size = (board[:, 1:] != EMPTY).sum(axis=1)
+
+        basic = tables.is_basic[hands]
+        play = basic.any(axis=1) & (bench_size < SLOTS_PER_PLAYER - 1)
+
+        # First evolution card in hand order onto its first target (Active, then bench order)
+        ready = (board != EMPTY) & (self.turn_played[rows, players] < turn[:, None]) & (turn[:, None] > 2)
+        keys = np.where(ready, tables.name_key[board], -2)
+        matches = (tables.evolves_from[hands][:, :, None] == keys[:, None, :]).reshape(len(rows), -1)
+        evolve = matches.any(axis=1) & ~play
+
+        attach = (self.energy_zone[rows, players] != EMPTY) & ~play & ~evolve
+
+        energy = self.energy[rows, players, 0]
+        total = energy.sum(axis=1)
+        affordable = ((energy[:, None, :] >= tables.attack_cost[active]).all(axis=2)
+                      & (total[:, None] >= tables.attack_total[active]) & tables.attack_valid[active])
+        damage = np.where(affordable & (tables.attack_damage[active] > 0), tables.attack_damage[active], 0)
+        attack = (damage.max(axis=1) > 0) & ~play & ~evolve & ~attach
+
+        bench_damage = np.where(board[:, 1:] != EMPTY, tables.best_damage[board[:, 1:]], -1)
+        retreat = ((tables.best_damage[active] == 0) & (bench_size > 0) & ~self.retreated[rows]
+                   & (total >= tables.retreat_cost[active]) & (bench_damage.max(axis=1) > 0)
+                   & ~play & ~evolve & ~attach & ~attack)
+
+        if play.any():
+            self._play_basic(rows[play], players[play], basic[play].argmax(axis=1), bench_size[play])
+        if evolve.any():
+            first = matches[evolve].argmax(axis=1)
+            self._evolve(rows[evolve], players[evolve], first // SLOTS_PER_PLAYER, first % SLOTS_PER_PLAYER)
+        if attach.any():
+            self._attach(rows[attach], players[attach], bench_size[attach])
+        if retreat.any():
+            self._retreat(rows[retreat], players[retreat], bench_damage[retreat].argmax(axis=1))
+        if attack.any():
+            self._attack(rows[attack], players[attack], damage[attack].argmax(axis=1))
+        # Attacking ends the turn, as does having nothing left to do
+        return rows[play | evolve | attach | retreat]
+
+    def _remove_from_hand(self, rows: np.ndarray, players: np.ndarray, hand_idx: np.ndarray) -> None:
+        hands = self.hands[rows, players]
+        keep = (hands != EMPTY) & (np.arange(MAX_HAND) != hand_idx[:, None])
+        self.hands[rows, players] = _compact(hands, keep)
+        self.hand_len[rows, players] -= 1
+
+    def _play_basic(self, rows: np.ndarray, players: np.ndarray, hand_idx: np.ndarray,
+                    bench_size: np.ndarray) -> None:
+        slots = bench_size + 1
+        self.card[rows, players, slots] = self.hands[rows, players, hand_idx]
+        self.damage[rows, players, slots] = 0
+        self.energy[rows, players, slots] = 0
+        self.turn_played[rows, players, slots] = self.turn[rows]
+        self._remove_from_hand(rows, players, hand_idx)
+
+    def _evolve(self, rows: np.ndarray, players: np.ndarray, hand_idx: np.ndarray, slots: np.ndarray) -> None:
+        # Damage and energy stay with the slot
+        self.card[rows, players, slots] = self.hands[rows, players, hand_idx]
+        self.turn_played[rows, players, slots] = self.turn[rows]
+        self._remove_from_hand(rows, players, hand_idx)
+
+    def _attach(self, rows: np.ndarray, players: np.ndarray, bench_size: np.ndarray) -> None:
+        """GreedyAgent.choose_energy_target: the Active until its strongest attack is affordable."""
+        tables = self.tables
+        active = self.card[rows, players, 0]
+        strongest = tables.strongest[active]
+        energy = self.energy[rows, players, 0]
+        cost = tables.attack_cost[active, strongest]
+        powered = ((strongest != EMPTY) & (energy >= cost).all(axis=1)
+                   & (energy.sum(axis=1) >= tables.attack_total[active, strongest]))
+        slots = np.where(powered & (bench_size > 0), 1, 0)
+        self.energy[rows, players, slots, self.energy_zone[rows, players]] += 1
+        self.energy_zone[rows, players] = EMPTY
+
+    def _retreat(self, rows: np.ndarray, players: np.ndarray, bench_idx: np.ndarray) -> None:
+        """GameState.retreat: pay the cost from the lowest element first, swap, old Active to the back."""
+        energy = self.energy[rows, players, 0]
+        cost = self.tables.retreat_cost[self.card[rows, players, 0]]
+        paid_before = np.cumsum(energy, axis=1) - energy
+        self.energy[rows, players, 0] = energy - np.clip(cost[:, None] - paid_before, 0, energy)
+        # New slot order: chosen bench Pokemon, the rest of the bench, the old Active, then empty slots
+        slot = np.arange(SLOTS_PER_PLAYER)
+        occupied = self.card[rows, players] != EMPTY
+        keys = np.where(occupied, slot, SLOTS_PER_PLAYER + 1 + slot)
+        keys = np.where(slot == 0, SLOTS_PER_PLAYER, keys)
+        keys = np.where(slot == bench_idx[:, None] + 1, -1, keys)
+        order = np.argsort(keys, axis=1)
+        for field in (self.card, self.damage, self.turn_played):
+            field[rows, players] = np.take_along_axis(field[rows, players], order, axis=1)
+        self.energy[rows, players] = np.take_along_axis(self.energy[rows, players], order[:, :, None], axis=1)
+        self.turn_played[rows, players, 0] = self.turn[rows]
+        self.retreated[rows] = True
+
+    def _attack(self, rows: np.ndarray, players: np.ndarray, attack_idx: np.ndarray) -> None:
+        """GameState.execute_attack on the opponent's Active, then knockouts, scoring and promotion."""
+        tables = self.tables
+        opponents = 1 - players
+        attacker = self.card[rows, players, 0]
+        defender = self.card[rows, opponents, 0]
+        self.damage[rows, opponents, 0] += tables.damage[attacker, attack_idx, defender]
+        knocked_out = self.damage[rows, opponents, 0] >= tables.hp[defender]
+        rows, players, opponents = rows[knocked_out], players[knocked_out], opponents[knocked_out]
+        self.scores[rows, players] += tables.points[self.card[rows, opponents, 0]]
+        # The first benched Pokemon is promoted (Agent.choose_promotion) and the bench moves up
+        for field in (self.card, self.damage, self.turn_played, self.energy):
+            field[rows, opponents, :-1] = field[rows, opponents, 1:]
+        self.card[rows, opponents, -1] = EMPTY
+        self.damage[rows, opponents, -1] = 0
+        self.turn_played[rows, opponents, -1] = 0
+        self.energy[rows, opponents, -1] = 0
+
+    def _winners(self, rows: np.ndarray) -> np.ndarray:
+        """GameState.check_win_condition for each game: 1 or 2, or 0 while it goes on."""
+        winners = np.zeros(len(rows), np.int8)
+        scores = self.scores[rows]
+        wiped = (self.card[rows] == EMPTY).all(axis=2)
+        # Player 1's conditions are checked first, so they are applied last
+        for player in (1, 0):
+            winners = np.where(wiped[:, player], 2 - player, winners)
+            winners = np.where(scores[:, player] >= 3, player + 1, winners)
+        return winners
+
+
+def simulate_batched(deck1: Deck, deck2: Deck, games: int, batch_size: int = 4096,
+                     max_turns: Optional[int] = None, seed: Optional[int] = None) -> SimulationReport:
+    """Play GreedyAgent-vs-GreedyAgent games in lockstep batches; the batched counterpart of simulate().
+
+    Args:
+        deck1: Deck for player 1
+        deck2: Deck for player 2
+        games: Number of games to play
+        batch_size: Games advanced together; bounds memory use
+        max_turns: Turn cap per game (defaults to the engine's DEFAULT_MAX_TURNS)
+        seed: Campaign seed for the batches' generator; picked at random (and stored on the report) if not given
+
+    Returns:
+        SimulationReport with results and games/sec
+    """
+    report = SimulationReport(new_campaign_seed() if seed is None else seed)
+    simulator = BatchSimulator(deck1, deck2, max_turns, report.seed)
+    start = time.perf_counter()
+    while report.games < games:
+        result = simulator.run(min(batch_size, games - report.games))
+        report.games += len(result)
+        report.wins[0] += int((result.winners == 1).sum())
+        report.wins[1] += int((result.winners == 2).sum())
+        report.draws += int((result.winners == 0).sum())
+        report.total_turns += int(result.turns.sum())
+    report.elapsed = time.perf_counter() - start
+    return report
@@ -1,9 +1,16 @@
-"""CLI-based game board visualizer for Pokemon TCG."""
+"""CLI-based game board visualizer for Pokemon TCG.
+
+render() clears the screen and writes the whole board in one go, for the
+manual game's menus to print below. refresh() is for watching a game: it
+keeps the last frame it drew and rewrites only the lines that changed,
+positioning the cursor with ANSI escapes, in a single write. Both compose
+the frame in memory first, and card boxes are cached per card, damage,
+energy, status and tool, so an unchanged card is never drawn twice.
+"""
 
-import os
 import re
-import platform
-from typing import List, Optional
+import sys
+from typing import Dict, List, Optional, Sequence
 from colorama import init, Fore, Back, Style
 
 from .game_state import GameState
@@ -13,35 +20,50 @@ from .active_pokemon import ActivePokemon
 from .cards import Card
 from .elementTypes import ELEMENT_COLORS, STATUS_COLORS, ELEMENT_SYMBOLS
 
+try:
+    from wcwidth import wcswidth
+except ImportError:
+    # Fallback: basic len if wcwidth is not available
+    def wcswidth(s):
+        return len(s)
+
 # Initialize colorama
 init()
 
+ANSI_ESCAPE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_LINE = "\x1b[K"
+# Card boxes kept before the cache starts over (a long game only shows a few hundred)
+CARD_CACHE_SIZE = 4096
+
 # Define color mappings for different elements
 
 class BoardView:
     """A class to handle the CLI visualization of the game board."""
 
-    def __init__(self):
-        """Initialize the board view."""
-        self.clear_command = 'cls' if platform.system() == 'Windows' else 'clear'
+    def __init__(self, stream=None):
+        """Initialize the board view.
+
+        Args:
+            stream: Where frames are written; sys.stdout (looked up on every write) by default
+        """
+        self.stream = stream
+        self._card_cache: Dict[tuple, str] = {}
+        self._shown: Optional[List[str]] = None  # Lines on screen from the last refresh()
+
+    def _write(self, text: str) -> None:
+        stream = sys.stdout if self.stream is None else self.stream
+        stream.write(text)
+        stream.flush()
 
     def clear_screen(self):
         """Clear the terminal screen."""
-        os.system(self.clear_command)
+        self._write(CLEAR_SCREEN)
+        self._shown = None
 
     def _get_visible_length(self, text: str) -> int:
         """Calculate the visible length of a string, excluding ANSI color codes and accounting for double-width Unicode symbols."""
-        import re
-        try:
-            from wcwidth import wcswidth
-        except ImportError:
-            # Fallback: basic len if wcwidth is not available
-            def wcswidth(s):
-                return len(s)
-        # Remove all ANSI escape sequences
-        ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-        clean_text = ansi_escape.sub('', text)
-        return wcswidth(clean_text)
+        return wcswidth(ANSI_ESCAPE.sub('', text))
 
     def _pad_line(self, content: str, total_width: int = 24) -> str:
         """Pad a line to the specified width, accounting for ANSI color codes."""
@@ -73,7 +95,23 @@ class BoardView:
         return "\n".join(empty_card)
 
     def _draw_pokemon_card(self, pokemon: Optional[ActivePokemon], is_active: bool = False, bench_slot: Optional[int] = None, in_hand=False) -> str:
-        """Draw a single Pokemon card representation."""
+        """Draw a single Pokemon card representation (cached per card and battle state)."""
+        if not pokemon:
+            key = (None, bench_slot)
+        else:
+            energies = getattr(pokemon, 'attached_energies', None) or {}
+            tool = getattr(pokemon, 'tool', None)
+            key = (getattr(pokemon.card, 'spec', pokemon.card), pokemon.current_hp,
+                   tuple(energies.items()), getattr(pokemon, 'status', None),
+                   tool.name if tool else None, in_hand)
+        box = self._card_cache.get(key)
+        if box is None:
+            if len(self._card_cache) >= CARD_CACHE_SIZE:
+                self._card_cache.clear()
+            box = self._card_cache[key] = self._compose_pokemon_card(pokemon, bench_slot, in_hand)
+        return box
+
+    def _compose_pokemon_card(self, pokemon: Optional[ActivePokemon], bench_slot: Optional[int], in_hand: bool) -> str:
         CARD_WIDTH = 24  # Standard width for card content
         
         if not pokemon:
@@ -266,91 +304,111 @@ class BoardView:
             return "(empty)"
         return " ".join(f"{ELEMENT_SYMBOLS.get(e, '?')}" for e in energy_discard)
 
-    def render(self, game_state: GameState, options: Optional[List[dict]] = None):
-        """Render the current game state to the terminal, with optional player options menu."""
-        self.clear_screen()
-        
+    def _board_row(self, game_state: GameState, player_idx: int) -> str:
+        """The active and bench card boxes of a player, side by side."""
+        # Active slot, then bench cards or empty slots (always 3)
+        pokemon_cards = [self._draw_pokemon_card(game_state.active_pokemon[player_idx])]
+        bench = game_state.benched_pokemon[player_idx]
+        for i in range(3):
+            pokemon_cards.append(self._draw_pokemon_card(bench[i] if i < len(bench) else None, bench_slot=i+1))
+        return "\n".join("   ".join(x) for x in zip(*[p.split('\n') for p in pokemon_cards]))
+
+    def frame(self, game_state: GameState) -> List[str]:
+        """Compose the board as a list of screen lines, without writing anything."""
+        out = []
         # Draw turn indicator and score
-        print(self._draw_score(game_state.scores[0], game_state.scores[1]))
-        
-        print("=" * 80)
-        
+        out.append(self._draw_score(game_state.scores[0], game_state.scores[1]))
+        out.append("=" * 80)
+
         # Opponent's deck and discard at the top
-        print(f"Opponent's {self._draw_energy_zone(game_state.opponent_energy_zone, game_state.next_energy[1])} | Opponent's Deck: {len(game_state.players[1].deck)} cards | Discard: {len(game_state.opponent_card_discard)} cards | Energy Discard: {self._draw_energy_discard_pile(game_state.opponent_energy_discard)}")
-        
-       # Draw opponent's hand as list and active card if it's their turn
-        print("\nOpponent's Hand:")
-        print(self._draw_hand_list(game_state.hands[1], is_opponent=True))
-        
-        # Draw opponent's pokemon positions
+        out.append(f"Opponent's {self._draw_energy_zone(game_state.opponent_energy_zone, game_state.next_energy[1])} | Opponent's Deck: {len(game_state.players[1].deck)} cards | Discard: {len(game_state.opponent_card_discard)} cards | Energy Discard: {self._draw_energy_discard_pile(game_state.opponent_energy_discard)}")
+
+        # Draw opponent's hand as list
+        out.append("\nOpponent's Hand:")
+        out.append(self._draw_hand_list(game_state.hands[1], is_opponent=True))
+
+        # Draw opponent's pokemon positions, then the pokemon in one row
         positions = ["Active"] + ["Bench"] * 3  # Always show all 3 bench positions
-        print("\n" + "    ".join(f"{pos:^26}" for pos in positions))
-        
-        # Draw opponent's pokemon in one row
-        pokemon_cards = [self._draw_pokemon_card(game_state.active_pokemon[1])]  # Active slot
-        
-        # Add bench cards or empty slots for opponent
-        bench = game_state.benched_pokemon[1]
-        for i in range(3):  # Always process 3 bench slots
-            if i < len(bench):
-                pokemon_cards.append(self._draw_pokemon_card(bench[i], bench_slot=i+1))
-            else:
-                pokemon_cards.append(self._draw_pokemon_card(None, bench_slot=i+1))
-        
-        if pokemon_cards:
-            card_lines = ["   ".join(x) for x in zip(*[p.split('\n') for p in pokemon_cards])]
-            print("\n".join(card_lines))
-        print()
+        out.append("\n" + "    ".join(f"{pos:^26}" for pos in positions))
+        out.append(self._board_row(game_state, 1))
+        out.append("")
         if not game_state.current_player_idx == 0:
-            print(f"{Fore.RED}      ****** OPPONENT'S TURN ******{Style.RESET_ALL}")
-        # Draw middle section with scores
-        print("-" * 110)
-
+            out.append(f"{Fore.RED}      ****** OPPONENT'S TURN ******{Style.RESET_ALL}")
+        # Draw middle section
+        out.append("-" * 110)
         if game_state.current_player_idx == 0:
-            print(f"{Fore.GREEN}      ****** YOUR TURN ******{Style.RESET_ALL}")
-        print()
-        
-        # Draw player's pokemon in one row
-        pokemon_cards = [self._draw_pokemon_card(game_state.active_pokemon[0])]  # Active slot
-
-        # Add bench cards or empty slots for player
-        bench = game_state.benched_pokemon[0]
-        for i in range(3):  # Always process 3 bench slots
-            if i < len(bench):
-                pokemon_cards.append(self._draw_pokemon_card(bench[i], bench_slot=i+1))
-            else:
-                pokemon_cards.append(self._draw_pokemon_card(None, bench_slot=i+1))
-        
-        if pokemon_cards:
-            card_lines = ["   ".join(x) for x in zip(*[p.split('\n') for p in pokemon_cards])]
-            print("\n".join(card_lines))
+            out.append(f"{Fore.GREEN}      ****** YOUR TURN ******{Style.RESET_ALL}")
+        out.append("")
+
+        # Draw player's pokemon in one row, then their positions
+        out.append(self._board_row(game_state, 0))
+        out.append("    ".join(f"{pos:^26}" for pos in positions))
+        # Draw player's hand as list
+        out.append("\nYour Hand:")
+        out.append(self._draw_hand_list(game_state.hands[0], is_opponent=False))
 
-        # Draw player's pokemon positions
-        positions = ["Active"] + ["Bench"] * 3  # Always show all 3 bench positions
-        print("    ".join(f"{pos:^26}" for pos in positions))
-          # Draw player's hand as list and active card if it's their turn
-        print("\nYour Hand:")
-        print(self._draw_hand_list(game_state.hands[0], is_opponent=False))
-        
         # Player's energy zone
-        print(f"\nYour {self._draw_energy_zone(game_state.player_energy_zone, game_state.next_energy[0])} | Your Deck: {len(game_state.players[0].deck)} cards | Discard: {len(game_state.player_card_discard)} cards | Energy Discard: {self._draw_energy_discard_pile(game_state.player_energy_discard)}")
-        
-        print("=" * 80)
+        out.append(f"\nYour {self._draw_energy_zone(game_state.player_energy_zone, game_state.next_energy[0])} | Your Deck: {len(game_state.players[0].deck)} cards | Discard: {len(game_state.player_card_discard)} cards | Energy Discard: {self._draw_energy_discard_pile(game_state.player_energy_discard)}")
+
+        out.append("=" * 80)
         if game_state.turn_number > 0:
-            print(f"{Fore.GREEN}Turn #{game_state.turn_number} - {game_state.players[game_state.current_player_idx].name}'s turn{Style.RESET_ALL}")
+            out.append(f"{Fore.GREEN}Turn #{game_state.turn_number} - {game_state.players[game_state.current_player_idx].name}'s turn{Style.RESET_ALL}")
         else:
-            print(f"{Fore.LIGHTBLACK_EX}Setup Phase:{Style.RESET_ALL}")
+            out.append(f"{Fore.LIGHTBLACK_EX}Setup Phase:{Style.RESET_ALL}")
 
         if game_state.current_player_idx == 1 and game_state.turn_number > 0:
-            print(f"\nOpponent's Selected Card: ({game_state.active_hand_card[1] + 1})")
-            print("\n".join(self._draw_active_card_section(game_state, 1)))
+            out.append(f"\nOpponent's Selected Card: ({game_state.active_hand_card[1] + 1})")
+            out.extend(self._draw_active_card_section(game_state, 1))
 
         if game_state.current_player_idx == 0 and game_state.turn_number > 0:
-            print(f"\nYour Selected Card: ({game_state.active_hand_card[0] +1})")
-            print("\n".join(self._draw_active_card_section(game_state, 0)))
+            out.append(f"\nYour Selected Card: ({game_state.active_hand_card[0] +1})")
+            out.extend(self._draw_active_card_section(game_state, 0))
+        return "\n".join(out).split("\n")
 
+    def render(self, game_state: GameState, options: Optional[List[dict]] = None):
+        """Render the current game state to the terminal, with optional player options menu."""
         # Display options menu if provided
         # (Moved to game.py for better CLI UX)
+        self._write(CLEAR_SCREEN + "\n".join(self.frame(game_state)) + "\n")
+        # Whatever is printed below the board next is unknown, so refresh() starts over
+        self._shown = None
+
+    def refresh(self, game_state: GameState, footer: Sequence[str] = ()) -> int:
+        """Redraw the board in place, rewriting only the lines that changed since the last refresh.
+
+        The first call (and the first after render(), clear_screen() or
+        invalidate()) clears the screen and draws every line. The terminal
+        has to be wide enough for board lines not to wrap, or rows drift.
+
+        Args:
+            footer: Extra lines to show below the board (e.g. a status line)
+
+        Returns:
+            Number of screen lines written
+        """
+        lines = self.frame(game_state)
+        lines.extend(footer)
+        shown = self._shown
+        out = []
+        if shown is None:
+            out.append(CLEAR_SCREEN)
+            shown = []
+        written = 0
+        for row, line in enumerate(lines):
+            if row >= len(shown) or shown[row] != line:
+                out.append(f"\x1b[{row + 1};1H{line}{CLEAR_LINE}")
+                written += 1
+        # Blank the rows a longer previous frame left below this one
+        for row in range(len(lines), len(shown)):
+            out.append(f"\x1b[{row + 1};1H{CLEAR_LINE}")
+        out.append(f"\x1b[{len(lines) + 1};1H")
+        self._write("".join(out))
+        self._shown = lines
+        return written
+
+    def invalidate(self) -> None:
+        """Make the next refresh() redraw everything (after other output or a terminal resize)."""
+        self._shown = None
 
     def render_turn_info(self, current_turn: int, active_player: str):
         """Display turn information."""
@@ -0,0 +1,341 @@
+"""Indexed lookups over the card database, with a lazily loaded on-disk cache."""
+import hashlib
+import json
+import marshal
+import os
+import re
+import sys
+from enum import Enum
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .card_spec import CardSpec, card_record, spec_from_record
+
+CARDLIST_PATH = os.path.join(os.path.dirname(__file__), '../resources/CardList.json')
+CACHE_DIR = os.environ.get('TCG_SIM_CACHE_DIR',
+                           os.path.join(os.path.dirname(__file__), '../resources/.cache'))
+
+# Bump whenever the snapshot layout of CardRegistry changes so stale caches are rebuilt
+CACHE_VERSION = 2
+
+# "Genetic Apex  (A1)" -> "A1"; sets without a code in parentheses ("Promo-A") keep their full name
+_SET_CODE_RE = re.compile(r'\(([^)]+)\)\s*$')
+
+_TRAINER_KINDS = {'Item': 'item', 'Supporter': 'supporter', 'Tool': 'tool'}
+
+
+def _normalize(value: Any) -> str:
+    """Turn a query value into the case-folded string key used by the indexes."""
+    if isinstance(value, Enum):
+        value = value.value
+    return str(value).casefold()
+
+
+def card_kind(card: Dict[str, Any]) -> str:
+    """Classify a raw card dict as 'pokemon', 'item', 'supporter' or 'tool'."""
+    if card.get('card_type', '').startswith('Pokémon'):
+        return 'pokemon'
+    return _TRAINER_KINDS.get(card.get('evolution_type'), 'trainer')
+
+
+def set_code(card: Dict[str, Any]) -> str:
+    """Extract the short set code (e.g. 'A1') from a card's set details."""
+    details = card.get('set_details', '').strip()
+    match = _SET_CODE_RE.search(details)
+    return match.group(1) if match else details
+
+
+def evolves_from(card: Dict[str, Any]) -> Optional[str]:
+    """Return the case-folded name a card evolves from, or None for non-evolutions."""
+    # "card_type": "Pokémon - Stage 1 - Evolves from Bidoof"
+    card_type = card.get('card_type', '').lower()
+    if 'evolves from' not in card_type:
+        return None
+    return card_type.split('evolves from ')[-1].casefold()
+
+
+class Q:
+    """A composable card query.
+
+    Field terms are answered from the registry's hash indexes; ``&`` intersects
+    and ``|`` unions them. ``where`` adds an arbitrary predicate that is only
+    evaluated on the candidates the indexed terms leave behind.
+
+    Example:
+        Q(kind='pokemon', type='Fire') & (Q(evolution_type='Basic') | Q(evolves_from='charmander'))
+    """
+
+    __slots__ = ('_op', '_args')
+
+    def __init__(self, **terms: Any):
+        self._op = 'and'
+        self._args = tuple(('term', field, value) for field, value in terms.items())
+
+    @classmethod
+    def _node(cls, op: str, args: Tuple) -> 'Q':
+        query = cls.__new__(cls)
+        query._op = op
+        query._args = args
+        return query
+
+    def __and__(self, other: 'Q') -> 'Q':
+        return Q._node('and', (self, other))
+
+    def __or__(self, other: 'Q') -> 'Q':
+        return Q._node('or', (self, other))
+
+    def where(self, predicate: Callable[[Dict[str, Any]], bool]) -> 'Q':
+        """Return a query that additionally requires ``predicate(card)`` to be true."""
+        return Q._node('and', (self, ('where', predicate)))
+
+    def __repr__(self) -> str:
+        return f"Q<{self._op} {self._args!r}>"
+
+
+class CardRegistry:
+    """The card list plus hash indexes for O(1)/O(result) lookups.
+
+    Every card gets a dense integer uid: its position in the source list.
+    Indexed fields are ``id``, ``name``, ``type``, ``evolution_type``,
+    ``evolves_from``, ``set`` and ``kind``; string keys are case-folded.
+
+    The registry also holds each card's pre-parsed record; ``spec(uid)``
+    turns it into a shared CardSpec the first time it is asked for.
+    """
+
+    INDEXED_FIELDS = ('id', 'name', 'type', 'evolution_type', 'evolves_from', 'set', 'kind')
+
+    def __init__(self, cards: Iterable[Dict[str, Any]]):
+        self.cards: List[Dict[str, Any]] = list(cards)
+        self._all: FrozenSet[int] = frozenset(range(len(self.cards)))
+        self._indexes: Dict[str, Dict[str, FrozenSet[int]]] = {}
+        building: Dict[str, Dict[str, List[int]]] = {field: {} for field in self.INDEXED_FIELDS}
+        for uid, card in enumerate(self.cards):
+            for field, key in self._index_keys(card):
+                building[field].setdefault(key, []).append(uid)
+        for field, buckets in building.items():
+            self._indexes[field] = {key: frozenset(uids) for key, uids in buckets.items()}
+        self._records: List[Tuple] = [card_record(card) for card in self.cards]
+        self._specs: List[Optional[CardSpec]] = [None] * len(self.cards)
+
+    @classmethod
+    def from_json(cls, path: str = CARDLIST_PATH) -> 'CardRegistry':
+        """Build a registry from a CardList.json file."""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _snapshot(self) -> Tuple:
+        """Plain-data form of the registry for the marshal cache."""
+        return (self.cards, self._indexes, self._records)
+
+    @classmethod
+    def _from_snapshot(cls, snapshot: Tuple) -> 'CardRegistry':
+        registry = cls.__new__(cls)
+        registry.cards, registry._indexes, registry._records = snapshot
+        registry._all = frozenset(range(len(registry.cards)))
+        registry._specs = [None] * len(registry.cards)
+        return registry
+
+    @staticmethod
+    def _index_keys(card: Dict[str, Any]) -> List[Tuple[str, str]]:
+        keys = [
+            ('id', _normalize(card.get('id', ''))),
+            ('name', _normalize(card.get('name', ''))),
+            ('type', _normalize(card.get('type', ''))),
+            ('evolution_type', _normalize(card.get('evolution_type', ''))),
+            ('set', _normalize(set_code(card))),
+            ('kind', card_kind(card)),
+        ]
+        parent = evolves_from(card)
+        if parent:
+            keys.append(('evolves_from', parent))
+        return keys
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def get(self, uid: int) -> Dict[str, Any]:
+        """Get a card by its integer uid."""
+        return self.cards[uid]
+
+    def spec(self, uid: int) -> CardSpec:
+        """Get the shared, compiled CardSpec for a card uid."""
+        spec = self._specs[uid]
+        if spec is None:
+            spec = self._specs[uid] = spec_from_record(uid, self._records[uid])
+        return spec
+
+    def specs(self, uids: Iterable[int]) -> List[CardSpec]:
+        """Get CardSpecs for several uids."""
+        return [self.spec(uid) for uid in uids]
+
+    def uids(self, field: str, value: Any) -> FrozenSet[int]:
+        """Get the uids of every card whose ``field`` equals ``value``.
+
+        Raises:
+            KeyError: If ``field`` is not an indexed field
+        """
+        if field not in self._indexes:
+            raise KeyError(f"'{field}' is not an indexed card field")
+        if isinstance(value, (list, tuple, set, frozenset)):
+            index = self._indexes[field]
+            return frozenset().union(*(index.get(_normalize(v), frozenset()) for v in value))
+        return self._indexes[field].get(_normalize(value), frozenset())
+
+    def by_card_id(self, card_id: Any, set_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get cards by their printed id, optionally restricted to one set.
+
+        Printed ids restart in every set, so without ``set_name`` several cards can match.
+        """
+        query = Q(id=card_id) if set_name is None else Q(id=card_id, set=set_name)
+        return self.query(query)
+
+    def get_pokemon_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get the first Pokémon card with the given (case-insensitive) name."""
+        matches = self.query(Q(kind='pokemon', name=name), limit=1)
+        return matches[0] if matches else None
+
+    def evolutions_of(self, name: str) -> List[Dict[str, Any]]:
+        """Get every card that evolves from the named Pokémon."""
+        return self.query(Q(evolves_from=name))
+
+    def query(self, query: Optional[Q] = None, limit: Optional[int] = None, **terms: Any) -> List[Dict[str, Any]]:
+        """Get cards matching a query, in card list order.
+
+        Args:
+            query: A ``Q`` expression; keyword ``terms`` are ANDed onto it
+            limit: Stop after this many matches
+
+        Returns:
+            List of matching card dicts
+        """
+        return [self.cards[uid] for uid in self.query_uids(query, limit, **terms)]
+
+    def query_uids(self, query: Optional[Q] = None, limit: Optional[int] = None, **terms: Any) -> List[int]:
+        """Like ``query`` but returns card uids."""
+        if terms:
+            query = Q(**terms) if query is None else query & Q(**terms)
+        if query is None:
+            query = Q()
+        candidates, predicates = self._plan(query)
+        ordered = sorted(self._all if candidates is None else candidates)
+        if not predicates:
+            return ordered if limit is None else ordered[:limit]
+        results = []
+        for uid in ordered:
+            card = self.cards[uid]
+            if all(predicate(card) for predicate in predicates):
+                results.append(uid)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    def _plan(self, node) -> Tuple[Optional[FrozenSet[int]], List[Callable]]:
+        """Reduce a query to (indexed candidate set or None for 'all', residual predicates).
+
+        Predicates under an AND are deferred so they only run on the final
+        candidates; an OR has to resolve its predicate branches eagerly.
+        """
+        if isinstance(node, tuple):
+            if node[0] == 'where':
+                return None, [node[1]]
+            _, field, value = node
+            return self.uids(field, value), []
+        if node._op == 'and':
+            sets, predicates = [], []
+            for arg in node._args:
+                candidates, preds = self._plan(arg)
+                if candidates is not None:
+                    sets.append(candidates)
+                predicates.extend(preds)
+            if not sets:
+                return None, predicates
+            sets.sort(key=len)
+            result = sets[0]
+            for other in sets[1:]:
+                if not result:
+                    break
+                result = result & other
+            return result, predicates
+        union = frozenset()
+        for arg in node._args:
+            candidates, preds = self._plan(arg)
+            if candidates is None:
+                candidates = self._all
+            if preds:
+                candidates = frozenset(uid for uid in candidates
+                                       if all(p(self.cards[uid]) for p in preds))
+            union = union | candidates
+        return union, []
+
+
+_registry: Optional[CardRegistry] = None
+
+
+def _file_digest(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _cache_path(path: str, cache_dir: str) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-v{CACHE_VERSION}.marshal")
+
+
+def load_registry(path: str = CARDLIST_PATH, cache_dir: Optional[str] = CACHE_DIR) -> CardRegistry:
+    """Load a registry, preferring a compiled marshal snapshot over parsing the JSON.
+
+    The snapshot is keyed on the cache version, the interpreter version and the
+    JSON's mtime and size; if only the mtime changed, the content hash decides
+    whether it is still valid. Cache failures (missing, corrupt, unwritable)
+    just fall back to the JSON.
+
+    Args:
+        path: Path to CardList.json
+        cache_dir: Directory for the snapshot, or None to disable caching
+    """
+    if cache_dir is None:
+        return CardRegistry.from_json(path)
+    stat = os.stat(path)
+    cache_file = _cache_path(path, cache_dir)
+    digest = None
+    try:
+        with open(cache_file, 'rb') as f:
+            header, snapshot = marshal.loads(f.read())
+        version, python, mtime_ns, size, sha256 = header
+        if (version, python, size) == (CACHE_VERSION, sys.version_info[:2], stat.st_size):
+            if mtime_ns != stat.st_mtime_ns:
+                digest = _file_digest(path)
+            if mtime_ns == stat.st_mtime_ns or sha256 == digest:
+                registry = CardRegistry._from_snapshot(snapshot)
+                if digest is not None:
+                    _write_snapshot(cache_file, registry, stat, digest)
+                return registry
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    registry = CardRegistry.from_json(path)
+    _write_snapshot(cache_file, registry, stat, digest or _file_digest(path))
+    return registry
+
+
+def _write_snapshot(cache_file: str, registry: CardRegistry, stat: os.stat_result, digest: str) -> None:
+    header = (CACHE_VERSION, sys.version_info[:2], stat.st_mtime_ns, stat.st_size, digest)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(tmp_file, 'wb') as f:
+            marshal.dump((header, registry._snapshot()), f)
+        # Atomic so concurrent workers never see a half-written snapshot
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+def get_registry() -> CardRegistry:
+    """Get the process-wide card registry, loading it on first access."""
+    global _registry
+    if _registry is None:
+        _registry = load_registry()
+    return _registry
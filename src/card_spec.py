@@ -0,0 +1,275 @@
+"""Compiled, immutable card specifications shared by every copy of a card."""
+import copyreg
+import re
+from enum import Enum
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from .elementTypes import ElementType
+
+_ELEMENTS_BY_NAME = {element.name: element for element in ElementType}
+# Position of each element in an AttackSpec.cost_vector
+ELEMENT_INDEX = {element: i for i, element in enumerate(ElementType)}
+_DAMAGE_RE = re.compile(r'^\s*(\d+)\s*([+x×-]?)\s*$')
+_TRAINER_KINDS = {'Item': 'item', 'Supporter': 'supporter', 'Tool': 'tool'}
+# Cards expose their spec's ability mapping; let them be pickled and deep-copied
+copyreg.pickle(MappingProxyType, lambda proxy: (MappingProxyType, (dict(proxy),)))
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _element_name(value: Any) -> Optional[str]:
+    """Map a type string such as 'Fire' or 'Pokémon - Basic Fire' to an ElementType name."""
+    words = str(value or '').split()
+    if words and words[-1].upper() in _ELEMENTS_BY_NAME:
+        return words[-1].upper()
+    return None
+
+
+class DamageModifier(Enum):
+    NONE = ""    # Fixed damage
+    PLUS = "+"   # Base damage plus an effect-dependent bonus
+    TIMES = "x"  # Base damage times an effect-dependent count (coin flips, energies, ...)
+    MINUS = "-"  # Base damage minus an effect-dependent amount
+
+
+class DamageSpec(NamedTuple):
+    base: int
+    modifier: DamageModifier
+
+
+_MODIFIERS = {'': DamageModifier.NONE, '+': DamageModifier.PLUS, 'x': DamageModifier.TIMES,
+              '×': DamageModifier.TIMES, '-': DamageModifier.MINUS}
+
+
+def parse_damage(text: Any) -> DamageSpec:
+    """Parse damage text such as '30', '40+' or '50x'.
+
+    Anything unparseable (some card data has stray words in the damage
+    field) counts as 0 fixed damage.
+    """
+    match = _DAMAGE_RE.match(str(text if text is not None else ''))
+    if not match:
+        return DamageSpec(0, DamageModifier.NONE)
+    return DamageSpec(int(match.group(1)), _MODIFIERS[match.group(2)])
+
+
+class _Frozen:
+    """Base for slotted records whose attributes can't be reassigned after construction."""
+
+    __slots__ = ()
+    # Slots passed to __init__ (and so needed to rebuild the record when unpickling)
+    _ARGS: Tuple[str, ...] = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (type(self), tuple(getattr(self, slot) for slot in self._ARGS))
+
+    # Immutable, so copies can share the original
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class AttackSpec(_Frozen):
+    """A pre-parsed attack.
+
+    Besides the raw fields, the energy cost is compiled into ``cost_vector``
+    (count per element, indexed by ``ELEMENT_INDEX``, colorless slot always
+    0), the sparse ``colored_cost`` pairs, ``colorless_cost`` and
+    ``total_cost``; damage text is compiled into a ``DamageSpec``.
+
+    Also supports the read-only dict interface (``attack['name']``,
+    ``attack.get('cost', [])``) that the game and board view use.
+    """
+
+    __slots__ = ('name', 'cost', 'damage', 'effect', 'target',
+                 'cost_vector', 'colored_cost', 'colorless_cost', 'total_cost', 'damage_spec')
+    _ARGS = ('name', 'cost', 'damage', 'effect', 'target')
+
+    def __init__(self, name: str, cost: Tuple[ElementType, ...], damage: str, effect: str, target: str):
+        vector = [0] * len(ELEMENT_INDEX)
+        for element in cost:
+            if element is not ElementType.COLORLESS:
+                vector[ELEMENT_INDEX[element]] += 1
+        colored = tuple((element, vector[i]) for element, i in ELEMENT_INDEX.items() if vector[i])
+        for slot, value in (('name', name), ('cost', cost), ('damage', damage), ('effect', effect),
+                            ('target', target), ('cost_vector', tuple(vector)), ('colored_cost', colored),
+                            ('colorless_cost', len(cost) - sum(vector)), ('total_cost', len(cost)),
+                            ('damage_spec', parse_damage(damage))):
+            object.__setattr__(self, slot, value)
+
+    @classmethod
+    def from_dict(cls, attack: Mapping[str, Any], card: str = '') -> 'AttackSpec':
+        """Compile a legacy attack dict whose cost entries are ElementTypes or type names.
+
+        Args:
+            card: Name of the card the attack is on, for error messages
+
+        Raises:
+            ValueError: A cost entry isn't an energy type
+        """
+        cost = []
+        for energy in attack.get('cost', []):
+            if not isinstance(energy, ElementType):
+                element = _ELEMENTS_BY_NAME.get(str(energy).upper())
+                if element is None:
+                    raise ValueError(f"{card or 'Card'}: attack {attack.get('name', '')!r} "
+                                     f"costs unknown energy type {energy!r}")
+                energy = element
+            cost.append(energy)
+        cost = tuple(cost)
+        return cls(attack.get('name', ''), cost, attack.get('damage', '0'), attack.get('effect', ''),
+                   attack.get('target', 'opponent_active'))
+
+    def is_affordable(self, energies: Mapping[ElementType, int], total: int) -> bool:
+        """Check the cost against attached energy counts (``total`` is their sum)."""
+        if total < self.total_cost:
+            return False
+        for element, count in self.colored_cost:
+            if energies[element] < count:
+                return False
+        # Colored needs are met, so whatever is left over covers the colorless part
+        return True
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def __repr__(self) -> str:
+        return f"AttackSpec({self.name!r}, damage={self.damage!r})"
+
+
+class CardSpec(_Frozen):
+    """Everything about a card that never changes during a game.
+
+    Specs are compiled once per card, so ``Pokemon``/``Trainer`` instances and
+    decks only hold references to them. ``uid`` is the card's index in the
+    registry, or -1 for cards compiled from ad-hoc dicts.
+    """
+
+    __slots__ = ('uid', 'id', 'name', 'card_type', 'kind', 'evolution_type', 'element_type',
+                 'hp', 'weakness', 'weakness_type', 'retreat_cost', 'is_ex', 'evolves_from',
+                 'attacks', 'ability', 'image', 'rarity', 'set_details', 'fullart')
+    _ARGS = __slots__
+
+    def __init__(self, uid: int, id: Optional[str], name: str, card_type: str, kind: str,
+                 evolution_type: Optional[str], element_type: ElementType, hp: int,
+                 weakness: Optional[str], weakness_type: Optional[ElementType], retreat_cost: int,
+                 is_ex: bool, evolves_from: Any, attacks: Tuple[AttackSpec, ...],
+                 ability: Mapping[str, str], image: Optional[str], rarity: str,
+                 set_details: str, fullart: bool):
+        if not isinstance(ability, MappingProxyType):
+            ability = MappingProxyType(dict(ability))
+        for slot, value in zip(self.__slots__, (
+                uid, id, name, card_type, kind, evolution_type, element_type, hp, weakness,
+                weakness_type, retreat_cost, is_ex, evolves_from, attacks, ability, image,
+                rarity, set_details, fullart)):
+            object.__setattr__(self, slot, value)
+
+    def __reduce__(self):
+        # mappingproxy can't be pickled; hand __init__ a plain dict to re-wrap
+        state = tuple(dict(self.ability) if slot == 'ability' else getattr(self, slot)
+                      for slot in self._ARGS)
+        return (CardSpec, state)
+
+    @property
+    def is_pokemon(self) -> bool:
+        return self.kind == 'pokemon'
+
+    @property
+    def is_basic(self) -> bool:
+        return self.kind == 'pokemon' and self.evolution_type == 'Basic'
+
+    def __repr__(self) -> str:
+        return f"CardSpec({self.uid}, {self.name!r})"
+
+
+def card_record(card_data: Dict[str, Any], kind: Optional[str] = None) -> Tuple:
+    """Do all the string parsing for a card, producing a marshal-friendly tuple.
+
+    Args:
+        card_data: Raw card dict from CardList.json (or a test fixture)
+        kind: 'pokemon', 'item', 'supporter', 'tool' or 'trainer'; inferred from
+              ``card_type`` when not given
+    """
+    card_type = card_data.get('card_type')
+    if kind is None:
+        if (card_type or '').startswith('Pokémon'):
+            kind = 'pokemon'
+        else:
+            kind = _TRAINER_KINDS.get(card_data.get('evolution_type'), 'trainer')
+
+    if kind == 'pokemon':
+        name = card_data.get('name', 'Unknown')
+        evolution_type = card_data.get('evolution_type', 'Basic')
+        # Prefer the explicit type; older fixtures use 'element_type' or put it at the end of card_type
+        element = (_element_name(card_data.get('type')) or _element_name(card_data.get('element_type'))
+                   or _element_name(card_type) or 'COLORLESS')
+        ability_data = card_data.get('ability', {})
+        ability = (ability_data.get('name') if ability_data else 'No ability',
+                   ability_data.get('effect') if ability_data else 'N/A')
+        attacks = tuple(
+            (attack.get('name', ''),
+             tuple(cost.upper() for cost in attack.get('cost', [])),
+             attack.get('damage', '0'),
+             attack.get('effect', ''),
+             attack.get('target', 'opponent_active'))  # Default to opponent's active
+            for attack in card_data.get('attacks', []))
+    else:
+        name = card_data.get('name')
+        evolution_type = card_data.get('evolution_type')
+        element = 'COLORLESS'
+        # Convert 'ability' field to match Pokemon card format
+        ability_data = card_data.get('ability')
+        if isinstance(ability_data, dict):
+            ability = (ability_data.get('name', 'Effect'), ability_data.get('effect', ''))
+        elif isinstance(ability_data, str) and ability_data:
+            ability = ('Effect', ability_data)
+        else:
+            ability = ('No effect', 'N/A')
+        attacks = ()
+
+    # "card_type": "Pokémon - Stage 1 - Evolves from Bidoof"
+    lowered = (card_type or '').lower()
+    evolves_from = lowered.split('evolves from ')[-1] if 'evolves from' in lowered else False
+    weakness = card_data.get('weakness')
+    return (card_data.get('id'), name, card_type, kind, evolution_type, element,
+            _to_int(card_data.get('hp', 0)), weakness, _element_name(weakness),
+            _to_int(card_data.get('retreat', 0)), card_data.get('ex', 'No') == 'Yes',
+            evolves_from, attacks, ability, card_data.get('image'), card_data.get('rarity', ''),
+            card_data.get('set_details', ''), card_data.get('fullart', 'No') == 'Yes')
+
+
+def spec_from_record(uid: int, record: Tuple) -> CardSpec:
+    """Build a CardSpec from a ``card_record`` tuple; only enum lookups remain."""
+    (card_id, name, card_type, kind, evolution_type, element, hp, weakness, weakness_element,
+     retreat_cost, is_ex, evolves_from, attacks, ability, image, rarity, set_details, fullart) = record
+    attack_specs = tuple(
+        AttackSpec(attack_name, tuple(_ELEMENTS_BY_NAME[cost] for cost in cost_names), damage, effect, target)
+        for attack_name, cost_names, damage, effect, target in attacks)
+    return CardSpec(uid, card_id, name, card_type, kind, evolution_type, _ELEMENTS_BY_NAME[element], hp,
+                    weakness, _ELEMENTS_BY_NAME.get(weakness_element), retreat_cost, is_ex, evolves_from,
+                    attack_specs, {'name': ability[0], 'effect': ability[1]},
+                    image, rarity, set_details, fullart)
+
+
+def compile_card(card_data: Dict[str, Any], uid: int = -1, kind: Optional[str] = None) -> CardSpec:
+    """Compile a raw card dict into a CardSpec."""
+    return spec_from_record(uid, card_record(card_data, kind))
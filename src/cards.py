@@ -1,19 +1,30 @@
 """Base card implementation."""
 from abc import ABC, abstractmethod
-from typing import Dict, Any, TYPE_CHECKING
+from typing import Dict, Any, Optional, Union, TYPE_CHECKING
+from .card_spec import CardSpec, compile_card
 
 if TYPE_CHECKING:
     from .game_state import GameState
 
 class Card(ABC):
-    def __init__(self, card_data: Dict[str, Any]):
-        self.id = card_data.get('id')
-        self.name = card_data.get('name')
-        self.card_type = card_data.get('card_type')
-        self.image = card_data.get('image')
-        self.rarity = card_data.get('rarity', '')
-        self.set_details = card_data.get('set_details', '')
-        self.fullart = card_data.get('fullart', 'No') == 'Yes'
+    # Kind passed to compile_card when built from a raw dict; None infers it from card_type
+    KIND: Optional[str] = None
+
+    def __init__(self, card_data: Union[CardSpec, Dict[str, Any]]):
+        """Initialize a card from a compiled CardSpec or a raw card dict.
+
+        Raw dicts are compiled on the spot; decks built from the card registry
+        pass shared specs so no parsing happens per copy.
+        """
+        spec = card_data if isinstance(card_data, CardSpec) else compile_card(card_data, kind=self.KIND)
+        self.spec = spec
+        self.id = spec.id
+        self.name = spec.name
+        self.card_type = spec.card_type
+        self.image = spec.image
+        self.rarity = spec.rarity
+        self.set_details = spec.set_details
+        self.fullart = spec.fullart
         
     @abstractmethod
     def play(self, game_state: 'GameState') -> bool:
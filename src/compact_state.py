@@ -0,0 +1,367 @@
+"""Compact, array-backed snapshot of a GameState for cheap cloning.
+
+``GameState`` keeps the board as ``ActivePokemon`` objects (each with its own
+energy dict) inside dicts of lists, which makes copying a position for
+lookahead expensive. ``CompactState`` stores the same information in a
+handful of flat ``array.array``s of small integers, so ``clone()`` is a few
+buffer copies.
+
+Board slots are numbered ``player * SLOTS_PER_PLAYER + slot`` where slot 0 is
+the Active spot and 1-3 the bench (benched Pokemon are kept contiguous).
+Cards are stored as indices into a ``SpecCatalog`` that every clone shares.
+"""
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .active_pokemon import ActivePokemon
+from .card_spec import CardSpec
+from .deck import card_from_spec
+from .elementTypes import ElementType, StatusCondition
+from .game_state import GameState
+
+SLOTS_PER_PLAYER = 4
+NUM_SLOTS = 2 * SLOTS_PER_PLAYER
+ELEMENTS: Tuple[ElementType, ...] = tuple(ElementType)
+NUM_ELEMENTS = len(ELEMENTS)
+STATUSES: Tuple[StatusCondition, ...] = tuple(StatusCondition)
+_ELEMENT_CODE = {element: i for i, element in enumerate(ELEMENTS)}
+_STATUS_CODE = {status: i for i, status in enumerate(STATUSES)}
+EMPTY = -1
+
+
+class SpecCatalog:
+    """Maps CardSpecs to the small integer ids a CompactState stores."""
+
+    __slots__ = ('specs', '_ids')
+
+    def __init__(self, specs: Sequence[CardSpec] = ()):
+        self.specs: List[CardSpec] = []
+        self._ids: Dict[int, int] = {}
+        for spec in specs:
+            self.id_of(spec)
+
+    def id_of(self, spec: CardSpec) -> int:
+        """The catalog id for a spec, adding it on first sight."""
+        key = id(spec)
+        card_id = self._ids.get(key)
+        if card_id is None:
+            card_id = self._ids[key] = len(self.specs)
+            self.specs.append(spec)
+        return card_id
+
+    def __getitem__(self, card_id: int) -> CardSpec:
+        return self.specs[card_id]
+
+    def __len__(self) -> int:
+        return len(self.specs)
+
+
+class SlotView:
+    """Read-only, ActivePokemon-like view of one occupied board slot."""
+
+    __slots__ = ('_state', '_slot')
+
+    def __init__(self, state: 'CompactState', slot: int):
+        self._state = state
+        self._slot = slot
+
+    @property
+    def card(self) -> CardSpec:
+        return self._state.catalog[self._state.card[self._slot]]
+
+    @property
+    def name(self) -> str:
+        return self.card.name
+
+    @property
+    def hp(self) -> int:
+        return self._state.hp[self._slot]
+
+    @property
+    def damage_counters(self) -> int:
+        return self._state.damage[self._slot]
+
+    @property
+    def current_hp(self) -> int:
+        return self.hp - self.damage_counters
+
+    @property
+    def element_type(self) -> ElementType:
+        return self.card.element_type
+
+    @property
+    def weakness(self) -> Optional[str]:
+        return self.card.weakness
+
+    @property
+    def retreat_cost(self) -> int:
+        return self.card.retreat_cost
+
+    @property
+    def status(self) -> Optional[StatusCondition]:
+        code = self._state.status[self._slot]
+        return None if code == EMPTY else STATUSES[code]
+
+    @property
+    def turn_played(self) -> int:
+        return self._state.turn_played[self._slot]
+
+    @property
+    def attached_energies(self) -> Dict[ElementType, int]:
+        base = self._slot * NUM_ELEMENTS
+        energy = self._state.energy
+        return {element: energy[base + i] for i, element in enumerate(ELEMENTS)}
+
+    def get_total_energy(self) -> int:
+        base = self._slot * NUM_ELEMENTS
+        return sum(self._state.energy[base:base + NUM_ELEMENTS])
+
+    def __repr__(self) -> str:
+        return f"SlotView({self._slot}, {self.name!r}, {self.current_hp}/{self.hp})"
+
+
+class CompactState:
+    """Flat-array game position with O(size) ``clone()``.
+
+    Build one with ``from_game_state`` and turn it back into a playable
+    ``GameState`` with ``to_game_state``. The ``player_*``/``opponent_*``
+    properties mirror GameState's (player 0 and player 1 respectively), with
+    board Pokemon exposed as ``SlotView``s and cards as ``CardSpec``s.
+    """
+
+    __slots__ = ('catalog', 'names', 'energy_types', 'rng_state',
+                 'current_player', 'turn_number', 'supporter_played',
+                 'card', 'hp', 'damage', 'status', 'status_turn', 'turn_played', 'tool', 'energy',
+                 'scores', 'energy_zone', 'next_energy', 'retreated', 'energy_discard',
+                 'hands', 'decks', 'discards')
+
+    def __init__(self, catalog: Optional[SpecCatalog] = None):
+        self.catalog = catalog if catalog is not None else SpecCatalog()
+        self.names: Tuple[str, str] = ('Player 1', 'Player 2')
+        self.energy_types: Tuple[Tuple[ElementType, ...], Tuple[ElementType, ...]] = ((), ())
+        self.rng_state = None
+        self.current_player = 0
+        self.turn_number = 0
+        self.supporter_played = False
+        # Per board slot
+        self.card = array('i', [EMPTY] * NUM_SLOTS)
+        self.hp = array('H', [0] * NUM_SLOTS)
+        self.damage = array('H', [0] * NUM_SLOTS)
+        self.status = array('b', [EMPTY] * NUM_SLOTS)
+        self.status_turn = array('h', [EMPTY] * NUM_SLOTS)
+        self.turn_played = array('h', [0] * NUM_SLOTS)
+        self.tool = array('i', [EMPTY] * NUM_SLOTS)
+        self.energy = array('B', [0] * (NUM_SLOTS * NUM_ELEMENTS))
+        # Per player
+        self.scores = array('B', [0, 0])
+        self.energy_zone = array('b', [EMPTY, EMPTY])
+        self.next_energy = array('b', [EMPTY, EMPTY])
+        self.retreated = array('B', [0, 0])
+        self.energy_discard = array('H', [0] * (2 * NUM_ELEMENTS))
+        self.hands = [array('i'), array('i')]
+        self.decks = [array('i'), array('i')]
+        self.discards = [array('i'), array('i')]
+
+    def clone(self) -> 'CompactState':
+        """Independent copy; the catalog and other immutable fields are shared."""
+        other = CompactState.__new__(CompactState)
+        other.catalog = self.catalog
+        other.names = self.names
+        other.energy_types = self.energy_types
+        other.rng_state = self.rng_state
+        other.current_player = self.current_player
+        other.turn_number = self.turn_number
+        other.supporter_played = self.supporter_played
+        other.card = self.card[:]
+        other.hp = self.hp[:]
+        other.damage = self.damage[:]
+        other.status = self.status[:]
+        other.status_turn = self.status_turn[:]
+        other.turn_played = self.turn_played[:]
+        other.tool = self.tool[:]
+        other.energy = self.energy[:]
+        other.scores = self.scores[:]
+        other.energy_zone = self.energy_zone[:]
+        other.next_energy = self.next_energy[:]
+        other.retreated = self.retreated[:]
+        other.energy_discard = self.energy_discard[:]
+        other.hands = [self.hands[0][:], self.hands[1][:]]
+        other.decks = [self.decks[0][:], self.decks[1][:]]
+        other.discards = [self.discards[0][:], self.discards[1][:]]
+        return other
+
+    # --- Conversion ---------------------------------------------------------
+
+    @classmethod
+    def from_game_state(cls, state: GameState, catalog: Optional[SpecCatalog] = None) -> 'CompactState':
+        """Snapshot a GameState (players' hands and decks included when players are set)."""
+        compact = cls(catalog)
+        id_of = compact.catalog.id_of
+        if state.players:
+            compact.names = tuple(player.name for player in state.players)
+        compact.energy_types = (tuple(state.energy_types[0]), tuple(state.energy_types[1]))
+        compact.rng_state = state.rng.getstate()
+        compact.current_player = state.current_player_idx
+        compact.turn_number = state.turn_number
+        compact.supporter_played = state.supporter_played_this_turn
+        for player in (0, 1):
+            for slot, pokemon in state.board_slots(player):
+                compact._store_pokemon(player * SLOTS_PER_PLAYER + slot, pokemon)
+            compact.scores[player] = state.scores[player]
+            compact.energy_zone[player] = _element_code(state.energy_zones[player])
+            compact.next_energy[player] = _element_code(state.next_energy[player])
+            compact.retreated[player] = state.retreated_this_turn[player]
+            for energy in state.energy_discard_piles[player]:
+                compact.energy_discard[player * NUM_ELEMENTS + _ELEMENT_CODE[energy]] += 1
+            hand = state.players[player].hand if state.players else state.hands[player]
+            compact.hands[player] = array('i', [id_of(card.spec) for card in hand])
+            if state.players:
+                compact.decks[player] = array('i', [id_of(card.spec) for card in state.players[player].deck])
+            compact.discards[player] = array('i', [id_of(card.spec) for card in state.card_discard_piles[player]])
+        return compact
+
+    def _store_pokemon(self, index: int, pokemon: ActivePokemon) -> None:
+        id_of = self.catalog.id_of
+        self.card[index] = id_of(pokemon.card.spec)
+        self.hp[index] = pokemon.hp
+        self.damage[index] = pokemon.damage_counters
+        self.status[index] = EMPTY if pokemon.status is None else _STATUS_CODE[pokemon.status]
+        self.status_turn[index] = EMPTY if pokemon.status_turn is None else pokemon.status_turn
+        self.turn_played[index] = pokemon.turn_played
+        self.tool[index] = EMPTY if pokemon.attached_tool is None else id_of(pokemon.attached_tool.spec)
+        base = index * NUM_ELEMENTS
+        for element, count in pokemon.attached_energies.items():
+            self.energy[base + _ELEMENT_CODE[element]] = count
+
+    def to_game_state(self) -> GameState:
+        """Rebuild a playable GameState (with fresh card objects) from this snapshot."""
+        from .game import Player  # game imports game_state; import here to avoid a cycle
+        catalog = self.catalog
+        state = GameState()
+        if self.rng_state is not None:
+            state.rng.setstate(self.rng_state)
+        state.players = [Player(self.names[player], [card_from_spec(catalog[i]) for i in self.decks[player]],
+                                state, player) for player in (0, 1)]
+        state.current_player_idx = self.current_player
+        state.turn_number = self.turn_number
+        state.supporter_played_this_turn = self.supporter_played
+        for player in (0, 1):
+            state.players[player].hand.extend(card_from_spec(catalog[i]) for i in self.hands[player])
+            state.card_discard_piles[player] = [card_from_spec(catalog[i]) for i in self.discards[player]]
+            state.energy_types[player] = list(self.energy_types[player])
+            state.scores[player] = self.scores[player]
+            state.energy_zones[player] = _element(self.energy_zone[player])
+            state.next_energy[player] = _element(self.next_energy[player])
+            state.retreated_this_turn[player] = bool(self.retreated[player])
+            base = player * NUM_ELEMENTS
+            state.energy_discard_piles[player] = [element for i, element in enumerate(ELEMENTS)
+                                                  for _ in range(self.energy_discard[base + i])]
+            for slot in range(SLOTS_PER_PLAYER):
+                index = player * SLOTS_PER_PLAYER + slot
+                if self.card[index] == EMPTY:
+                    continue
+                pokemon = self._load_pokemon(index)
+                if slot == 0:
+                    state.active_pokemon[player] = pokemon
+                else:
+                    state.benched_pokemon[player].append(pokemon)
+        state.sync_hands_with_players()
+        return state
+
+    def _load_pokemon(self, index: int) -> ActivePokemon:
+        catalog = self.catalog
+        pokemon = ActivePokemon(card_from_spec(catalog[self.card[index]]), self.turn_played[index])
+        pokemon.damage_counters = self.damage[index]
+        if self.status[index] != EMPTY:
+            pokemon.apply_status(STATUSES[self.status[index]], self.status_turn[index])
+        if self.tool[index] != EMPTY:
+            pokemon.attached_tool = card_from_spec(catalog[self.tool[index]])
+        base = index * NUM_ELEMENTS
+        for i, element in enumerate(ELEMENTS):
+            pokemon.attached_energies[element] = self.energy[base + i]
+        return pokemon
+
+    # --- Views --------------------------------------------------------------
+
+    def active(self, player: int) -> Optional[SlotView]:
+        index = player * SLOTS_PER_PLAYER
+        return SlotView(self, index) if self.card[index] != EMPTY else None
+
+    def bench(self, player: int) -> List[SlotView]:
+        base = player * SLOTS_PER_PLAYER
+        return [SlotView(self, index) for index in range(base + 1, base + SLOTS_PER_PLAYER)
+                if self.card[index] != EMPTY]
+
+    def hand(self, player: int) -> List[CardSpec]:
+        return [self.catalog[i] for i in self.hands[player]]
+
+    def card_discard(self, player: int) -> List[CardSpec]:
+        return [self.catalog[i] for i in self.discards[player]]
+
+    def energy_discard_pile(self, player: int) -> List[ElementType]:
+        base = player * NUM_ELEMENTS
+        return [element for i, element in enumerate(ELEMENTS) for _ in range(self.energy_discard[base + i])]
+
+    @property
+    def player_score(self) -> int:
+        return self.scores[0]
+
+    @property
+    def opponent_score(self) -> int:
+        return self.scores[1]
+
+    @property
+    def player_energy_zone(self) -> Optional[ElementType]:
+        return _element(self.energy_zone[0])
+
+    @property
+    def opponent_energy_zone(self) -> Optional[ElementType]:
+        return _element(self.energy_zone[1])
+
+    @property
+    def player_hand(self) -> List[CardSpec]:
+        return self.hand(0)
+
+    @property
+    def opponent_hand(self) -> List[CardSpec]:
+        return self.hand(1)
+
+    @property
+    def player_active(self) -> Optional[SlotView]:
+        return self.active(0)
+
+    @property
+    def opponent_active(self) -> Optional[SlotView]:
+        return self.active(1)
+
+    @property
+    def player_bench(self) -> List[SlotView]:
+        return self.bench(0)
+
+    @property
+    def opponent_bench(self) -> List[SlotView]:
+        return self.bench(1)
+
+    @property
+    def player_card_discard(self) -> List[CardSpec]:
+        return self.card_discard(0)
+
+    @property
+    def opponent_card_discard(self) -> List[CardSpec]:
+        return self.card_discard(1)
+
+    @property
+    def player_energy_discard(self) -> List[ElementType]:
+        return self.energy_discard_pile(0)
+
+    @property
+    def opponent_energy_discard(self) -> List[ElementType]:
+        return self.energy_discard_pile(1)
+
+
+def _element_code(element: Optional[ElementType]) -> int:
+    return EMPTY if element is None else _ELEMENT_CODE[element]
+
+
+def _element(code: int) -> Optional[ElementType]:
+    return None if code == EMPTY else ELEMENTS[code]
@@ -0,0 +1,189 @@
+"""Precomputed attacker-vs-defender damage for every Pokemon in the card list.
+
+For every (attacker, attack, defender) the matrix holds:
+
+    damage               base damage plus the +20 weakness bonus when it applies
+    hits_to_ko           attacks needed to knock out a full-HP defender (NEVER if it can't)
+    energy_turns_to_ko   own turns for an unpowered attacker to score that KO, attaching
+                         one energy a turn and attacking as soon as the cost is paid
+
+Arrays are indexed by row, which for the card list matrix is the card's uid,
+and the attack's index on the card. Like the batch simulator's tables, every
+array has one extra row at the end, so indexing with -1 reads "no card" (no
+damage, never knocks out). Only the printed base damage is used, as in the
+engine; "+" and "x" effects aren't resolved.
+
+The card list matrix is cached on disk next to the card registry snapshot
+(see load_damage_matrix).
+"""
+import hashlib
+import io
+import os
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .card_registry import CACHE_DIR, CARDLIST_PATH, get_registry, load_registry
+from .card_spec import ELEMENT_INDEX, CardSpec
+
+# Bump whenever the arrays change so stale caches are rebuilt
+CACHE_VERSION = 1
+WEAKNESS_BONUS = 20
+NEVER = 255  # hits_to_ko / energy_turns_to_ko of an attack that can't knock the defender out
+
+CardRef = Union[int, CardSpec]
+
+
+class DamageMatrix:
+    """Damage, hits-to-KO and energy-turns-to-KO for every pair of cards in a list.
+
+    Args:
+        specs: The cards, in row order; non-Pokemon rows deal and take no damage
+    """
+
+    ARRAYS = ('hp', 'element', 'weakness', 'attack_damage', 'attack_cost', 'attack_valid',
+              'damage', 'hits_to_ko', 'energy_turns_to_ko')
+
+    def __init__(self, specs: Sequence[CardSpec] = ()):
+        rows = len(specs) + 1
+        num_attacks = max([len(spec.attacks) for spec in specs] + [1])
+        self.hp = np.zeros(rows, np.int16)
+        self.element = np.full(rows, -1, np.int8)
+        self.weakness = np.full(rows, -2, np.int8)  # Never equal to any element, or to "no element"
+        self.attack_damage = np.zeros((rows, num_attacks), np.int16)
+        self.attack_cost = np.zeros((rows, num_attacks), np.int8)
+        self.attack_valid = np.zeros((rows, num_attacks), bool)
+        for row, spec in enumerate(specs):
+            if spec.kind != 'pokemon':
+                continue
+            self.hp[row] = spec.hp
+            if spec.element_type is not None:
+                self.element[row] = ELEMENT_INDEX[spec.element_type]
+            if spec.weakness_type is not None:
+                self.weakness[row] = ELEMENT_INDEX[spec.weakness_type]
+            for attack_idx, attack in enumerate(spec.attacks):
+                self.attack_damage[row, attack_idx] = attack.damage_spec.base
+                self.attack_cost[row, attack_idx] = attack.total_cost
+                self.attack_valid[row, attack_idx] = True
+        self._derive()
+
+    def _derive(self) -> None:
+        """Fill the attacker x attack x defender arrays from the per-card ones."""
+        weak = self.weakness[None, None, :] == self.element[:, None, None]
+        damage = self.attack_damage[:, :, None] + WEAKNESS_BONUS * weak
+        self.damage = np.where(self.attack_valid[:, :, None], damage, 0).astype(np.int16)
+        hp = self.hp[None, None, :].astype(np.int32)
+        can_ko = (self.damage > 0) & (hp > 0)
+        hits = -(-hp // np.maximum(self.damage, 1))  # Ceiling division
+        self.hits_to_ko = np.where(can_ko, np.minimum(hits, NEVER - 1), NEVER).astype(np.uint8)
+        # Energy goes on one a turn; the first attack comes once the cost is paid, then one every turn
+        turns = np.maximum(self.attack_cost, 1)[:, :, None].astype(np.int32) + hits - 1
+        self.energy_turns_to_ko = np.where(can_ko, np.minimum(turns, NEVER - 1), NEVER).astype(np.uint8)
+
+    def __len__(self) -> int:
+        """Number of cards (not counting the "no card" row)."""
+        return len(self.hp) - 1
+
+    @staticmethod
+    def row(card: CardRef) -> int:
+        """Row of a card; a spec's row is its uid, so specs only index the card list matrix."""
+        if not isinstance(card, CardSpec):
+            return int(card)
+        if card.uid < 0:
+            raise KeyError(f"{card.name} is not from the card list")
+        return card.uid
+
+    def effective_damage(self, attacker: CardRef, attack_idx: int, defender: CardRef) -> int:
+        return int(self.damage[self.row(attacker), attack_idx, self.row(defender)])
+
+    def hits(self, attacker: CardRef, attack_idx: int, defender: CardRef) -> int:
+        """Attacks needed to knock out the defender from full HP, or NEVER."""
+        return int(self.hits_to_ko[self.row(attacker), attack_idx, self.row(defender)])
+
+    def energy_turns(self, attacker: CardRef, attack_idx: int, defender: CardRef) -> int:
+        """Turns from an unpowered attacker to knocking out the defender, or NEVER."""
+        return int(self.energy_turns_to_ko[self.row(attacker), attack_idx, self.row(defender)])
+
+    def best_attack(self, attacker: CardRef, defender: CardRef) -> Tuple[int, int]:
+        """(attack index, hits to KO) of the attack that knocks the defender out fastest."""
+        hits = self.hits_to_ko[self.row(attacker), :, self.row(defender)]
+        attack_idx = int(hits.argmin())
+        return attack_idx, int(hits[attack_idx])
+
+    def matchup(self, attackers: Sequence[CardRef], defenders: Sequence[CardRef],
+                energy: bool = False) -> np.ndarray:
+        """Fewest hits (or energy turns) to KO, over each attacker's attacks, as an [attackers, defenders] array."""
+        table = self.energy_turns_to_ko if energy else self.hits_to_ko
+        rows = np.array([self.row(card) for card in attackers], np.intp)
+        cols = np.array([self.row(card) for card in defenders], np.intp)
+        return table[rows[:, None], :, cols[None, :]].min(axis=-1)
+
+    def _snapshot(self) -> dict:
+        return {name: getattr(self, name) for name in self.ARRAYS}
+
+    @classmethod
+    def _from_snapshot(cls, arrays) -> 'DamageMatrix':
+        matrix = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(matrix, name, arrays[name])
+        return matrix
+
+
+_matrix: Optional[DamageMatrix] = None
+
+
+def _cache_path(path: str, cache_dir: str) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-damage-v{CACHE_VERSION}.npz")
+
+
+def load_damage_matrix(path: str = CARDLIST_PATH, cache_dir: Optional[str] = CACHE_DIR) -> DamageMatrix:
+    """Load the card list's damage matrix, preferring the cached arrays over rebuilding them.
+
+    The cache is keyed on the card list's content hash; failures (missing,
+    corrupt, unwritable) just fall back to building the matrix.
+
+    Args:
+        path: Path to CardList.json
+        cache_dir: Directory for the cache, or None to disable it
+    """
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    cache_file = None if cache_dir is None else _cache_path(path, cache_dir)
+    if cache_file is not None:
+        try:
+            with np.load(cache_file) as arrays:
+                if str(arrays['digest']) == digest:
+                    return DamageMatrix._from_snapshot({name: arrays[name] for name in DamageMatrix.ARRAYS})
+        except (OSError, KeyError, ValueError, EOFError):
+            pass
+    registry = get_registry() if path == CARDLIST_PATH else load_registry(path, cache_dir)
+    matrix = DamageMatrix(registry.specs(range(len(registry))))
+    if cache_file is not None:
+        _write_cache(cache_file, matrix, digest)
+    return matrix
+
+
+def _write_cache(cache_file: str, matrix: DamageMatrix, digest: str) -> None:
+    buffer = io.BytesIO()
+    np.savez(buffer, digest=np.array(digest), **matrix._snapshot())
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(tmp_file, 'wb') as f:
+            f.write(buffer.getbuffer())
+        # Atomic so concurrent workers never see a half-written cache
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+
+
+def get_damage_matrix() -> DamageMatrix:
+    """Get the process-wide damage matrix for the card list, loading it on first access."""
+    global _matrix
+    if _matrix is None:
+        _matrix = load_damage_matrix()
+    return _matrix
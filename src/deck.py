@@ -1,9 +1,34 @@
 """Deck implementation."""
-from typing import List, Set
+from typing import Iterable, List, Optional, Set, Tuple
 from collections import Counter
+from hashlib import blake2b
 import random
 from .cards import Card
+from .card_spec import CardSpec
 from .pokemon import Pokemon, ElementType
+from .trainer import Item, Supporter, Tool
+
+_CARD_CLASSES = {'pokemon': Pokemon, 'item': Item, 'supporter': Supporter, 'tool': Tool}
+
+def card_from_spec(spec: CardSpec) -> Card:
+    """Create a playable card instance that shares the given spec."""
+    return _CARD_CLASSES.get(spec.kind, Item)(spec)
+
+def _card_signature(spec: CardSpec) -> str:
+    """A card's identity and every compiled stat that plays a part in games."""
+    attacks = ";".join(f"{attack.name}/{','.join(e.name for e in attack.cost)}/{attack.damage}/{attack.target}"
+                       for attack in spec.attacks)
+    element = spec.element_type.name if spec.element_type is not None else ''
+    return (f"{spec.uid}:{spec.name}:{spec.kind}:{spec.evolution_type}:{spec.evolves_from}:{spec.hp}:"
+            f"{element}:{spec.weakness}:{spec.retreat_cost}:{spec.is_ex}:{attacks}")
+
+
+def deck_fingerprint(specs: Iterable[CardSpec], energy_types: Iterable[ElementType]) -> int:
+    """Order-independent 64-bit hash of a deck list (with each card's stats) and its energy types."""
+    cards = sorted(_card_signature(spec) for spec in specs)
+    energy = sorted(element.name for element in energy_types)
+    digest = blake2b("|".join(cards + ["#"] + energy).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
 
 class Deck:
     def __init__(self, cards: List[Card], energy_types: List[ElementType]):
@@ -30,6 +55,25 @@ class Deck:
         
         self.cards = cards
         self.energy_types = energy_types
+
+    @classmethod
+    def from_specs(cls, specs: Iterable[CardSpec], energy_types: List[ElementType]) -> 'Deck':
+        """Build a deck whose cards reference shared, pre-compiled specs."""
+        return cls([card_from_spec(spec) for spec in specs], energy_types)
+
+    def copy(self) -> 'Deck':
+        """Fresh, unplayed card instances for the same specs (cards carry no game state, specs are shared)."""
+        return Deck([card_from_spec(card.spec) for card in self.cards], list(self.energy_types))
+
+    @property
+    def fingerprint(self) -> int:
+        """64-bit hash of the deck list (in any order) and energy types, for keying results by deck."""
+        return deck_fingerprint(self.specs, self.energy_types)
+
+    @property
+    def specs(self) -> Tuple[CardSpec, ...]:
+        """The compiled spec behind each card still in the deck."""
+        return tuple(card.spec for card in self.cards)
         
     def _validate_deck_size(self, cards: List[Card]) -> bool:
         """Check if deck has exactly 20 cards."""
@@ -45,10 +89,13 @@ class Deck:
         return any(isinstance(card, Pokemon) and card.evolution_type == 'Basic'
                   for card in cards)
                   
-    def shuffle(self) -> None:
-        """Shuffle the deck."""
-        import random
-        random.shuffle(self.cards)
+    def shuffle(self, rng: Optional[random.Random] = None) -> None:
+        """Shuffle the deck.
+
+        Args:
+            rng: Per-game RNG; defaults to the global random module
+        """
+        (rng or random).shuffle(self.cards)
         
     def draw(self) -> Card:
         """Draw a card from the top of the deck.
@@ -63,13 +110,16 @@ class Deck:
             raise IndexError("Cannot draw from empty deck")
         return self.cards.pop()
     
-    def draw_random_energy(self) -> ElementType:
+    def draw_random_energy(self, rng: Optional[random.Random] = None) -> ElementType:
         """Draw a random energy type from the deck's available energy types.
-        
+
+        Args:
+            rng: Per-game RNG; defaults to the global random module
+
         Returns:
             ElementType: A random energy type from this deck's energy_types
         """
-        return random.choice(self.energy_types)
+        return (rng or random).choice(self.energy_types)
         
     def __len__(self) -> int:
         """Get number of cards remaining in deck."""
@@ -1,68 +1,59 @@
-import json
-import os
-from src.pokemon import Pokemon
 from src.deck import Deck
 from src.elementTypes import ElementType
+from src.card_registry import CARDLIST_PATH, Q, get_registry
 
-CARDLIST_PATH = os.path.join(os.path.dirname(__file__), '../resources/CardList.json')
-
-# Load and cache the card list once
-with open(CARDLIST_PATH, encoding='utf-8') as f:
-    CARD_LIST = json.load(f)
+def __getattr__(name):
+    # REGISTRY and CARD_LIST are loaded on first access rather than at import time
+    if name == 'REGISTRY':
+        return get_registry()
+    if name == 'CARD_LIST':
+        return get_registry().cards
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_pokemon_by_name(name):
     """Retrieve a Pokémon card dict by name from the loaded card list."""
-    for card in CARD_LIST:
-        if card.get('name', '').lower() == name.lower() and card.get('card_type', '').startswith('Pokémon'):
-            return card
-    return None
+    return get_registry().get_pokemon_by_name(name)
+
+def get_pokemon_by_criteria(criteria_fn=None, limit=1, **indexed):
+    """Retrieve Pokémon cards matching a criteria function.
 
-def get_pokemon_by_criteria(criteria_fn, limit=1):
-    """Retrieve Pokémon cards matching a criteria function."""
-    results = []
-    for card in CARD_LIST:
-        if card.get('card_type', '').startswith('Pokémon') and criteria_fn(card):
-            results.append(card)
-            if len(results) >= limit:
-                break
-    return results
+    Keyword arguments (e.g. ``type='Fire'``, ``evolution_type='Basic'``) are
+    answered from the registry indexes, so ``criteria_fn`` only has to look at
+    the cards that survive them.
+    """
+    query = Q(kind='pokemon', **indexed)
+    if criteria_fn is not None:
+        query = query.where(criteria_fn)
+    return get_registry().query(query, limit=limit)
 
 def create_real_test_deck():
     """Create a test deck of 20 Pokémon cards with duplicate evolution chains for testing evolution."""
+    registry = get_registry()
     # Hardcode two evolution chains: Charmander -> Charmeleon -> Charizard and Bulbasaur -> Ivysaur -> Venusaur
-    chain1 = [
-        get_pokemon_by_name('Charmander'),
-        get_pokemon_by_name('Charmeleon'),
-        get_pokemon_by_name('Charizard'),
-    ]
-    chain2 = [
-        get_pokemon_by_name('Bulbasaur'),
-        get_pokemon_by_name('Ivysaur'),
-        get_pokemon_by_name('Venusaur'),
-    ]
+    chain1 = ['Charmander', 'Charmeleon', 'Charizard']
+    chain2 = ['Bulbasaur', 'Ivysaur', 'Venusaur']
     # Add two copies of each card in both chains
     selected = []
-    for card in chain1 + chain2:
-        if card:
-            selected.extend([card, card])
+    for name in chain1 + chain2:
+        selected.extend(registry.query_uids(Q(kind='pokemon', name=name), limit=1) * 2)
     # Fill to 20 cards with other basics if needed
     if len(selected) < 20:
-        other_basics = get_pokemon_by_criteria(lambda c: c.get('evolution_type') == 'Basic' and c.get('name') not in [c['name'] for c in selected], 20 - len(selected))
+        selected_names = {registry.spec(uid).name for uid in selected}
+        other_basics = registry.query_uids(
+            Q(kind='pokemon', evolution_type='Basic').where(lambda c: c.get('name') not in selected_names),
+            limit=20 - len(selected))
         selected.extend(other_basics)
-    # Build deck_cards with up to 2 copies per card
+    # Build deck_cards with up to 2 copies per card, all sharing the registry's compiled specs
     name_counts = {}
-    deck_cards = []
-    for card in selected:
-        name = card.get('name', 'Unknown')
-        if name_counts.get(name, 0) < 2:
-            deck_cards.append(Pokemon(card_data=card))
-            name_counts[name] = name_counts.get(name, 0) + 1
-        if len(deck_cards) >= 20:
+    deck_specs = []
+    for spec in registry.specs(selected):
+        if name_counts.get(spec.name, 0) < 2:
+            deck_specs.append(spec)
+            name_counts[spec.name] = name_counts.get(spec.name, 0) + 1
+        if len(deck_specs) >= 20:
             break
-    # Use all element types found in the deck for energy
-    energy_types = list({card.get('type') for card in selected if card.get('type')})
+    # Use all element types found in the deck for energy (in deck order, so seeded games are reproducible)
+    energy_types = list(dict.fromkeys(spec.element_type for spec in deck_specs))
     if not energy_types:
         energy_types = [ElementType.FIRE, ElementType.GRASS]
-    if energy_types:
-        energy_types = [ElementType[type_str.upper()] for type_str in energy_types if type_str.upper() in ElementType.__members__]
-    return Deck(deck_cards, energy_types)
+    return Deck.from_specs(deck_specs, energy_types)
@@ -0,0 +1,330 @@
+"""Genetic search for strong 20-card decks.
+
+A candidate deck is a sorted tuple of card registry uids; its energy types
+follow from the colored energy its attacks cost. Every candidate satisfies
+the Deck rules (20 cards, at most 2 copies per name, at least one Basic)
+and a rule the engine doesn't enforce but play needs: an evolution is only
+in the deck together with the Pokemon it evolves from.
+
+Decks are built from evolution lines (a Basic and the Stage 1/Stage 2
+cards above it). Mutation swaps whole lines or reshuffles single copies,
+crossover mixes the lines of two parents, and ``repair`` restores the rules
+afterwards. Fitness is the score against a gauntlet of fixed decks, played
+headless on the TournamentRunner's process pool; every deck's fitness is
+cached by its fingerprint, so a deck is only simulated once per run.
+"""
+import random
+import time
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .card_registry import Q, get_registry
+from .card_spec import CardSpec
+from .deck import Deck, deck_fingerprint
+from .elementTypes import ElementType
+from .result_store import ResultStore
+from .tournament import DeckEntry, TournamentRunner
+
+DECK_SIZE = 20
+MAX_COPIES = 2
+MAX_ENERGY_TYPES = 3
+
+DeckList = Tuple[int, ...]
+
+
+def energy_types_for(specs: Iterable[CardSpec]) -> List[ElementType]:
+    """The colored energy a deck's attacks cost, most needed first (at most MAX_ENERGY_TYPES)."""
+    specs = list(specs)
+    needed = Counter()
+    for spec in specs:
+        for attack in spec.attacks:
+            for element, count in attack.colored_cost:
+                needed[element] += count
+    types = [element for element, _ in needed.most_common(MAX_ENERGY_TYPES)]
+    if not types:
+        # Colorless-only decks can use any energy; take the Pokemon's own types
+        types = list(dict.fromkeys(spec.element_type for spec in specs if spec.element_type
+                                   is not ElementType.COLORLESS))[:MAX_ENERGY_TYPES]
+    return types or [ElementType.COLORLESS]
+
+
+class GenerationStats(NamedTuple):
+    generation: int
+    best: float
+    mean: float
+    simulated: int    # Decks simulated this generation
+    cache_hits: int   # Decks whose fitness came from the cache
+    elapsed: float
+
+
+class OptimizationReport:
+    """The best deck found and per-generation progress."""
+
+    def __init__(self, best: DeckList, fitness: float, history: List[GenerationStats]):
+        self.best = best
+        self.fitness = fitness
+        self.history = history
+
+    def best_deck(self) -> Deck:
+        specs = get_registry().specs(self.best)
+        return Deck.from_specs(specs, energy_types_for(specs))
+
+    def summary(self) -> str:
+        lines = [f"gen {stats.generation}: best {stats.best:.1%}, mean {stats.mean:.1%}, "
+                 f"{stats.simulated} simulated, {stats.cache_hits} cached, {stats.elapsed:.1f}s"
+                 for stats in self.history]
+        counts = Counter(spec.name for spec in get_registry().specs(self.best))
+        lines.append(f"Best deck ({self.fitness:.1%}): " + ", ".join(f"{count}x {name}" for name, count in counts.items()))
+        return "\n".join(lines)
+
+
+class DeckOptimizer:
+    """Evolves decks that score well against a gauntlet.
+
+    Args:
+        gauntlet: Decks every candidate plays against
+        population: Candidates per generation
+        elite: Best candidates copied unchanged into the next generation
+        games_per_matchup: Games a candidate plays against each gauntlet deck
+        mutation_rate: Chance a child is mutated after crossover
+        pool: Card uids the search may use; defaults to every Pokemon in the registry
+        workers: Simulation processes (see TournamentRunner; 0 plays in-process)
+        chunk_size: Games per task sent to a worker
+        max_turns: Turn cap per game
+        seed: Seeds both the search and the games, so a run can be repeated
+        store: Result store, so games from earlier runs with the same seed are not played again
+    """
+
+    def __init__(self, gauntlet: Sequence[DeckEntry], population: int = 24, elite: int = 2,
+                 games_per_matchup: int = 40, mutation_rate: float = 0.8, pool: Optional[Iterable[int]] = None,
+                 workers: Optional[int] = None, chunk_size: int = 20, max_turns: Optional[int] = None,
+                 seed: Optional[int] = None, store: Optional[ResultStore] = None):
+        if not gauntlet:
+            raise ValueError("The gauntlet needs at least one deck")
+        self.gauntlet = list(gauntlet)
+        self.population = population
+        self.elite = elite
+        self.games_per_matchup = games_per_matchup
+        self.mutation_rate = mutation_rate
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_turns = max_turns
+        self.rng = random.Random(seed)
+        self.seed = self.rng.getrandbits(63)
+        self.store = store
+        self.cache: Dict[int, float] = {}
+
+        registry = get_registry()
+        uids = registry.query_uids(Q(kind='pokemon')) if pool is None else sorted(set(pool))
+        self.specs: Dict[int, CardSpec] = {uid: registry.spec(uid) for uid in uids}
+        self.basics = [uid for uid, spec in self.specs.items() if spec.evolution_type == 'Basic']
+        if not self.basics:
+            raise ValueError("The card pool has no Basic Pokemon")
+        # Lower-cased name -> uids of the pool's cards that evolve from it
+        self.evolutions: Dict[str, List[int]] = {}
+        # Lower-cased name -> the name it evolves from (Basics are absent)
+        self._parent: Dict[str, str] = {}
+        for uid, spec in self.specs.items():
+            if spec.evolves_from and spec.evolution_type != 'Basic':
+                self.evolutions.setdefault(spec.evolves_from, []).append(uid)
+                self._parent[spec.name.lower()] = spec.evolves_from
+        self._roots: Dict[int, str] = {}
+        # Only names on a line up from one of the pool's Basics can be played
+        playable = {self._name(uid) for uid in self.basics}
+        stack = list(playable)
+        while stack:
+            for uid in self.evolutions.get(stack.pop(), ()):
+                if self._name(uid) not in playable:
+                    playable.add(self._name(uid))
+                    stack.append(self._name(uid))
+        if len(playable) * MAX_COPIES < DECK_SIZE:
+            raise ValueError(f"The card pool is too small to build a deck: {len(playable)} playable names, "
+                             f"{-(-DECK_SIZE // MAX_COPIES)} needed")
+
+    # --- Deck structure -------------------------------------------------------
+
+    def _name(self, uid: int) -> str:
+        return self.specs[uid].name.lower()
+
+    def root(self, uid: int) -> str:
+        """Lower-cased name of the Basic at the bottom of a card's evolution line."""
+        root = self._roots.get(uid)
+        if root is None:
+            root = self._name(uid)
+            seen = {root}
+            while root in self._parent and self._parent[root] not in seen:
+                root = self._parent[root]
+                seen.add(root)
+            self._roots[uid] = root
+        return root
+
+    def lines(self, deck: Sequence[int]) -> Dict[str, List[int]]:
+        """Group a deck's cards by the root of their evolution line."""
+        grouped: Dict[str, List[int]] = {}
+        for uid in deck:
+            grouped.setdefault(self.root(uid), []).append(uid)
+        return grouped
+
+    def random_line(self) -> List[int]:
+        """A random Basic with up to two copies and, sometimes, evolutions above it."""
+        basic = self.rng.choice(self.basics)
+        line = [basic] * self.rng.randint(1, MAX_COPIES)
+        stage = basic
+        while self.rng.random() < 0.6:
+            options = self.evolutions.get(self._name(stage))
+            if not options:
+                break
+            stage = self.rng.choice(options)
+            line += [stage] * self.rng.randint(1, MAX_COPIES)
+        return line
+
+    def repair(self, deck: Iterable[int]) -> DeckList:
+        """Make any card list a legal, playable 20-card deck (sorted, canonical)."""
+        rng = self.rng
+        cards = [uid for uid in deck if uid in self.specs]
+        rng.shuffle(cards)
+        # At most MAX_COPIES of each name
+        kept, copies = [], Counter()
+        for uid in cards:
+            if copies[self._name(uid)] < MAX_COPIES:
+                kept.append(uid)
+                copies[self._name(uid)] += 1
+        # Evolutions need what they evolve from (repeat for Stage 2 above a dropped Stage 1)
+        while True:
+            names = {self._name(uid) for uid in kept}
+            orphans = [uid for uid in kept if self.specs[uid].evolution_type != 'Basic'
+                       and self.specs[uid].evolves_from not in names]
+            if not orphans:
+                break
+            kept = [uid for uid in kept if uid not in orphans]
+        # Trim: drop cards nothing else in the deck depends on, keeping a Basic
+        while len(kept) > DECK_SIZE:
+            counts = Counter(self._name(uid) for uid in kept)
+            needed = {self.specs[uid].evolves_from for uid in kept if self.specs[uid].evolution_type != 'Basic'}
+            basics = sum(self.specs[uid].evolution_type == 'Basic' for uid in kept)
+            removable = [i for i, uid in enumerate(kept)
+                         if (counts[self._name(uid)] > 1 or self._name(uid) not in needed)
+                         and not (basics == 1 and self.specs[uid].evolution_type == 'Basic')]
+            kept.pop(rng.choice(removable))
+        # Fill: another copy, an evolution of something in the deck, or a new Basic
+        while len(kept) < DECK_SIZE:
+            counts = Counter(self._name(uid) for uid in kept)
+            choice = rng.random()
+            if choice < 0.4 and kept:
+                candidates = [uid for uid in kept if counts[self._name(uid)] < MAX_COPIES]
+            elif choice < 0.7 and kept:
+                candidates = [evolution for uid in kept for evolution in self.evolutions.get(self._name(uid), ())
+                              if counts[self._name(evolution)] < MAX_COPIES]
+            else:
+                candidates = [rng.choice(self.basics)]
+                candidates = [uid for uid in candidates if counts[self._name(uid)] < MAX_COPIES]
+            if candidates:
+                kept.append(rng.choice(candidates))
+            elif not self._can_grow(kept, counts):
+                raise ValueError(f"The card pool cannot fill a {DECK_SIZE}-card deck")
+        return tuple(sorted(kept))
+
+    def _can_grow(self, kept: Sequence[int], counts: Counter) -> bool:
+        """Whether any fill step could still add a card to kept."""
+        evolutions = (evolution for uid in kept for evolution in self.evolutions.get(self._name(uid), ()))
+        return any(counts[self._name(uid)] < MAX_COPIES for uid in chain(kept, evolutions, self.basics))
+
+    def random_deck(self) -> DeckList:
+        cards: List[int] = []
+        while len(cards) < DECK_SIZE:
+            cards += self.random_line()
+        return self.repair(cards)
+
+    # --- Genetic operators ----------------------------------------------------
+
+    def mutate(self, deck: DeckList) -> DeckList:
+        """Swap a whole evolution line for a new one, or drop a few single cards for repair to refill."""
+        cards = list(deck)
+        lines = self.lines(cards)
+        if self.rng.random() < 0.5 and len(lines) > 1:
+            dropped = self.rng.choice(sorted(lines))
+            cards = [uid for uid in cards if self.root(uid) != dropped] + self.random_line()
+        else:
+            for _ in range(self.rng.randint(1, 3)):
+                cards.pop(self.rng.randrange(len(cards)))
+        return self.repair(cards)
+
+    def crossover(self, first: DeckList, second: DeckList) -> DeckList:
+        """Take each evolution line from one parent or the other (lines are never split)."""
+        lines = [self.lines(first), self.lines(second)]
+        cards: List[int] = []
+        for root in sorted(set(lines[0]) | set(lines[1])):
+            parent = lines[self.rng.randrange(2)]
+            cards += parent.get(root, [])
+        return self.repair(cards)
+
+    # --- Fitness --------------------------------------------------------------
+
+    def fingerprint(self, deck: DeckList) -> int:
+        specs = [self.specs[uid] for uid in deck]
+        return deck_fingerprint(specs, energy_types_for(specs))
+
+    def entry(self, deck: DeckList, name: str) -> DeckEntry:
+        specs = [self.specs[uid] for uid in deck]
+        return DeckEntry(name, deck, tuple(element.name for element in energy_types_for(specs)))
+
+    def evaluate(self, decks: Sequence[DeckList]) -> Tuple[List[float], int]:
+        """Fitness of each deck: its score (draws count half) over all gauntlet games.
+
+        Decks not in the cache are simulated together in one tournament.
+
+        Returns:
+            (fitness per deck, number of decks simulated)
+        """
+        keys = [self.fingerprint(deck) for deck in decks]
+        todo = list(dict.fromkeys(key for key in keys if key not in self.cache))
+        if todo:
+            deck_of = dict(zip(keys, decks))
+            entries = self.gauntlet + [self.entry(deck_of[key], f"candidate {i}") for i, key in enumerate(todo)]
+            first = len(self.gauntlet)
+            pairs = [(first + i, g) for i in range(len(todo)) for g in range(first)]
+            runner = TournamentRunner(entries, workers=self.workers, chunk_size=self.chunk_size,
+                                      max_turns=self.max_turns, campaign_seed=self.seed, store=self.store)
+            report = runner.run(pairs, games_per_pair=self.games_per_matchup)
+            for i, key in enumerate(todo):
+                score = games = 0
+                for g in range(first):
+                    stats = report.stats[first + i, g]
+                    score += stats.wins[0] + stats.draws / 2
+                    games += stats.games
+                self.cache[key] = score / games if games else 0.0
+        return [self.cache[key] for key in keys], len(todo)
+
+    def _select(self, ranked: List[Tuple[float, DeckList]]) -> DeckList:
+        """Tournament selection of size 3."""
+        return max(self.rng.sample(ranked, min(3, len(ranked))))[1]
+
+    def run(self, generations: int = 10, initial: Optional[Sequence[DeckList]] = None) -> OptimizationReport:
+        """Evolve the population for some generations and report the best deck seen.
+
+        Args:
+            initial: Starting decks (repaired to the rules); random decks fill the rest
+        """
+        population = [self.repair(deck) for deck in (initial or [])][:self.population]
+        while len(population) < self.population:
+            population.append(self.random_deck())
+        history = []
+        best: Tuple[float, DeckList] = (-1.0, ())
+        for generation in range(generations):
+            start = time.perf_counter()
+            fitness, simulated = self.evaluate(population)
+            ranked = sorted(zip(fitness, population), reverse=True)
+            best = max(best, ranked[0])
+            history.append(GenerationStats(generation, ranked[0][0], sum(fitness) / len(fitness),
+                                           simulated, len(population) - simulated, time.perf_counter() - start))
+            if generation == generations - 1:
+                break
+            children = [deck for _, deck in ranked[:self.elite]]
+            while len(children) < self.population:
+                child = self.crossover(self._select(ranked), self._select(ranked))
+                if self.rng.random() < self.mutation_rate:
+                    child = self.mutate(child)
+                children.append(child)
+            population = children
+        return OptimizationReport(best[1], best[0], history)
@@ -0,0 +1,206 @@
+"""Exact draw probabilities for a deck's card multiset.
+
+Answers "how likely am I to hold X by turn N" in closed form instead of by
+simulating games. A query groups the deck into a few categories (each target,
+split into Basic and non-Basic copies, plus the other Basics and everything
+else) and sums multivariate hypergeometric probabilities over the opening
+hand and the draws after it. The results only depend on those category
+sizes, so they are memoized on them and shared by every deck with the same
+shape; a repeated query is a dictionary lookup.
+
+The opening hand follows Game._perform_initial_draw: five cards, reshuffled
+until the hand holds a Basic, so opening-hand odds are conditioned on at
+least one Basic. The cards after the hand are uniformly random given the
+hand, which is what makes the by-turn odds exact.
+
+Mid-game, an agent can ask about its next draws from the cards it knows are
+left (the deck list minus hand, discards and cards in play; see for_player
+and without).
+"""
+from collections import Counter
+from functools import lru_cache
+from math import comb
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple, Union, TYPE_CHECKING
+
+from .card_spec import CardSpec
+
+if TYPE_CHECKING:
+    from .game_state import GameState
+
+OPENING_HAND = 5
+
+# A target is a card name, a spec (matched by name) or a collection of them (any counts)
+Target = Union[str, CardSpec, Iterable[Union[str, CardSpec]]]
+
+
+def hypergeometric(population: int, successes: int, draws: int, k: int) -> float:
+    """P(exactly k successes) drawing without replacement."""
+    if k < 0 or k > successes or draws - k > population - successes or k > draws:
+        return 0.0
+    return comb(successes, k) * comb(population - successes, draws - k) / comb(population, draws)
+
+
+def _compositions(counts: Tuple[int, ...], n: int) -> Iterator[Tuple[int, ...]]:
+    """Every way to take n cards from categories of the given sizes."""
+    if len(counts) == 1:
+        if n <= counts[0]:
+            yield (n,)
+        return
+    room = sum(counts[1:])
+    for k in range(max(0, n - room), min(counts[0], n) + 1):
+        for rest in _compositions(counts[1:], n - k):
+            yield (k,) + rest
+
+
+@lru_cache(maxsize=None)
+def _joint(counts: Tuple[int, ...], n: int) -> Tuple[Tuple[Tuple[int, ...], float], ...]:
+    """Multivariate hypergeometric table: (cards taken per category, probability) for n draws."""
+    total = comb(sum(counts), n)
+    table = []
+    for taken in _compositions(counts, n):
+        ways = 1
+        for count, k in zip(counts, taken):
+            ways *= comb(count, k)
+        table.append((taken, ways / total))
+    return tuple(table)
+
+
+@lru_cache(maxsize=None)
+def _reach(counts: Tuple[int, ...], rest: int, draws: int, need: Tuple[int, ...]) -> float:
+    """P(drawing at least need[i] from every category i) in draws cards from counts plus rest others."""
+    if all(k <= 0 for k in need):
+        return 1.0
+    draws = min(draws, sum(counts) + rest)
+    return sum(p for taken, p in _joint(counts + (rest,), draws)
+               if all(k >= required for k, required in zip(taken, need)))
+
+
+@lru_cache(maxsize=None)
+def _probability(groups: Tuple[Tuple[int, int], ...], need: Tuple[int, ...], basics: int, others: int,
+                 hand: int, draws: int) -> float:
+    """P(at least need[g] of every group after a Basic-guaranteed hand of size hand and draws more cards).
+
+    Args:
+        groups: (Basic copies, non-Basic copies) of each target
+        basics: Basics that are in no target
+        others: Everything else
+        hand: Opening hand size, 0 for no opening hand (no Basic guarantee)
+    """
+    counts = tuple(count for group in groups for count in group) + (basics, others)
+    size = sum(counts)
+    hit = kept = 0.0
+    for taken, p in _joint(counts, min(hand, size)):
+        if hand and not (sum(taken[0:-2:2]) + taken[-2]):
+            continue  # No Basic: the hand is reshuffled
+        kept += p
+        held = [taken[2 * g] + taken[2 * g + 1] for g in range(len(groups))]
+        left = tuple(sum(group) - k for group, k in zip(groups, held))
+        hit += p * _reach(left, size - hand - sum(left), draws, tuple(n - k for n, k in zip(need, held)))
+    if not kept:
+        raise ValueError("the deck has no Basic Pokemon to open with")
+    return hit / kept
+
+
+class DrawOdds:
+    """Draw probabilities for a multiset of cards.
+
+    Args:
+        specs: The specs (or cards) left to draw from
+        opening: True for a full deck that still has the opening hand to draw,
+            False for the cards left in a deck mid-game
+    """
+
+    def __init__(self, specs: Iterable[CardSpec], opening: bool = True):
+        specs = [getattr(spec, 'spec', spec) for spec in specs]
+        self.counts: Counter = Counter(spec.name for spec in specs)
+        self.basics = frozenset(spec.name for spec in specs if spec.is_basic)
+        self.size = len(specs)
+        self.opening = opening
+        self._specs = specs
+
+    @classmethod
+    def for_deck(cls, deck) -> 'DrawOdds':
+        """Odds for a deck before the game starts."""
+        return cls(deck.specs)
+
+    @classmethod
+    def for_player(cls, state: 'GameState', player_idx: int) -> 'DrawOdds':
+        """Odds for a player's next draws, from the cards left in their deck.
+
+        Only the deck's contents are used, never its order, and those are known
+        to the player: the deck list minus hand, discards and cards in play.
+        """
+        return cls((card.spec for card in state.players[player_idx].deck), opening=False)
+
+    def without(self, cards: Iterable) -> 'DrawOdds':
+        """Odds for the cards left once the given cards (hand, discards, in play) are out of the deck."""
+        seen = Counter(getattr(card, 'spec', card).name for card in cards)
+        left = []
+        for spec in self._specs:
+            if seen[spec.name]:
+                seen[spec.name] -= 1
+            else:
+                left.append(spec)
+        return DrawOdds(left, opening=False)
+
+    def _names(self, target: Target) -> frozenset:
+        if isinstance(target, (str, CardSpec)):
+            target = (target,)
+        return frozenset(item if isinstance(item, str) else item.name for item in target)
+
+    def _shape(self, targets: Mapping) -> Tuple[Tuple[Tuple[int, int], ...], Tuple[int, ...], int, int]:
+        groups, need, used = [], [], set()
+        for target, at_least in targets.items():
+            names = self._names(target) - used
+            used |= names
+            basic = sum(self.counts[name] for name in names if name in self.basics)
+            groups.append((basic, sum(self.counts[name] for name in names) - basic))
+            need.append(at_least)
+        basics = sum(self.counts[name] for name in self.basics - used)
+        return tuple(groups), tuple(need), basics, self.size - sum(map(sum, groups)) - basics
+
+    def probability(self, target: Target, at_least: int = 1, draws: int = 0) -> float:
+        """P(holding at least at_least copies of target after the opening hand (if any) and draws more cards)."""
+        return self.probability_all({target: at_least}, draws)
+
+    def probability_all(self, targets: Mapping, draws: int = 0) -> float:
+        """P(holding at least the given number of every target at once), e.g. {"Charmander": 1, "Charmeleon": 1}.
+
+        A name listed under several targets counts for the first only.
+        """
+        groups, need, basics, others = self._shape(targets)
+        hand = min(OPENING_HAND, self.size) if self.opening else 0
+        return _probability(groups, need, basics, others, hand, max(0, min(draws, self.size - hand)))
+
+    def distribution(self, target: Target, draws: int = 0) -> List[float]:
+        """P(holding exactly k copies of target) for k = 0, 1, ..., copies in the deck."""
+        copies = sum(self.counts[name] for name in self._names(target))
+        tail = [self.probability(target, k, draws) for k in range(copies + 2)]
+        return [tail[k] - tail[k + 1] for k in range(copies + 1)]
+
+    def opening_hand(self, target: Target, at_least: int = 1) -> float:
+        """P(at least at_least copies of target in the (Basic-guaranteed) opening hand)."""
+        return self.probability(target, at_least)
+
+    @staticmethod
+    def draws_by_turn(turn: int, first: bool) -> int:
+        """Cards drawn after the opening hand by the start of the player's turn-th turn (1-based).
+
+        Nobody draws on the first turn of the game, so the player going first
+        is one card behind.
+        """
+        return turn - 1 if first else turn
+
+    def by_turn(self, target: Target, turn: int, first: bool = True, at_least: int = 1) -> float:
+        """P(having drawn at least at_least copies of target by the start of the player's turn-th turn)."""
+        return self.probability(target, at_least, self.draws_by_turn(turn, first))
+
+    def mulligan_rate(self) -> float:
+        """Chance that a five-card hand has no Basic and is reshuffled."""
+        basics = sum(self.counts[name] for name in self.basics)
+        return hypergeometric(self.size, basics, min(OPENING_HAND, self.size), 0)
+
+    def summary(self, turns: int = 3, first: bool = True) -> Dict[str, List[float]]:
+        """By-turn odds of drawing at least one of each card name, for turns 0 (opening hand) to turns."""
+        return {name: [self.by_turn(name, turn, first) if turn else self.opening_hand(name)
+                       for turn in range(turns + 1)] for name in sorted(self.counts)}
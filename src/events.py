@@ -0,0 +1,52 @@
+"""Game event kinds for replay logging.
+
+While ``GameState.event_log`` is a list, the engine appends every event
+to it as a flat run of small ints: the kind, then a fixed number of
+arguments (``ARITY``). Cards are written as ``card_code`` (registry uid + 1,
+0 for cards that aren't in the registry) and energy as ``element_code``.
+
+    (SETUP_HAND, player, mulligans, card x 5)  opening hand after redraws
+    (SETUP_ACTIVE, player, card)
+    (SETUP_BENCH, player, card)
+    (FIRST_PLAYER, player)
+    (TURN, player, turn_number)                start of a turn
+    (ENERGY, player, zone, next)               energy zone refill and next-energy draw
+    (DRAW, player, card)
+    (PLAY_BASIC, player, card, slot)
+    (EVOLVE, player, card, slot)
+    (ATTACH, player, slot, element)
+    (RETREAT, player, bench_idx)
+    (ATTACK, player, attack_idx)
+    (DAMAGE, player, slot, amount)             player owns the damaged Pokemon
+    (KNOCKOUT, player, slot, points)
+    (PROMOTE, player, bench_idx)
+
+Board slots are 0 for the Active spot and 1-3 for the bench, as in src.actions.
+"""
+from typing import Optional
+
+from .card_spec import ELEMENT_INDEX, CardSpec
+from .elementTypes import ElementType
+
+(SETUP_HAND, SETUP_ACTIVE, SETUP_BENCH, FIRST_PLAYER, TURN, ENERGY, DRAW, PLAY_BASIC, EVOLVE,
+ ATTACH, RETREAT, ATTACK, DAMAGE, KNOCKOUT, PROMOTE) = range(15)
+KIND_NAMES = ('setup_hand', 'setup_active', 'setup_bench', 'first_player', 'turn', 'energy', 'draw',
+              'play_basic', 'evolve', 'attach', 'retreat', 'attack', 'damage', 'knockout', 'promote')
+ARITY = (7, 2, 2, 1, 2, 3, 2, 3, 3, 3, 2, 2, 3, 3, 2)
+
+ELEMENTS = tuple(ELEMENT_INDEX)
+NO_ELEMENT = len(ELEMENTS)
+# Keyed by the member's value: Enum.__hash__ runs in Python, str hashes are cached
+_ELEMENT_CODES = {element._value_: code for element, code in ELEMENT_INDEX.items()}
+
+
+def card_code(spec: CardSpec) -> int:
+    return spec.uid + 1
+
+
+def element_code(element: Optional[ElementType]) -> int:
+    return NO_ELEMENT if element is None else _ELEMENT_CODES[element._value_]
+
+
+def element_of(code: int) -> Optional[ElementType]:
+    return None if code == NO_ELEMENT else ELEMENTS[code]
@@ -6,9 +6,18 @@ from .game_state import GameState
 from .pokemon import Pokemon
 from .board_view import BoardView
 from .deck import Deck
+from .actions import (ATTACH_ENERGY, ATTACK, END_TURN, EVOLVE, PLAY_BASIC, RETREAT, Action,
+                      apply_action, legal_actions)
+from .agents import Agent, GreedyAgent
+from .rng import GameRandom
+from .spectator import Spectator
+from . import events
 import string
 import time
 
+# Turn cap for non-interactive games, so two decks that can't damage each other still finish
+DEFAULT_MAX_TURNS = 200
+
 class Player:
     def __init__(self, name: str, deck: List[Card], game_state=None, player_idx=None):
         self.name = name
@@ -52,10 +61,35 @@ class _FallbackDeck:
         self.energy_types = [e for e in ElementType]
 
 class Game:
-    def __init__(self, player1_name: str, player1_deck, player2_name: str, player2_deck, manual: bool = True):
-        self.state = GameState()
-        self.manual = manual
-        self.board_view = BoardView() if manual else None
+    def __init__(self, player1_name: str, player1_deck, player2_name: str, player2_deck, manual: bool = True,
+                 headless: bool = False, agents: Optional[List[Agent]] = None, max_turns: Optional[int] = None,
+                 seed: Optional[int] = None, rng: Optional[random.Random] = None,
+                 spectator: Optional[Spectator] = None):
+        """Set up a game between two players.
+
+        Args:
+            manual: Both players pick their moves from keyboard menus
+            headless: Run without any console output, board rendering, sleeps or prompts
+                (implies manual=False)
+            agents: Decision callbacks for each player when not manual; defaults to GreedyAgent
+            max_turns: End the game as a draw (run() returns 0) after this many turns;
+                non-manual games default to DEFAULT_MAX_TURNS
+            seed: Seed for the game's RNG (see src.rng.derive_seed for campaigns)
+            rng: The game's RNG, used instead of seed; shuffles, energy, coin flips and
+                random targets all draw from it so a seeded game replays exactly
+            spectator: Shown every step of a non-manual game, to draw it live (see
+                src.spectator); best with headless, so log lines don't print over the board
+        """
+        self.state = GameState(rng if rng is not None else GameRandom(seed))
+        self.headless = headless
+        self.manual = manual and not headless
+        self.state.verbose = not headless
+        self.board_view = BoardView() if self.manual else None
+        self.spectator = spectator
+        self.agents = list(agents) if agents else [GreedyAgent(), GreedyAgent()]
+        self.max_turns = max_turns if max_turns is not None or self.manual else DEFAULT_MAX_TURNS
+        self.first_player_idx = None  # Decided by the coin flip in setup_game
+        self.knockouts = [0, 0]  # Knock outs scored by each player
         self._player_decks = []
         # Always wrap decks so both have energy_types
         for deck in (player1_deck, player2_deck):
@@ -65,9 +99,16 @@ class Game:
                 self._player_decks.append(_FallbackDeck(deck))
         self.state.players = [Player(player1_name, self._player_decks[0].cards, self.state, 0),
                               Player(player2_name, self._player_decks[1].cards, self.state, 1)]
-        self._retreated_this_turn = {0: False, 1: False}
+        self.state.sync_hands_with_players()
         # Register the faint callback
         self.state.faint_callback = self.handle_pokemon_faint
+        for idx, agent in enumerate(self.agents):
+            agent.start_game(self.state, idx)
+
+    def _log(self, message: str):
+        """Print a game message unless running headless."""
+        if not self.headless:
+            print(message)
 
     def handle_pokemon_faint(self, fainted_pokemon, owner_idx):
         """Handle all logic for when a Pokémon faints (is knocked out)."""
@@ -75,9 +116,10 @@ class Game:
         opponent_idx = 1 - owner_idx
         opponent = self.state.players[opponent_idx]
         # Print faint message
-        print(f"\n{player.name}'s {fainted_pokemon.card.name} fainted!")
+        self._log(f"\n{player.name}'s {fainted_pokemon.card.name} fainted!")
+        self.knockouts[opponent_idx] += 1
         # Move to discard pile
-        self.state.card_discard_piles[owner_idx].append(fainted_pokemon.card)
+        self.state.discard_card(owner_idx, fainted_pokemon.card)
         # Remove from board (already done in apply_damage)
         # Score increment is already handled in apply_damage
         # If fainted Pokémon was active, prompt for new active if possible
@@ -106,23 +148,21 @@ class Game:
                     else:
                         target_idx = selected['bench_idx']
                 else:
-                    # Auto: promote first benched Pokémon
-                    target_idx = 0
-                new_active = bench.pop(target_idx)
-                self.state.active_pokemon[owner_idx] = new_active
-                print(f"{player.name} promoted {new_active.card.name} to Active!")
+                    target_idx = self.agents[owner_idx].choose_promotion(self.state, owner_idx, list(range(len(bench))))
+                self.state.promote(owner_idx, target_idx)
+                self._log(f"{player.name} promoted {self.state.active_pokemon[owner_idx].card.name} to Active!")
                 if self.board_view:
                     self.board_view.render(self.state)
             else:
-                # No Pokémon left to promote: player loses
-                print(f"{player.name} has no Pokémon left! {opponent.name} wins!")
-                self.state.scores[opponent_idx] = 3  # Force win
+                # No Pokémon left to promote: player loses (check_win_condition sees the empty board)
+                self._log(f"{player.name} has no Pokémon left! {opponent.name} wins!")
 
     def setup_game(self):
         """Perform initial game setup."""
         # Shuffle decks
+        rng = self.state.rng
         for player in self.state.players:
-            random.shuffle(player.deck)
+            rng.shuffle(player.deck)
         # Initialize next_energy for both players if Deck objects are available
         if hasattr(self, '_player_decks') and len(self._player_decks) == 2:
             for idx, deck in enumerate(self._player_decks):
@@ -132,141 +172,141 @@ class Game:
         # Initial board setup: place Active and Benched Pokémon
         self._setup_initial_board()
         # Coin flip for first player
-        self.state.current_player_idx = random.randint(0, 1)
+        self.state.current_player_idx = rng.randint(0, 1)
+        self.first_player_idx = self.state.current_player_idx
+        if self.state.event_log is not None:
+            self.state.event_log += (events.FIRST_PLAYER, self.first_player_idx)
         if self.manual:
             self._display_game_board()
+        if self.spectator is not None:
+            self.spectator.publish(self.state)
 
     def _perform_initial_draw(self):
         """Handle initial 5-card draw with basic Pokemon guarantee."""
         for idx, player in enumerate(self.state.players):
             # Draw until we have a basic Pokemon
+            mulligans = 0
             while True:
-                random.shuffle(player.deck)
+                self.state.rng.shuffle(player.deck)
                 for _ in range(5):
                     player.draw_card()
-                self.state.sync_hands_with_players()  # Sync after drawing
                 if player.has_basic_pokemon():
                     break
                 # If no basic Pokemon, shuffle back and redraw
                 player.deck.extend(player.hand)
                 player.hand.clear()
+                mulligans += 1
+            if self.state.event_log is not None:
+                codes = [events.card_code(card.spec) for card in player.hand[:5]]
+                self.state.event_log += (events.SETUP_HAND, idx, mulligans, *codes, *[0] * (5 - len(codes)))
             self.state.sync_hands_with_players()  # Final sync after setup
 
     def _setup_initial_board(self):
-        """Prompt each player to select Active and Benched Pokémon from their hand using menu and one-touch input."""
-        import readchar
+        """Have each player select Active and Benched Pokémon from their hand (menus when manual, agents otherwise)."""
         for idx, player in enumerate(self.state.players):
             if self.manual and self.board_view:
                 self.board_view.render(self.state)
-            print(f"\n{player.name}, set up your board:")
+            self._log(f"\n{player.name}, set up your board:")
             # List all Basic Pokémon in hand (filter only Pokemon cards)
             basic_indices = [i for i, card in enumerate(player.hand) if isinstance(card, Pokemon) and card.evolution_type == 'Basic']
             if not basic_indices:
                 raise Exception(f"{player.name} has no Basic Pokémon in hand after initial draw!")
+            if not self.manual:
+                active_idx, bench_indices = self.agents[idx].choose_setup(self.state, idx, basic_indices)
+                chosen = [player.hand[active_idx]] + [player.hand[i] for i in bench_indices[:3]]
+                for card in chosen:
+                    player.hand.remove(card)
+                self.state.set_active_pokemon(idx, chosen[0])
+                for card in chosen[1:]:
+                    self.state.add_benched_pokemon(idx, card)
+                continue
+            import readchar
             # --- Select Active Pokémon ---
-            if self.manual:
-                while True:
-                    if self.board_view:
-                        self.board_view.render(self.state)
-                    print("Choose your Active Pokémon:")
-                    # Only show Pokemon cards as options, grouped in one line
-                    options = []
-                    option_strs = []
-                    for i, hand_idx in enumerate(basic_indices):
-                        poke = player.hand[hand_idx]
-                        options.append({
-                            'key': str(i+1),
-                            'dispkey': str(i+1),
-                            'desc': f"{poke.name} (HP: {poke.hp}, Element: {poke.element_type.name})",
-                            'group': 'active',
-                            'hand_idx': hand_idx
-                        })
-                        option_strs.append(f"[{i+1}] {poke.name}")
-                    print(" ".join(option_strs))
-                    print("Select a Pokémon by pressing its number...")
-                    key = readchar.readkey()
-                    if key.isdigit() and 1 <= int(key) <= len(basic_indices):
-                        choice = int(key) - 1
-                        active_idx = basic_indices[choice]
-                        break
-                    else:
-                        print("Invalid key. Try again.")
-            else:
-                # Auto: pick first Basic Pokémon
-                active_idx = basic_indices[0]
+            while True:
+                if self.board_view:
+                    self.board_view.render(self.state)
+                print("Choose your Active Pokémon:")
+                # Only show Pokemon cards as options, grouped in one line
+                option_strs = []
+                for i, hand_idx in enumerate(basic_indices):
+                    poke = player.hand[hand_idx]
+                    option_strs.append(f"[{i+1}] {poke.name}")
+                print(" ".join(option_strs))
+                print("Select a Pokémon by pressing its number...")
+                key = readchar.readkey()
+                if key.isdigit() and 1 <= int(key) <= len(basic_indices):
+                    choice = int(key) - 1
+                    active_idx = basic_indices[choice]
+                    break
+                else:
+                    print("Invalid key. Try again.")
             # Move selected Pokémon to Active slot
             active_pokemon = player.hand.pop(active_idx)
             self.state.set_active_pokemon(idx, active_pokemon)
-            self.state.sync_hands_with_players()
 
             # Remove from basic_indices and adjust indices
             basic_indices = [i for i in basic_indices if i != active_idx]
             basic_indices = [i-1 if i > active_idx else i for i in basic_indices]
             # --- Select Benched Pokémon, one at a time ---
             bench_choices = []
-            if self.manual and basic_indices:
-                while len(bench_choices) < 3 and basic_indices:
-                    if self.board_view:
-                        self.board_view.render(self.state)
-                    print("Choose a Benched Pokémon (press Enter to skip):")
-                    # Only show Pokemon cards as options, grouped in one line
-                    options = []
-                    option_strs = []
-                    for i, hand_idx in enumerate(basic_indices):
-                        poke = player.hand[hand_idx]
-                        options.append({
-                            'key': str(i+1),
-                            'dispkey': str(i+1),
-                            'desc': f"{poke.name} (HP: {poke.hp}, Element: {poke.element_type.name})",
-                            'group': 'bench',
-                            'hand_idx': hand_idx
-                        })
-                        option_strs.append(f"[{i+1}] {poke.name}")
-                    print(" ".join(option_strs))
-                    print("Press a number to add to Bench, or Enter to finish.")
-                    key = readchar.readkey()
-                    if key == '\r' or key == '\n':
-                        break
-                    if key.isdigit() and 1 <= int(key) <= len(basic_indices):
-                        choice = int(key) - 1
-                        bench_idx = basic_indices[choice]
-                        bench_poke = player.hand.pop(bench_idx)
-                        self.state.add_benched_pokemon(idx, bench_poke)
-                        self.state.sync_hands_with_players()
-
-                        # Remove from basic_indices and adjust indices
-                        basic_indices = [i for i in basic_indices if i != bench_idx]
-                        basic_indices = [i-1 if i > bench_idx else i for i in basic_indices]
-                        # Re-render after each bench placement
-                        if self.board_view:
-                            self.board_view.render(self.state)
-                    else:
-                        print("Invalid key. Try again.")
-            else:
-                # Auto: pick up to 3 more Basic Pokémon
-                for bench_idx in basic_indices[:3]:
+            while len(bench_choices) < 3 and basic_indices:
+                if self.board_view:
+                    self.board_view.render(self.state)
+                print("Choose a Benched Pokémon (press Enter to skip):")
+                # Only show Pokemon cards as options, grouped in one line
+                option_strs = []
+                for i, hand_idx in enumerate(basic_indices):
+                    poke = player.hand[hand_idx]
+                    option_strs.append(f"[{i+1}] {poke.name}")
+                print(" ".join(option_strs))
+                print("Press a number to add to Bench, or Enter to finish.")
+                key = readchar.readkey()
+                if key == '\r' or key == '\n':
+                    break
+                if key.isdigit() and 1 <= int(key) <= len(basic_indices):
+                    choice = int(key) - 1
+                    bench_idx = basic_indices[choice]
                     bench_poke = player.hand.pop(bench_idx)
                     self.state.add_benched_pokemon(idx, bench_poke)
-            if self.manual:
-                print(f"{player.name} setup complete.\n")
+                    bench_choices.append(bench_poke)
+
+                    # Remove from basic_indices and adjust indices
+                    basic_indices = [i for i in basic_indices if i != bench_idx]
+                    basic_indices = [i-1 if i > bench_idx else i for i in basic_indices]
+                    # Re-render after each bench placement
+                    if self.board_view:
+                        self.board_view.render(self.state)
+                else:
+                    print("Invalid key. Try again.")
+            print(f"{player.name} setup complete.\n")
         self.state.turn_number += 1
 
     def run(self):
-        """Main game loop with clear turn phases: start, main, end."""
+        """Main game loop with clear turn phases: start, main, end.
+
+        Returns:
+            The winning player number (1 or 2), or 0 if max_turns ran out first
+        """
         self.setup_game()
         while True:
             self._start_turn_phase()
-            if self.check_win(): return self.check_win()
+            winner = self.check_win()
+            if winner: return winner
             self._handle_main_phase()
-            if self.check_win(): return self.check_win()
+            winner = self.check_win()
+            if winner: return winner
             self._end_turn_phase()
-            if self.check_win(): return self.check_win()
+            winner = self.check_win()
+            if winner: return winner
+            if self.max_turns is not None and self.state.turn_number > self.max_turns:
+                self._log(f"Turn limit of {self.max_turns} reached, the game is a draw.")
+                return 0
 
     def check_win(self):
         # Check for win by points
         winner = self.state.check_win_condition()
         if winner is not None:
-            print(f"Player {winner} wins the game!")
+            self._log(f"Player {winner} wins the game!")
             return winner
         # Check for win by running out of Pokémon (active + bench)
         
@@ -274,22 +314,12 @@ class Game:
 
     def _start_turn_phase(self):
         """Start of turn: update energy, draw card, and handle start-of-turn effects."""
-        deck = self._player_decks[self.state.current_player_idx]
-        if not hasattr(self, '_retreated_this_turn'):
-            self._retreated_this_turn = {}
-        self._retreated_this_turn.setdefault(self.state.current_player_idx, False)
-        self._reset_retreated_flags()
-        self._used_supporter_this_turn = False
-        # Only draw a card if not the very first turn
-        if self.state.turn_number > 1:
-            self.state.draw_new_player_energy(self.state.current_player_idx, deck.energy_types)
-            self.state.players[self.state.current_player_idx].draw_card()
-            self.state.sync_hands_with_players()
-        #else:
-            # On the very first turn, promote next energy to energy zone and draw new next energy, but do not draw a card
-            #self.state.draw_new_player_energy(self.state.current_player_idx, deck.energy_types)
+        # Energy and a card are only drawn from the second turn on
+        self.state.start_turn()
         if self.manual:
             self._display_game_board()
+        if self.spectator is not None:
+            self.spectator.publish(self.state)
         # Future: handle start-of-turn abilities, effects, etc.
 
     def _end_turn_phase(self):
@@ -298,6 +328,8 @@ class Game:
         # Future: handle end-of-turn triggers, abilities, etc.
         if self.manual:
             self._display_game_board()
+        if self.spectator is not None:
+            self.spectator.publish(self.state)
 
     def _display_game_board(self):
         if self.board_view:
@@ -324,57 +356,44 @@ class Game:
 
     def _assign_energy_menu(self, player_idx):
         """Handle assigning energy from energy zone to a Pokémon."""
-        player = self.state.players[player_idx]
-        energy_zone = self.state.energy_zones[player_idx]
-        if not energy_zone:
+        slots = [action[1] for action in legal_actions(self.state, player_idx) if action[0] == ATTACH_ENERGY]
+        if not slots:
             print("No energy available to assign.")
             return
-        # Gather all Pokémon on board (active + benched)
-        pokemons = []
-        if self.state.active_pokemon[player_idx]:
-            pokemons.append(('Active', self.state.active_pokemon[player_idx]))
-        for i, poke in enumerate(self.state.benched_pokemon[player_idx]):
-            pokemons.append((f"Bench {i+1}", poke))
-        if len(pokemons) == 1:
+        if len(slots) == 1:
             # Only one Pokémon, assign energy directly
-            target = pokemons[0][1]
+            slot = slots[0]
         else:
             # Build submenu
             options = []
-            for i, (label, poke) in enumerate(pokemons):
+            for i, slot in enumerate(slots):
+                poke = self.state.pokemon_in_slot(player_idx, slot)
+                label = 'Active' if slot == 0 else f"Bench {slot}"
                 options.append({
                     'key': str(i+1),
                     'dispkey': str(i+1),
                     'desc': f"Assign to {label}: {poke.name} (HP: {poke.hp})",
                     'group': 'assign_target',
-                    'poke': poke
+                    'slot': slot
                 })
             options.append({'key': '\x1b', 'dispkey': 'esc', 'desc': 'Back', 'group': 'back'})
             selected = self._run_menu(options, "Select a Pokémon to assign energy to:")
             if not selected or selected.get('group') == 'back':
                 return  # Cancelled
-            target = selected['poke']
+            slot = selected['slot']
         # Assign energy (use the single energy, then clear the zone)
-        energy = energy_zone
-        if hasattr(target, 'attach_energy'):
-            target.attach_energy(energy)
-        elif hasattr(target, 'energy_attached'):
-            target.energy_attached.append(energy)
-        else:
-            target.energy_attached = [energy]
-        self.state.energy_zones[player_idx] = None
-        print(f"Assigned {energy} to {target.name}.")
-        self.state.sync_hands_with_players()
+        self._apply_action(player_idx, (ATTACH_ENERGY, slot))
         if self.board_view:
             self.board_view.render(self.state)
 
     def _get_player_options(self, player_idx: int) -> list:
-        from colorama import Fore, Style
+        """Build the main-phase menu from legal_actions; illegal options are shown disabled with a reason."""
         player = self.state.players[player_idx]
-        options = []
         state = self.state
-        current_turn = state.turn_number
-        # Example: view hand cards
+        legal = legal_actions(state, player_idx)
+        playable = {action[1] for action in legal if action[0] in (PLAY_BASIC, EVOLVE)}
+        kinds = {action[0] for action in legal}
+        options = []
         for i, card in enumerate(player.hand):
             # Always allow viewing
             options.append({
@@ -384,90 +403,53 @@ class Game:
                 'group': 'view_card',
                 'card_idx': i
             })
-            # Play card option (Enter key, only for selected card)
-            is_basic_pokemon = hasattr(card, 'evolution_type') and getattr(card, 'evolution_type', None) == 'Basic'
-            is_evolution = hasattr(card, 'evolution_type') and getattr(card, 'evolution_type', None) in ('Stage 1', 'Stage 2')
-            can_play = False
+            # Play card option (Enter key, only for the currently selected card)
+            if self.state.active_hand_card[player_idx] != i:
+                continue
+            can_play = i in playable
             reason = ''
-            if is_basic_pokemon:
-                # Can play if no active or bench has < 3
-                idx = player_idx
-                if not state.active_pokemon[idx]:
-                    can_play = True
-                elif len(state.benched_pokemon[idx]) < 3:
-                    can_play = True
-                else:
-                    reason = 'Bench full'
-            elif is_evolution:
-                # Evolution playability logic
-                evolves_from = getattr(card, 'evolves_from', None)
-                print(f'This card is an evolution. Checking for {evolves_from}')
-
-                valid_targets = []
-                all_pokemon = []
-                if state.active_pokemon[player_idx]:
-                    all_pokemon.append(('Active', state.active_pokemon[player_idx]))
-                for j, poke in enumerate(state.benched_pokemon[player_idx]):
-                    all_pokemon.append((f'Bench {j+1}', poke))
-                
-                for label, poke in all_pokemon:
-                    print(f'Checking {label}: poke.card.name')
-                    if poke and poke.card.name.lower() == str(evolves_from).lower():
-                        print('Name matches:', poke.card.name)
-                    if poke and poke.card.name.lower() == str(evolves_from).lower() and poke.can_evolve(current_turn):
-                        valid_targets.append((label, poke))
-                if valid_targets:
-                    can_play = True
-                else:
-                    reason = 'No valid evolution target'
-                #input()
-            # Only add Enter key for the currently selected card
-            if self.state.active_hand_card[player_idx] == i:
-                options.append({
-                    'key': '\r',
-                    'dispkey': 'Enter',
-                    'desc': f"Play card {i+1}" + (f" ({reason})" if not can_play and reason else ''),
-                    'group': 'play_card',
-                    'card_idx': i,
-                    'enabled': can_play,
-                    'target': None,  # For Pokémon, no target
-                })
+            if not can_play and getattr(card, 'evolution_type', None) == 'Basic':
+                reason = 'Bench full'
+            elif not can_play and getattr(card, 'evolution_type', None) in ('Stage 1', 'Stage 2'):
+                reason = 'No valid evolution target'
+            options.append({
+                'key': '\r',
+                'dispkey': 'Enter',
+                'desc': f"Play card {i+1}" + (f" ({reason})" if reason else ''),
+                'group': 'play_card',
+                'card_idx': i,
+                'enabled': can_play,
+                'target': None,  # For Pokémon, no target
+            })
         # Add retreat option
-        active_poke = self.state.active_pokemon[player_idx]
-        bench = self.state.benched_pokemon[player_idx]
-        can_retreat = False
+        can_retreat = RETREAT in kinds
         retreat_reason = ''
-        # Only allow retreat if: active exists, at least 1 benched, enough energy, not paralyzed, and not already retreated this turn
-        if active_poke and bench and len(bench) > 0:
-            if hasattr(self, '_retreated_this_turn') and self._retreated_this_turn.get(player_idx, False):
+        if not can_retreat:
+            if not state.benched_pokemon[player_idx]:
+                retreat_reason = 'No bench Pokémon'
+            elif state.retreated_this_turn[player_idx]:
                 retreat_reason = 'Already retreated'
-            elif not active_poke.can_retreat():
-                retreat_reason = 'Not enough energy or paralyzed'
             else:
-                can_retreat = True
-        else:
-            retreat_reason = 'No bench Pokémon'
+                retreat_reason = 'Not enough energy or paralyzed'
         options.append({
             'key': 'r',
             'dispkey': 'R',
-            'desc': 'Retreat Active Pokémon' + (f' ({retreat_reason})' if not can_retreat and retreat_reason else ''),
+            'desc': 'Retreat Active Pokémon' + (f' ({retreat_reason})' if retreat_reason else ''),
             'group': 'retreat',
             'enabled': can_retreat
         })
         # Add assign energy option
-        has_energy = bool(self.state.energy_zones[player_idx])
         options.append({
             'key': 'e',
             'dispkey': 'E',
             'desc': 'Assign energy',
             'group': 'assign_energy',
-            'enabled': has_energy
+            'enabled': ATTACH_ENERGY in kinds
         })
         # Add attack option if active Pokémon has attacks
-        active_poke = self.state.active_pokemon[player_idx]
-        if active_poke and hasattr(active_poke.card, 'attacks'):
+        active_poke = state.active_pokemon[player_idx]
+        if active_poke:
             for i, attack in enumerate(active_poke.card.attacks):
-                can_attack = active_poke.can_perform_attack(attack)
                 desc = f"Attack: {attack['name']} {[e.name for e in attack.get('cost', [])]} {attack['damage']}{f' - {attack['effect']}' if attack.get('effect') else ''}"
                 options.append({
                     'key': string.ascii_lowercase[i],
@@ -475,7 +457,7 @@ class Game:
                     'desc': desc,
                     'group': 'attack',
                     'attack_idx': i,
-                    'enabled': can_attack
+                    'enabled': (ATTACK, i) in legal
                 })
         # End turn option (use '\x1b' for ESC key)
         options.append({'key': '\x1b', 'dispkey':'esc', 'desc': 'End turn', 'group': 'end_turn'})
@@ -542,81 +524,36 @@ class Game:
                             continue
                         card_idx = selected['card_idx']
                         card = player.hand[card_idx]
-                        # Basic Pokémon logic (unchanged)
                         if hasattr(card, 'evolution_type') and getattr(card, 'evolution_type', None) == 'Basic':
-                            played = card.play(self.state, self.state.turn_number)
-                            if played:
-                                print(f"Played {card.name} to the field.")
-                                player.hand.pop(card_idx)
-                                self.state.sync_hands_with_players()
-                                continue
-                            else:
+                            if not self._apply_action(self.state.current_player_idx, (PLAY_BASIC, card_idx)):
                                 print("Could not play this Pokémon (bench full or other rule).")
-                                continue
+                            continue
                         # Evolution logic: show menu to pick which Pokémon to evolve
                         elif hasattr(card, 'evolution_type') and getattr(card, 'evolution_type', None) in ('Stage 1', 'Stage 2'):
-                            evolves_from = getattr(card, 'evolves_from', None)
-                            valid_targets = []
-                            all_pokemon = []
-                            if self.state.active_pokemon[self.state.current_player_idx]:
-                                all_pokemon.append(('Active', self.state.active_pokemon[self.state.current_player_idx]))
-                            for j, poke in enumerate(self.state.benched_pokemon[self.state.current_player_idx]):
-                                all_pokemon.append((f'Bench {j+1}', poke))
-                            for label, poke in all_pokemon:
-                                if poke and poke.card.name.lower() == str(evolves_from).lower() and poke.can_evolve(self.state.turn_number):
-                                    valid_targets.append({'label': label, 'poke': poke})
-                            if not valid_targets:
+                            slots = [action[2] for action in legal_actions(self.state, self.state.current_player_idx)
+                                     if action[0] == EVOLVE and action[1] == card_idx]
+                            if not slots:
                                 print("No valid Pokémon to evolve.")
                                 continue
                             # Show menu to pick which Pokémon to evolve
                             options2 = []
-                            for i, entry in enumerate(valid_targets):
-                                poke = entry['poke']
+                            for i, slot in enumerate(slots):
+                                poke = self.state.pokemon_in_slot(self.state.current_player_idx, slot)
+                                label = 'Active' if slot == 0 else f'Bench {slot}'
                                 options2.append({
                                     'key': str(i+1),
                                     'dispkey': str(i+1),
-                                    'desc': f"Evolve {entry['label']}: {poke.name} (HP: {poke.hp})",
+                                    'desc': f"Evolve {label}: {poke.name} (HP: {poke.hp})",
                                     'group': 'evolve_target',
-                                    'poke': poke
+                                    'slot': slot
                                 })
                             options2.append({'key': '\x1b', 'dispkey': 'esc', 'desc': 'Cancel', 'group': 'cancel'})
                             selected2 = self._run_menu(options2, "Select a Pokémon to evolve:")
                             if not selected2 or selected2.get('group') == 'cancel':
                                 print("Evolution cancelled.")
                                 continue
-                            # --- Actual evolution implementation ---
-                            target_poke = selected2['poke']
-                            # Save references to transfer
-                            damage = target_poke.damage_counters
-                            energies = dict(target_poke.attached_energies)
-                            tool = target_poke.attached_tool
-                            # Remove status
-                            target_poke.clear_status()
-                            # Remove lower evolution from board and send to discard
-                            # (Find if active or bench)
-                            is_active = (target_poke is self.state.active_pokemon[self.state.current_player_idx])
-                            # Create new evolved ActivePokemon
-                            from .active_pokemon import ActivePokemon
-                            evolved = ActivePokemon(card, self.state.turn_number)
-                            evolved.damage_counters = damage
-                            evolved.attached_energies = energies
-                            evolved.attached_tool = tool
-                            # Status is cleared by default
-                            # Replace on board
-                            if is_active:
-                                self.state.active_pokemon[self.state.current_player_idx] = evolved
-                            else:
-                                bench = self.state.benched_pokemon[self.state.current_player_idx]
-                                for idx, poke in enumerate(bench):
-                                    if poke is target_poke:
-                                        bench[idx] = evolved
-                                        break
-                            # Discard lower evolution
-                            player.discard_card(target_poke.card)
-                            # Remove evolution card from hand
-                            player.hand.pop(card_idx)
-                            self.state.sync_hands_with_players()
-                            print(f"{target_poke.name} evolved into {card.name}!")
+                            # Damage, energy and tool carry over; status is cleared and the lower stage discarded
+                            self._apply_action(self.state.current_player_idx, (EVOLVE, card_idx, selected2['slot']))
                             continue
                     elif selected['group'] == 'assign_energy':
                         if not selected.get('enabled', True):
@@ -635,10 +572,8 @@ class Game:
                             print("You cannot perform this attack now.")
                             continue
                         attack_idx = selected['attack_idx']
-                        active_poke = self.state.active_pokemon[self.state.current_player_idx]
-                        attack = active_poke.card.attacks[attack_idx]
                         # Re-validate attack before performing
-                        if not active_poke.can_perform_attack(attack):
+                        if (ATTACK, attack_idx) not in legal_actions(self.state, self.state.current_player_idx):
                             print("You do not have the required energy or status to perform this attack.")
                             continue
                         # Perform the attack (damage calculation, energy cost, etc.)
@@ -650,24 +585,59 @@ class Game:
                 else:
                     print("Invalid key. Try again.")
         else:
-            print("Simulating player actions...")
-            # Placeholder for AI decision-making logic
+            self._run_agent_turn(self.state.current_player_idx)
+
+    def _apply_action(self, player_idx: int, action: Action) -> bool:
+        """Carry out a main-phase action (see src.actions) with log messages; False if the rules rejected it."""
+        state = self.state
+        kind = action[0]
+        if kind == ATTACK:
+            self._perform_attack(player_idx, action[1])
+            return True
+        hand = state.players[player_idx].hand
+        card = hand[action[1]] if kind in (PLAY_BASIC, EVOLVE) else None
+        target = state.pokemon_in_slot(player_idx, action[-1]) if kind in (EVOLVE, ATTACH_ENERGY) else None
+        energy = state.energy_zones[player_idx]
+        if not apply_action(state, action):
+            return False
+        if kind == PLAY_BASIC:
+            self._log(f"{state.players[player_idx].name} played {card.name} to the field.")
+        elif kind == EVOLVE:
+            self._log(f"{target.name} evolved into {card.name}!")
+        elif kind == ATTACH_ENERGY:
+            self._log(f"Assigned {energy} to {target.name}.")
+        elif kind == RETREAT:
+            self._log(f"{state.players[player_idx].name} retreated to {state.active_pokemon[player_idx].name}!")
+        return True
+
+    def _run_agent_turn(self, player_idx: int):
+        """Let the player's agent take main-phase actions until it attacks or ends the turn."""
+        agent = self.agents[player_idx]
+        while True:
+            action = agent.choose_action(self.state, player_idx, legal_actions(self.state, player_idx))
+            if action[0] == END_TURN:
+                return
+            self._apply_action(player_idx, action)
+            if self.spectator is not None:
+                self.spectator.publish(self.state)
+            if action[0] == ATTACK or self.state.check_win_condition() is not None:
+                return
 
     def _retreat_menu(self, player_idx):
         """Handle retreating the active Pokémon."""
-        player = self.state.players[player_idx]
-        active_poke = self.state.active_pokemon[player_idx]
         bench = self.state.benched_pokemon[player_idx]
-        if not active_poke or not bench:
-            print("No Pokémon to retreat to.")
+        targets = [action[1] for action in legal_actions(self.state, player_idx) if action[0] == RETREAT]
+        if not targets:
+            print("You cannot retreat now.")
             return
         # If only one benched Pokémon, auto-switch
-        if len(bench) == 1:
-            target_idx = 0
+        if len(targets) == 1:
+            target_idx = targets[0]
         else:
             # Build submenu for bench selection
             options = []
-            for i, poke in enumerate(bench):
+            for i in targets:
+                poke = bench[i]
                 options.append({
                     'key': str(i+1),
                     'dispkey': str(i+1),
@@ -681,81 +651,24 @@ class Game:
                 print("Retreat cancelled.")
                 return
             target_idx = selected['bench_idx']
-        # Pay retreat cost (discard attached energies, any type)
-        cost = active_poke.retreat_cost
-        for _ in range(cost):
-            # Remove from any energy type with >0
-            for e_type, count in active_poke.attached_energies.items():
-                if count > 0:
-                    active_poke.attached_energies[e_type] -= 1
-                    player.discard_energy(e_type)
-                    break
-        # Remove all status conditions
-        active_poke.clear_status()
-        # Switch active and selected bench Pokémon
-        new_active = bench.pop(target_idx)
-        self.state.active_pokemon[player_idx], new_active.turn_played = new_active, self.state.turn_number
-        bench.append(active_poke)
-        print(f"{player.name} retreated to {new_active.name}!")
-        self._retreated_this_turn[self.state.current_player_idx] = True
+        # Pay retreat cost (discard attached energies, any type), clear status and switch
+        self._apply_action(player_idx, (RETREAT, target_idx))
         self.board_view.render(self.state)
 
-    def _reset_retreated_flags(self):
-        """Reset retreat flags at the start of each turn."""
-        self._retreated_this_turn = {0: False, 1: False}
-
     def _perform_attack(self, player_idx: int, attack_idx: int):
         """Perform the selected attack, handling targeting, damage, and effects. Ends turn after attack."""
         state = self.state
         attacker = state.active_pokemon[player_idx]
         attack = attacker.card.attacks[attack_idx]
-        opponent_idx = 1 - player_idx
-        targets = []
-        # Determine targets based on attack['target']
-        if attack['target'] == 'opponent_active':
-            if state.active_pokemon[opponent_idx]:
-                targets = [state.active_pokemon[opponent_idx]]
-        elif attack['target'] == 'opponent_bench':
-            if state.benched_pokemon[opponent_idx]:
-                import random
-                targets = [random.choice(state.benched_pokemon[opponent_idx])]
-        elif attack['target'] == 'random_opponent':
-            all_targets = [p for p in ([state.active_pokemon[opponent_idx]] if state.active_pokemon[opponent_idx] else []) + state.benched_pokemon[opponent_idx]]
-            if all_targets:
-                import random
-                targets = [random.choice(all_targets)]
-        elif attack['target'] == 'multi_random':
-            all_targets = [p for p in ([state.active_pokemon[opponent_idx]] if state.active_pokemon[opponent_idx] else []) + state.benched_pokemon[opponent_idx]]
-            import random
-            n = min(2, len(all_targets))  # Example: hit 2 at random
-            targets = random.sample(all_targets, n) if all_targets else []
-        else:
-            # Default: opponent's active
-            if state.active_pokemon[opponent_idx]:
-                targets = [state.active_pokemon[opponent_idx]]
-        # Calculate base damage
-        try:
-            base_damage = int(attack.get('damage', 0))
-        except ValueError:
-            base_damage = 0
-        # Apply modifiers (elemental weakness, tools, etc.)
-        attack_results = []
-        for target in targets:
-            damage = base_damage
-            # Elemental weakness (+20 if target is weak to attacker's type)
-            if hasattr(target.card, 'weakness') and target.card.weakness:
-                if str(attacker.card.element_type.value).lower() == str(target.card.weakness).lower():
-                    damage += 20
-            # TODO: Add logic for tools, abilities, trainers, etc.
-            # (Leave hooks for future expansion)
-            print(f"{attacker.card.name} uses {attack['name']}! {target.card.name} took {damage} damage.")
-            time.sleep(3)
-            state.apply_damage(target, damage, owner_idx=opponent_idx)
-            
+        # Targeting, weakness (+20) and knockouts are resolved by the game state
+        # TODO: Add logic for tools, abilities, trainers, etc.
+        hits = state.execute_attack(attacker, attack, state.turn_number, attack_idx)
+        for target, damage in hits:
+            self._log(f"{attacker.card.name} uses {attack['name']}! {target.card.name} took {damage} damage.")
+        if not self.manual:
+            return
+        time.sleep(3)
         # Refresh board view after attack
         if self.board_view:
             self.board_view.render(self.state)
-        # Print attack results
-        for line in attack_results:
-            print(line)
         input("\nPress Enter to continue...")
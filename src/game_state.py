@@ -1,18 +1,60 @@
 """Game state management."""
-from typing import List, Dict, Optional, Set, TYPE_CHECKING
+import functools
+import random
+from typing import Any, List, Dict, Optional, Set, Tuple, TYPE_CHECKING
 from .pokemon import ElementType
 
 from .pokemon import Pokemon
+from .card_spec import AttackSpec
 from .active_pokemon import ActivePokemon
 from .trainer import Trainer, Item, Supporter, Tool
+from .rng import GameRandom
+from . import events, zobrist
+from .events import card_code, element_code
+from .zobrist import KEYS, MASK64
+
+# Undo journal entry kinds (see GameState.start_recording)
+_UNDO_ATTR, _UNDO_ITEM, _UNDO_LIST, _UNDO_DICT, _UNDO_RNG = range(5)
+
+
+def _reversible(method):
+    """Make a GameState operation one undo step while recording.
+
+    Reversible operations called from inside another one (apply_damage from
+    execute_attack, draw_new_player_energy from start_turn, ...) are part of
+    the outer step. A call that changes nothing (e.g. an illegal move that
+    returns False) still counts as a step, so every call can be undone.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._journal is None:
+            return method(self, *args, **kwargs)
+        if not self._op_depth:
+            self._undo_marks.append(len(self._journal))
+            if self._zobrist is not None:
+                self._journal.append((_UNDO_ATTR, self, '_zobrist', self._zobrist))
+        self._op_depth += 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._op_depth -= 1
+    return wrapper
+
 
 class GameState:
-    def __init__(self):
+    def __init__(self, rng: Optional[random.Random] = None):
+        """Args:
+            rng: The game's RNG; every random event in the engine draws from it
+        """
+        self.rng = rng if rng is not None else GameRandom()
         # Basic game state
         self.players = []
         self.current_player_idx = 0
         self.turn_number = 0
         self.supporter_played_this_turn = False
+        self.retreated_this_turn = {0: False, 1: False}
+        # Console messages (win announcements); headless games turn this off
+        self.verbose = True
         
         # Board state
         self.active_pokemon: Dict[int, Optional['ActivePokemon']] = {0: None, 1: None}
@@ -22,6 +64,7 @@ class GameState:
         # Energy tracking
         self.energy_zones = {0: None, 1: None}  # Current available energy for each player
         self.next_energy = {0: None, 1: None}  # Next energy to be added for each player
+        self.energy_types = {0: [], 1: []}  # Energy types each player's deck declares
         
         # Hand tracking
         self.hands = {0: [], 1: []}  # List of cards in each player's hand
@@ -30,6 +73,157 @@ class GameState:
         # Discard piles
         self.card_discard_piles = {0: [], 1: []}  # For discarded cards (Pokemon, Trainer, etc.)
         self.energy_discard_piles = {0: [], 1: []}  # For discarded energy (ElementType)
+
+        # Undo journal; None unless recording (see start_recording)
+        self._journal: Optional[List[Tuple]] = None
+        self._undo_marks: List[int] = []
+        self._op_depth = 0
+        # Incrementally maintained position hash; None unless hashing (see start_hashing)
+        self._zobrist: Optional[int] = None
+        # Flat event stream for replays (see src.events); None unless a replay is being recorded.
+        # Events are not undone, so searches must switch it off.
+        self.event_log: Optional[List[int]] = None
+
+    # --- Apply/undo -----------------------------------------------------------
+
+    def start_recording(self) -> None:
+        """Record every reversible operation from now on, so it can be rolled back with undo().
+
+        Each call of place_basic_pokemon, play_from_hand, evolve_pokemon,
+        add_energy, retreat, promote, execute_attack, apply_damage, start_turn,
+        end_turn and pass_turn becomes one undo step. The journal only holds
+        the previous values of what an operation changed (attributes, dict
+        items, small lists, RNG state), so search can explore by mutating a
+        single state in place.
+        """
+        self._journal = []
+        self._undo_marks = []
+        self._op_depth = 0
+
+    def stop_recording(self) -> None:
+        """Stop recording and forget the journal."""
+        self._journal = None
+        self._undo_marks = []
+
+    @property
+    def recording(self) -> bool:
+        return self._journal is not None
+
+    @property
+    def undo_depth(self) -> int:
+        """Number of operations undo() can still roll back."""
+        return len(self._undo_marks)
+
+    def undo(self) -> None:
+        """Roll back the most recent reversible operation, restoring the exact previous state."""
+        if not self._undo_marks:
+            raise IndexError("Nothing to undo")
+        mark = self._undo_marks.pop()
+        journal = self._journal
+        while len(journal) > mark:
+            entry = journal.pop()
+            kind = entry[0]
+            if kind == _UNDO_ATTR:
+                object.__setattr__(entry[1], entry[2], entry[3])
+            elif kind == _UNDO_ITEM:
+                entry[1][entry[2]] = entry[3]
+            elif kind == _UNDO_LIST:
+                entry[1][:] = entry[2]
+            elif kind == _UNDO_DICT:
+                entry[1].update(entry[2])
+            else:
+                entry[1].setstate(entry[2])
+
+    @_reversible
+    def resample_hidden(self, viewer_idx: int, rng: random.Random) -> None:
+        """Re-deal everything the viewer can't see, for search (determinization).
+
+        Both deck orders are shuffled, the opponent's hand is re-dealt from
+        their hand and deck combined, and the game RNG - which drives energy
+        draws, coin flips and random targets - is reseeded from ``rng``.
+        """
+        opponent = self.players[1 - viewer_idx]
+        own_deck = self.players[viewer_idx].deck
+        self._save_list(own_deck)
+        rng.shuffle(own_deck)
+        hand_size = len(opponent.hand)
+        before = zobrist.hand_key(self, 1 - viewer_idx) if self._zobrist is not None else 0
+        pool = opponent.hand + opponent.deck
+        rng.shuffle(pool)
+        self._save_list(opponent.hand)
+        self._save_list(opponent.deck)
+        opponent.hand[:] = pool[:hand_size]
+        opponent.deck[:] = pool[hand_size:]
+        if self._zobrist is not None:
+            self._rehash(before, zobrist.hand_key(self, 1 - viewer_idx))
+        self._save_rng()
+        self.rng.seed(rng.getrandbits(64))
+
+    # --- Position hashing -------------------------------------------------------
+
+    def start_hashing(self) -> None:
+        """Hash the position once and keep the hash up to date from now on (see src.zobrist).
+
+        The reversible operations adjust ``zobrist`` by the keys of what they
+        change - a slot's damage, one energy count, a card entering the hand -
+        rather than rehashing, and undo() restores it with the rest of the state.
+        Changes made outside those operations are not tracked.
+        """
+        self._zobrist = zobrist.position_hash(self)
+
+    def stop_hashing(self) -> None:
+        self._zobrist = None
+
+    @property
+    def hashing(self) -> bool:
+        return self._zobrist is not None
+
+    @property
+    def zobrist(self) -> int:
+        """The position's Zobrist hash (computed from scratch when not hashing)."""
+        return self._zobrist if self._zobrist is not None else zobrist.position_hash(self)
+
+    def _rehash(self, removed: int, added: int) -> None:
+        self._zobrist = (self._zobrist - removed + added) & MASK64
+
+    def _locate(self, pokemon: 'ActivePokemon') -> Optional[Tuple[int, int]]:
+        """(player, slot) of a Pokemon in play, or None."""
+        for player in (0, 1):
+            if self.active_pokemon[player] is pokemon:
+                return player, 0
+            for i, other in enumerate(self.benched_pokemon[player]):
+                if other is pokemon:
+                    return player, i + 1
+        return None
+
+    def _save_attr(self, obj: Any, name: str) -> None:
+        if self._journal is not None:
+            self._journal.append((_UNDO_ATTR, obj, name, getattr(obj, name)))
+
+    def _save_item(self, container: Any, key: Any) -> None:
+        if self._journal is not None:
+            self._journal.append((_UNDO_ITEM, container, key, container[key]))
+
+    def _save_list(self, items: List) -> None:
+        if self._journal is not None:
+            self._journal.append((_UNDO_LIST, items, items[:]))
+
+    def _save_rng(self) -> None:
+        # Free for GameRandom; a Mersenne Twister's getstate() copies 625 words
+        if self._journal is not None:
+            self._journal.append((_UNDO_RNG, self.rng, self.rng.getstate()))
+
+    def _save_pokemon(self, pokemon: 'ActivePokemon') -> None:
+        """Journal the battle state of a Pokemon in play (damage, status, energy)."""
+        if self._journal is not None:
+            for name in ('damage_counters', 'status', 'status_turn', 'turn_played'):
+                self._save_attr(pokemon, name)
+            self._journal.append((_UNDO_DICT, pokemon.attached_energies, pokemon.attached_energies.copy()))
+
+    def _set(self, container: Any, key: Any, value: Any) -> None:
+        """container[key] = value, journaled."""
+        self._save_item(container, key)
+        container[key] = value
     
     @property
     def player_score(self) -> int:
@@ -101,6 +295,20 @@ class GameState:
         """Get opponent's energy discard pile."""
         return self.energy_discard_piles[1]
         
+    def board_slots(self, player_idx: int) -> List[Tuple[int, 'ActivePokemon']]:
+        """List a player's Pokemon in play as (slot, pokemon); slot 0 is the active spot, 1-3 the bench."""
+        slots = [(0, self.active_pokemon[player_idx])] if self.active_pokemon[player_idx] else []
+        slots.extend((i + 1, pokemon) for i, pokemon in enumerate(self.benched_pokemon[player_idx]))
+        return slots
+
+    def pokemon_in_slot(self, player_idx: int, slot: int) -> Optional['ActivePokemon']:
+        """Get the Pokemon in a board slot (0 = active, 1-3 = bench)."""
+        if slot == 0:
+            return self.active_pokemon[player_idx]
+        bench = self.benched_pokemon[player_idx]
+        return bench[slot - 1] if slot - 1 < len(bench) else None
+
+    @_reversible
     def place_basic_pokemon(self, pokemon: Pokemon, turn_played: int) -> bool:
         """Place a basic Pokemon either as active or on bench."""
         if pokemon.evolution_type != 'Basic':
@@ -111,33 +319,75 @@ class GameState:
         
         # If no active Pokemon, must place as active
         if not self.active_pokemon[player]:
-            self.active_pokemon[player] = active_pokemon
+            self._set(self.active_pokemon, player, active_pokemon)
+            if self._zobrist is not None:
+                self._rehash(0, zobrist.pokemon_key(player, 0, active_pokemon))
             return True
             
         # Otherwise try to place on bench
         if len(self.benched_pokemon[player]) < 3:
+            self._save_list(self.benched_pokemon[player])
             self.benched_pokemon[player].append(active_pokemon)
+            if self._zobrist is not None:
+                self._rehash(0, zobrist.pokemon_key(player, len(self.benched_pokemon[player]), active_pokemon))
             return True
             
         return False
-        
-    def evolve_pokemon(self, evolution_card: Pokemon, turn_played: int) -> bool:
+
+    def evolution_targets(self, player_idx: int, evolution_card: Pokemon, turn: int) -> List[Tuple[int, 'ActivePokemon']]:
+        """List the (slot, pokemon) pairs the evolution card could be played onto this turn."""
+        evolves_from = evolution_card.evolves_from
+        if not evolves_from:
+            return []
+        return [(slot, pokemon) for slot, pokemon in self.board_slots(player_idx)
+                if pokemon.card.name.lower() == evolves_from and pokemon.can_evolve(turn)]
+        
+    @_reversible
+    def play_from_hand(self, hand_idx: int, slot: Optional[int] = None) -> bool:
+        """Play a Pokemon from the current player's hand: a Basic onto the field, or
+        an evolution onto the Pokemon in ``slot`` (0 = active, 1-3 = bench).
+
+        The card only leaves the hand if the play is legal.
+        """
+        player = self.current_player_idx
+        hand = self.players[player].hand if self.players else self.hands[player]
+        if not 0 <= hand_idx < len(hand):
+            return False
+        card = hand[hand_idx]
+        if slot is None:
+            played = self.place_basic_pokemon(card, self.turn_number)
+        else:
+            target = self.pokemon_in_slot(player, slot)
+            played = target is not None and self.evolve_pokemon(card, self.turn_number, target)
+        if played:
+            if self.event_log is not None:
+                if slot is None:
+                    bench = self.benched_pokemon[player]
+                    placed = len(bench) if bench and bench[-1].card is card else 0
+                    self.event_log += (events.PLAY_BASIC, player, card_code(card.spec), placed)
+                else:
+                    self.event_log += (events.EVOLVE, player, card_code(card.spec), slot)
+            self._save_list(hand)
+            hand.pop(hand_idx)
+            if self._zobrist is not None:
+                self._rehash(KEYS['hand', player, card.spec], 0)
+        return played
+
+    @_reversible
+    def evolve_pokemon(self, evolution_card: Pokemon, turn_played: int, target: Optional['ActivePokemon'] = None) -> bool:
         """Attempt to evolve a Pokemon on the field.
         
         Args:
             evolution_card: The evolution Pokemon card
             turn_played: The current turn number for evolution timing
+            target: The Pokemon to evolve; defaults to the first valid one
         """
         player = self.current_player_idx
-        target = None
-        
-        # Find a Pokemon that can evolve into this one
-        all_pokemon = ([self.active_pokemon[player]] if self.active_pokemon[player] else []) + self.benched_pokemon[player]
-        for pokemon in all_pokemon:
-            if (pokemon and pokemon.card.name == evolution_card.evolution_type and 
-                pokemon.can_evolve(turn_played)):
-                target = pokemon
-                break
+        targets = self.evolution_targets(player, evolution_card, turn_played)
+        if target is None:
+            target = targets[0][1] if targets else None
+        elif not any(pokemon is target for _, pokemon in targets):
+            target = None
                 
         if not target:
             return False
@@ -145,18 +395,76 @@ class GameState:
         # Create new ActivePokemon with evolution card
         evolved = ActivePokemon(evolution_card, turn_played)
         
-        # Transfer any attached cards/energy from previous stage
+        # Transfer damage and any attached cards/energy from previous stage; evolving clears status
+        evolved.damage_counters = target.damage_counters
         evolved.attached_energies = target.attached_energies
         evolved.attached_tool = target.attached_tool
         
         # Replace the target Pokemon with evolved form
-        if target == self.active_pokemon[player]:
-            self.active_pokemon[player] = evolved
+        if target is self.active_pokemon[player]:
+            slot = 0
+            self._set(self.active_pokemon, player, evolved)
         else:
-            idx = self.benched_pokemon[player].index(target)
-            self.benched_pokemon[player][idx] = evolved
+            bench = self.benched_pokemon[player]
+            slot = next(i for i, p in enumerate(bench) if p is target) + 1
+            self._set(bench, slot - 1, evolved)
+        if self._zobrist is not None:
+            self._rehash(zobrist.pokemon_key(player, slot, target), zobrist.pokemon_key(player, slot, evolved))
+        # The lower stage goes to the discard pile
+        self.discard_card(player, target.card)
             
         return True
+
+    @_reversible
+    def retreat(self, bench_idx: int) -> bool:
+        """Retreat the current player's Active Pokemon, switching in a benched one.
+
+        The retreat cost is paid by discarding attached energy (any type) and
+        the retreating Pokemon's status is cleared.
+        """
+        player = self.current_player_idx
+        active = self.active_pokemon[player]
+        bench = self.benched_pokemon[player]
+        if (not active or not 0 <= bench_idx < len(bench) or self.retreated_this_turn[player]
+                or not active.can_retreat()):
+            return False
+        before = zobrist.board_key(self, player) if self._zobrist is not None else 0
+        self._save_pokemon(active)
+        for _ in range(active.retreat_cost):
+            # Remove from any energy type with >0
+            for e_type, count in active.attached_energies.items():
+                if count > 0:
+                    active.attached_energies[e_type] -= 1
+                    self.discard_energy(player, e_type)
+                    break
+        active.clear_status()
+        self._save_list(bench)
+        new_active = bench.pop(bench_idx)
+        self._save_attr(new_active, 'turn_played')
+        new_active.turn_played = self.turn_number
+        self._set(self.active_pokemon, player, new_active)
+        bench.append(active)
+        self._set(self.retreated_this_turn, player, True)
+        if self._zobrist is not None:
+            self._rehash(before, zobrist.board_key(self, player) + KEYS['retreated', player])
+        if self.event_log is not None:
+            self.event_log += (events.RETREAT, player, bench_idx)
+        return True
+
+    @_reversible
+    def promote(self, player_idx: int, bench_idx: int) -> bool:
+        """Move a benched Pokemon into an empty Active spot."""
+        bench = self.benched_pokemon[player_idx]
+        if self.active_pokemon[player_idx] or not 0 <= bench_idx < len(bench):
+            return False
+        before = zobrist.board_key(self, player_idx) if self._zobrist is not None else 0
+        self._save_list(bench)
+        self._set(self.active_pokemon, player_idx, bench.pop(bench_idx))
+        if self._zobrist is not None:
+            self._rehash(before, zobrist.board_key(self, player_idx))
+        if self.event_log is not None:
+            self.event_log += (events.PROMOTE, player_idx, bench_idx)
+        return True
         
     def play_item(self, item: Item) -> bool:
         """Handle item card effects."""
@@ -177,64 +485,173 @@ class GameState:
             return False
         return target.attach_tool(tool)
         
-    def add_energy(self, target: ActivePokemon) -> bool:
-        """Add energy from the energy zone to a Pokemon."""
+    @_reversible
+    def add_energy(self, target: ActivePokemon, slot: Optional[int] = None) -> bool:
+        """Add energy from the energy zone to a Pokemon.
+
+        Args:
+            slot: The target's board slot, if the caller knows it (saves a board scan)
+        """
         current_energy = self.energy_zones[self.current_player_idx]
         if not current_energy:
             return False
             
-        # Attach the current energy
+        # Attach the current energy; the zone stays empty until the player's next turn
+        self._save_item(target.attached_energies, current_energy)
+        count = target.attached_energies[current_energy]
         target.attach_energy(current_energy)
-        
-        # Move next energy to current if available
-        self.energy_zones[self.current_player_idx] = self.next_energy[self.current_player_idx]
-        self.next_energy[self.current_player_idx] = None
+        self._set(self.energy_zones, self.current_player_idx, None)
+        where = None
+        if self.event_log is not None or self._zobrist is not None:
+            where = (self.current_player_idx, slot) if slot is not None else self._locate(target)
+        if self.event_log is not None:
+            self.event_log += (events.ATTACH, self.current_player_idx, where[1] if where else 0,
+                               element_code(current_energy))
+        if self._zobrist is not None:
+            removed = KEYS['zone', self.current_player_idx, current_energy]
+            if where is not None:
+                player, slot = where
+                removed += KEYS['energy', player, slot, current_energy, count] if count else 0
+                self._rehash(removed, KEYS['energy', player, slot, current_energy, count + 1])
+            else:
+                self._rehash(removed, 0)
         return True
-        
+
+    @_reversible
+    def start_turn(self) -> None:
+        """Start of turn: refill the energy zone and draw a card.
+
+        The very first turn of the game gets neither.
+        """
+        player = self.current_player_idx
+        self._save_attr(self, 'retreated_this_turn')
+        self._save_attr(self, 'supporter_played_this_turn')
+        if self._zobrist is not None:
+            self._rehash(sum(KEYS['retreated', idx] for idx in (0, 1) if self.retreated_this_turn[idx]), 0)
+        self.retreated_this_turn = {0: False, 1: False}
+        self.supporter_played_this_turn = False
+        if self.event_log is not None:
+            self.event_log += (events.TURN, player, self.turn_number)
+        if self.turn_number > 1:
+            self.draw_new_player_energy(player, self.energy_types[player])
+            if self.players:
+                owner = self.players[player]
+                self._save_list(owner.deck)
+                self._save_list(owner.hand)
+                card = owner.draw_card()
+                if card is not None and self._zobrist is not None:
+                    self._rehash(0, KEYS['hand', player, card.spec])
+                if card is not None and self.event_log is not None:
+                    self.event_log += (events.DRAW, player, card_code(card.spec))
+        
+    @_reversible
     def end_turn(self):
         """Handle end of turn effects."""
         player = self.current_player_idx
+        self._save_rng()
+        for pokemon in ([self.active_pokemon[player]] if self.active_pokemon[player] else []) + self.benched_pokemon[player]:
+            self._save_pokemon(pokemon)
         
         # Apply status effects
         if self.active_pokemon[player]:
-            damage = self.active_pokemon[player].apply_status_effects()
+            damage = self._apply_status_effects(player, 0)
             if damage > 0:
-                self.apply_damage(self.active_pokemon[player], damage)
+                self.apply_damage(self.active_pokemon[player], damage, where=(player, 0))
                 
         for pokemon in self.benched_pokemon[player]:
             if pokemon:
-                damage = pokemon.apply_status_effects()
+                slot = self.benched_pokemon[player].index(pokemon) + 1
+                damage = self._apply_status_effects(player, slot)
                 if damage > 0:
-                    self.apply_damage(pokemon, damage)
+                    self.apply_damage(pokemon, damage, where=(player, slot))
         
         # Switch players
+        self._save_attr(self, 'current_player_idx')
+        self._save_attr(self, 'turn_number')
         self.current_player_idx = 1 - self.current_player_idx
         self.turn_number += 1
-        
-    def apply_damage(self, target, damage: int, owner_idx: int = None):
-        """Apply damage to a Pokemon and check if it's knocked out. owner_idx specifies which player's field to remove from."""
+        if self._zobrist is not None:
+            parity = KEYS['parity',]
+            self._rehash(0, parity) if self.turn_number & 1 else self._rehash(parity, 0)
+
+    def _apply_status_effects(self, player: int, slot: int) -> int:
+        """Run a Pokemon's end-of-turn status effects (which may cure its status); returns the damage due."""
+        pokemon = self.pokemon_in_slot(player, slot)
+        if self._zobrist is None or pokemon.status is None:
+            return pokemon.apply_status_effects(self.rng)
+        before = zobrist.pokemon_key(player, slot, pokemon)
+        damage = pokemon.apply_status_effects(self.rng)
+        self._rehash(before, zobrist.pokemon_key(player, slot, pokemon))
+        return damage
+
+    @_reversible
+    def pass_turn(self) -> None:
+        """End the current player's turn and start the opponent's, as one undo step."""
+        self.end_turn()
+        if self.check_win_condition() is None:
+            self.start_turn()
+        
+    def owner_of(self, pokemon: 'ActivePokemon') -> Optional[int]:
+        """Find which player has the given Pokemon in play."""
+        for idx in (0, 1):
+            if pokemon is self.active_pokemon[idx] or any(pokemon is p for p in self.benched_pokemon[idx]):
+                return idx
+        return None
+
+    @_reversible
+    def apply_damage(self, target, damage: int, owner_idx: int = None,
+                     where: Optional[Tuple[int, int]] = None):
+        """Apply damage to a Pokemon and check if it's knocked out.
+
+        A knocked out Pokemon is removed from its owner's field and its
+        points go to the owner's opponent. owner_idx specifies which player's
+        field to remove from; it is looked up on the board if not given.
+        where is the target's (player, slot) if the caller knows it, which
+        saves a board scan when logging or hashing.
+        """
+        hashing = self._zobrist is not None
+        logging = self.event_log is not None
+        if where is None and (hashing or logging):
+            where = self._locate(target)
+        if logging and where is not None:
+            self.event_log += (events.DAMAGE, where[0], where[1], damage)
+        if hashing and where is not None:
+            before = zobrist.pokemon_key(*where, target)
+        self._save_attr(target, 'damage_counters')
         target.damage_counters += damage
-        if target.is_knocked_out():
-            # If owner_idx is not provided, default to opponent of current player (legacy)
+        if not target.is_knocked_out():
+            if hashing and where is not None:
+                self._rehash(before, zobrist.pokemon_key(*where, target))
+            return
+        if owner_idx is None:
+            owner_idx = self.owner_of(target)
             if owner_idx is None:
-                owner_idx = self.current_player_idx
-            # Increment score
-            self.scores[owner_idx] += target.calculate_points()
-            # Remove from field
-            if target == self.active_pokemon[owner_idx]:
-                self.active_pokemon[owner_idx] = None
-                if not self.benched_pokemon[owner_idx]:
-                    # If no benched Pokemon, player loses
-                    if self.check_win_condition() is not None:
-                        return
-                if hasattr(self, 'faint_callback') and callable(self.faint_callback):
-                    self.faint_callback(target, owner_idx)
-            else:
-                if target in self.benched_pokemon[owner_idx]:
-                    self.benched_pokemon[owner_idx].remove(target)
-            # Call faint handler if set
+                return
+        if logging and where is not None:
+            self.event_log += (events.KNOCKOUT, where[0], where[1], target.calculate_points())
+        # Increment the opponent's score
+        scorer = 1 - owner_idx
+        if hashing:
+            self._rehash(KEYS['score', scorer, self.scores[scorer]],
+                         KEYS['score', scorer, self.scores[scorer] + target.calculate_points()])
+        self._set(self.scores, scorer, self.scores[scorer] + target.calculate_points())
+        # Remove from field; the benched Pokemon behind a knocked out one move up a slot
+        if hashing and where is not None:
+            self._rehash(before + zobrist.board_key(self, owner_idx) - zobrist.pokemon_key(*where, target), 0)
+        if target is self.active_pokemon[owner_idx]:
+            self._set(self.active_pokemon, owner_idx, None)
+        elif any(target is p for p in self.benched_pokemon[owner_idx]):
+            self._save_list(self.benched_pokemon[owner_idx])
+            self.benched_pokemon[owner_idx].remove(target)
+        if hashing and where is not None:
+            self._rehash(0, zobrist.board_key(self, owner_idx))
+        # Call faint handler if set (discard, promotion)
+        if hasattr(self, 'faint_callback') and callable(self.faint_callback):
+            self._save_rng()  # The callback may ask an agent, which may use the game's RNG
+            self.faint_callback(target, owner_idx)
+        else:
+            self.discard_card(owner_idx, target.card)
             
-        
     def check_win_condition(self) -> Optional[int]:
         """Check if either player has won."""
         
@@ -246,7 +663,8 @@ class GameState:
             if active is None and not bench:
                 # This player has no Pokémon left, opponent wins
                 opponent_idx = 1 - idx
-                print(f"{player.name} has no Pokémon left! {self.players[opponent_idx].name} wins!")
+                if self.verbose:
+                    print(f"{player.name} has no Pokémon left! {self.players[opponent_idx].name} wins!")
                 return opponent_idx + 1
             
         return None
@@ -264,9 +682,9 @@ class GameState:
             self.active_hand_card[player_idx] = card_idx
             
     def sync_hands_with_players(self):
-        """Update self.hands to match the actual player hand lists."""
+        """Point self.hands at the actual player hand lists, so they can't drift apart."""
         for idx, player in enumerate(self.players):
-            self.hands[idx] = list(player.hand)
+            self.hands[idx] = player.hand
             
     def initialize_player_energy(self, player_idx: int, energy_types: List[ElementType]) -> None:
         """Initialize a player's energy zones with random energy types from their deck.
@@ -276,9 +694,12 @@ class GameState:
             energy_types: List of energy types available in the player's deck
         """
         # Start with next_energy filled, energy_zone will be filled on first turn
-        import random
-        self.next_energy[player_idx] = random.choice(energy_types)
+        self.energy_types[player_idx] = list(energy_types)
+        self.next_energy[player_idx] = self.rng.choice(energy_types)
+        if self.event_log is not None:
+            self.event_log += (events.ENERGY, player_idx, element_code(None), element_code(self.next_energy[player_idx]))
         
+    @_reversible
     def draw_new_player_energy(self, player_idx: int, energy_types: List[ElementType]) -> None:
         """Update a player's energy zones at the beginning of their turn.
         
@@ -289,67 +710,103 @@ class GameState:
             player_idx: The player index (0 or 1)
             energy_types: List of energy types available in the player's deck
         """
+        old_zone, old_next = self.energy_zones[player_idx], self.next_energy[player_idx]
         # Move the next energy to the current energy zone
-        self.energy_zones[player_idx] = self.next_energy[player_idx]
+        self._set(self.energy_zones, player_idx, old_next)
         
         # Draw a new random energy for the next energy zone
-        import random
-        self.next_energy[player_idx] = random.choice(energy_types)
+        self._save_rng()
+        self._set(self.next_energy, player_idx, self.rng.choice(energy_types))
+        if self.event_log is not None:
+            self.event_log += (events.ENERGY, player_idx, element_code(old_next),
+                               element_code(self.next_energy[player_idx]))
+        if self._zobrist is not None:
+            key = zobrist.energy_key
+            new_next = self.next_energy[player_idx]
+            self._rehash(key('zone', player_idx, old_zone) + key('next', player_idx, old_next),
+                         key('zone', player_idx, old_next) + key('next', player_idx, new_next))
         
     def discard_card(self, player_idx: int, card):
         """Move a card to the player's card discard pile."""
+        self._save_list(self.card_discard_piles[player_idx])
         self.card_discard_piles[player_idx].append(card)
         
     def discard_energy(self, player_idx: int, energy_type):
         """Move an energy to the player's energy discard pile."""
+        self._save_list(self.energy_discard_piles[player_idx])
         self.energy_discard_piles[player_idx].append(energy_type)
         
     def set_active_pokemon(self, player_idx: int, pokemon: Pokemon):
         """Set the active Pokemon for a player during setup."""
         self.active_pokemon[player_idx] = ActivePokemon(pokemon, turn_played=0)
+        if self.event_log is not None:
+            self.event_log += (events.SETUP_ACTIVE, player_idx, card_code(pokemon.spec))
 
     def add_benched_pokemon(self, player_idx: int, pokemon: Pokemon):
         """Add a Pokemon to the player's bench during setup (max 3)."""
         if len(self.benched_pokemon[player_idx]) < 3:
             self.benched_pokemon[player_idx].append(ActivePokemon(pokemon, turn_played=0))
+            if self.event_log is not None:
+                self.event_log += (events.SETUP_BENCH, player_idx, card_code(pokemon.spec))
             
-    def execute_attack(self, attacker: 'ActivePokemon', attack: dict, turn: int) -> None:
-        """Execute an attack from the given ActivePokemon using the attack dict."""
-        target_type = attack.get('target', 'opponent_active')
-        damage = int(attack.get('damage', '0').replace('+', '').replace('-', ''))  # Basic parsing
+    @_reversible
+    def execute_attack(self, attacker: 'ActivePokemon', attack: AttackSpec, turn: int,
+                       attack_idx: Optional[int] = None) -> List[Tuple['ActivePokemon', int]]:
+        """Execute an attack from the given ActivePokemon.
+
+        Args:
+            attack_idx: The attack's index on the card, for the replay log; looked up if not given
+
+        Returns:
+            The (target, damage) pairs that were hit, in order
+        """
+        if not isinstance(attack, AttackSpec):
+            attack = AttackSpec.from_dict(attack, attacker.card.name)
+        if self.event_log is not None:
+            if attack_idx is None:
+                attack_idx = next((i for i, known in enumerate(attacker.card.attacks)
+                                   if known is attack or known.name == attack.name), 0)
+            self.event_log += (events.ATTACK, self.current_player_idx, attack_idx)
+        target_type = attack.target
+        damage = attack.damage_spec.base  # Modifiers from effect text aren't resolved yet
         opponent_idx = 1 - self.current_player_idx
         targets = []
+        if target_type != 'opponent_active':
+            self._save_rng()
         
-        # Determine targets
+        # Determine targets; where is the slot of an Active target, found by apply_damage otherwise
+        where = None
         if target_type == 'opponent_active':
             if self.active_pokemon[opponent_idx]:
                 targets = [self.active_pokemon[opponent_idx]]
+                where = (opponent_idx, 0)
         elif target_type == 'opponent_bench':
             if self.benched_pokemon[opponent_idx]:
                 # Pick one at random for now; can add menu for manual
-                import random
-                targets = [random.choice(self.benched_pokemon[opponent_idx])]
+                targets = [self.rng.choice(self.benched_pokemon[opponent_idx])]
         elif target_type == 'random_opponent':
             all_targets = [p for p in ([self.active_pokemon[opponent_idx]] if self.active_pokemon[opponent_idx] else []) + self.benched_pokemon[opponent_idx]]
             if all_targets:
-                import random
-                targets = [random.choice(all_targets)]
+                targets = [self.rng.choice(all_targets)]
         elif target_type == 'multi_random':
             all_targets = [p for p in ([self.active_pokemon[opponent_idx]] if self.active_pokemon[opponent_idx] else []) + self.benched_pokemon[opponent_idx]]
-            import random
             n = min(2, len(all_targets))  # Example: hit 2 at random
-            targets = random.sample(all_targets, n) if all_targets else []
+            targets = self.rng.sample(all_targets, n) if all_targets else []
         else:
             # Default to opponent active
             if self.active_pokemon[opponent_idx]:
                 targets = [self.active_pokemon[opponent_idx]]
+                where = (opponent_idx, 0)
         
         # Apply damage to each target
+        hits = []
         for target in targets:
-            # Weakness check
-            if target.weakness and attacker.element_type.name.upper() == str(target.weakness).upper():
+            # Weakness check, against the element compiled from the card's weakness text
+            if target.card.spec.weakness_type is attacker.element_type:
                 total_damage = damage + 20
             else:
                 total_damage = damage
-            self.apply_damage(target, total_damage)
+            hits.append((target, total_damage))
+            self.apply_damage(target, total_damage, owner_idx=opponent_idx, where=where)
         # TODO: handle attack effects, abilities, and status conditions
+        return hits
@@ -0,0 +1,172 @@
+"""Opt-in timing of the engine's phases and actions.
+
+Instrumentation is off by default and then costs nothing: no hook is
+installed and the engine's methods are the plain ones. enable() wraps the
+methods listed in PHASES (and Game._apply_action, per action kind) in place,
+so each call adds to a counter of
+
+    calls     times the phase ran
+    seconds   wall time spent in it, including the phases it calls
+    blocks    net memory blocks it left allocated (sys.getallocatedblocks)
+
+and disable() puts the original methods back. Phases nest (the main phase
+includes legal_actions, actions and attacks), so times are inclusive.
+
+Counters are plain data: worker processes save theirs to a directory (one
+file per process, see save) and the driver merges them with load_dir.
+"""
+import json
+import os
+import sys
+import time
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import actions, game
+from .game import Game
+from .game_state import GameState
+
+# (phase name, owner, attribute) of every wrapped method or module function
+PHASES: Tuple[Tuple[str, object, str], ...] = (
+    ('game', Game, 'run'),
+    ('setup', Game, 'setup_game'),
+    ('start_turn', Game, '_start_turn_phase'),
+    ('main_phase', Game, '_handle_main_phase'),
+    ('legal_actions', game, 'legal_actions'),
+    ('attack', GameState, 'execute_attack'),
+    ('knockout', Game, 'handle_pokemon_faint'),
+    ('end_turn', Game, '_end_turn_phase'),
+    ('check_win', GameState, 'check_win_condition'),
+)
+
+_counters: Optional['Counters'] = None
+_originals: List[Tuple[object, str, Callable]] = []
+
+
+class Counters:
+    """Calls, wall time and net allocated blocks per phase name."""
+
+    def __init__(self, totals: Optional[Dict[str, List[float]]] = None):
+        self.totals: Dict[str, List[float]] = totals if totals is not None else {}
+
+    def add(self, name: str, seconds: float, blocks: int) -> None:
+        entry = self.totals.get(name)
+        if entry is None:
+            entry = self.totals[name] = [0, 0.0, 0]
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] += blocks
+
+    def merge(self, other: 'Counters') -> 'Counters':
+        for name, (calls, seconds, blocks) in other.totals.items():
+            entry = self.totals.setdefault(name, [0, 0.0, 0])
+            entry[0] += calls
+            entry[1] += seconds
+            entry[2] += blocks
+        return self
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {name: {'calls': calls, 'seconds': seconds, 'blocks': blocks}
+                for name, (calls, seconds, blocks) in sorted(self.totals.items())}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Dict[str, float]]) -> 'Counters':
+        return cls({name: [entry['calls'], entry['seconds'], entry['blocks']] for name, entry in data.items()})
+
+    def save(self, path: str) -> None:
+        """Write the counters as JSON (atomically, so a reader never sees half a file)."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'Counters':
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def load_dir(cls, directory: str) -> 'Counters':
+        """Merge every process's counters saved in a directory."""
+        merged = cls()
+        for name in sorted(os.listdir(directory)):
+            if name.startswith('counters-') and name.endswith('.json'):
+                merged.merge(cls.load(os.path.join(directory, name)))
+        return merged
+
+    def summary(self) -> str:
+        """Table of every phase, slowest first."""
+        total = self.totals.get('game', [0, 0.0, 0])[1] or sum(entry[1] for entry in self.totals.values())
+        lines = [f"{'phase':<24} {'calls':>10} {'total s':>9} {'share':>6} {'us/call':>9} {'blocks/call':>11}"]
+        for name, (calls, seconds, blocks) in sorted(self.totals.items(), key=lambda item: -item[1][1]):
+            share = seconds / total if total else 0.0
+            lines.append(f"{name:<24} {calls:>10} {seconds:>9.3f} {share:>6.1%} "
+                         f"{seconds / calls * 1e6:>9.1f} {blocks / calls:>11.1f}")
+        return "\n".join(lines)
+
+
+def _no_blocks() -> int:
+    return 0
+
+
+def _timed(name: Callable[..., str], function: Callable, allocated: Callable[[], int]) -> Callable:
+    """Wrap a function so every call is added to the active counters under name(*args)."""
+    clock = time.perf_counter
+
+    @wraps(function)
+    def timed(*args, **kwargs):
+        blocks = allocated()
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _counters.add(name(*args), clock() - start, allocated() - blocks)
+    return timed
+
+
+def _action_name(game_: Game, player_idx: int, action: actions.Action) -> str:
+    return f"action:{actions.KIND_NAMES[action[0]]}"
+
+
+def enable(counters: Optional[Counters] = None, allocations: bool = True) -> Counters:
+    """Start counting into counters (a fresh set by default) and return them.
+
+    Only games created after this call are fully counted: a game binds its
+    knock out callback when it is created.
+
+    Args:
+        allocations: Also count allocated blocks. Reading the block count walks
+            the allocator's arenas, which makes for most of the overhead while
+            enabled; without it the blocks column stays 0.
+    """
+    global _counters
+    if _originals:
+        disable()
+    _counters = counters if counters is not None else Counters()
+    allocated = sys.getallocatedblocks if allocations else _no_blocks
+    for phase, owner, attribute in PHASES:
+        function = getattr(owner, attribute)
+        _originals.append((owner, attribute, function))
+        setattr(owner, attribute, _timed(lambda *args, phase=phase: phase, function, allocated))
+    _originals.append((Game, '_apply_action', Game._apply_action))
+    Game._apply_action = _timed(_action_name, Game._apply_action, allocated)
+    return _counters
+
+
+def disable() -> Optional[Counters]:
+    """Put the original methods back and return the counters collected since enable()."""
+    global _counters
+    while _originals:
+        owner, attribute, function = _originals.pop()
+        setattr(owner, attribute, function)
+    counters, _counters = _counters, None
+    return counters
+
+
+def enabled() -> bool:
+    return _counters is not None
+
+
+def current() -> Optional[Counters]:
+    """The counters being collected, or None when instrumentation is off."""
+    return _counters
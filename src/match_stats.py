@@ -0,0 +1,209 @@
+"""Streaming matchup statistics and sequential early stopping.
+
+MatchupStats keeps running totals for one deck-vs-deck matchup in constant
+memory: results are folded in one at a time and never stored. Win rates and
+their intervals are over decisive games (draws are counted separately), as
+is the SPRT that decides when a matchup's winner is settled.
+"""
+import math
+from statistics import NormalDist
+from typing import Optional, Sequence, Tuple
+
+
+def wilson_interval(successes: float, trials: float, confidence: float = 0.95) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion; (0, 1) with no trials."""
+    if trials <= 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def _beta_fraction(a: float, b: float, x: float) -> float:
+    """Continued fraction for the incomplete beta function (modified Lentz)."""
+    tiny = 1e-300
+    c, d = 1.0, 1 - (a + b) * x / (a + 1)
+    d = 1 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 500):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1 + numerator * d
+            d = 1 / (d if abs(d) > tiny else tiny)
+            c = 1 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1) < 1e-14:
+            break
+    return h
+
+
+def beta_cdf(x: float, a: float, b: float) -> float:
+    """P(X <= x) for X ~ Beta(a, b) (the regularized incomplete beta function)."""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                 + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(log_front) * _beta_fraction(a, b, x) / a
+    return 1 - math.exp(log_front) * _beta_fraction(b, a, 1 - x) / b
+
+
+def beta_quantile(q: float, a: float, b: float) -> float:
+    """Inverse of beta_cdf, by bisection."""
+    low, high = 0.0, 1.0
+    for _ in range(60):
+        middle = (low + high) / 2
+        if beta_cdf(middle, a, b) < q:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def credible_interval(successes: float, failures: float, confidence: float = 0.95,
+                      prior: Tuple[float, float] = (1.0, 1.0)) -> Tuple[float, float]:
+    """Equal-tailed Bayesian interval from the Beta posterior (uniform prior by default)."""
+    a, b = prior[0] + successes, prior[1] + failures
+    tail = (1 - confidence) / 2
+    return beta_quantile(tail, a, b), beta_quantile(1 - tail, a, b)
+
+
+class SPRT:
+    """Wald's sequential probability ratio test for "which deck is better".
+
+    Runs two one-sided tests over decisive games, both against an even
+    matchup (win rate 0.5): one for deck 1 winning 0.5 + margin, one for
+    deck 2 doing so. Either alternative being accepted settles the matchup
+    for that deck; both tests accepting the even matchup settles it as even.
+    The log-likelihood ratios are linear in wins and losses, so a check is
+    O(1). Matchups with an edge just under the margin take the longest to
+    settle; cap them with the number of games.
+
+    Args:
+        margin: Smallest edge worth detecting
+        alpha: Chance of naming a winner of an even matchup (per side)
+        beta: Chance of missing an edge of the full margin
+    """
+
+    def __init__(self, margin: float = 0.05, alpha: float = 0.05, beta: float = 0.05):
+        if not 0 < margin < 0.5:
+            raise ValueError("margin must be between 0 and 0.5")
+        self.margin = margin
+        # Log-likelihood ratio steps for a win and a loss under "deck 1 is better"
+        self.win_step = math.log((0.5 + margin) / 0.5)
+        self.loss_step = math.log((0.5 - margin) / 0.5)
+        self.upper = math.log((1 - beta) / alpha)
+        self.lower = math.log(beta / (1 - alpha))
+
+    def llr(self, wins: int, losses: int) -> float:
+        """Log-likelihood ratio of "the winning side has the margin" against an even matchup."""
+        return wins * self.win_step + losses * self.loss_step
+
+    def decide(self, wins: int, losses: int) -> Optional[int]:
+        """1 or -1 when deck 1 or deck 2 is settled as better, 0 when settled as even, None to keep playing."""
+        deck1, deck2 = self.llr(wins, losses), self.llr(losses, wins)
+        if deck1 >= self.upper:
+            return 1
+        if deck2 >= self.upper:
+            return -1
+        if deck1 <= self.lower and deck2 <= self.lower:
+            return 0
+        return None
+
+
+class MatchupStats:
+    """Running results of one matchup; deck 1 always plays as player 1.
+
+    Attributes:
+        wins: Wins for (deck 1, deck 2)
+        first_games: Games in which (deck 1, deck 2) went first
+        first_wins: Wins by (deck 1, deck 2) when it went first
+        win_turns: Total final turn number of (deck 1, deck 2)'s wins
+        knockouts: Knock outs scored by (deck 1, deck 2)
+        decision: The SPRT's verdict once it has settled (see SPRT.decide), else None
+        settled_after: Games played when the SPRT settled the matchup
+    """
+
+    __slots__ = ('games', 'draws', 'wins', 'first_games', 'first_wins', 'win_turns', 'knockouts',
+                 'decision', 'settled_after')
+
+    def __init__(self):
+        self.games = 0
+        self.draws = 0
+        self.wins = [0, 0]
+        self.first_games = [0, 0]
+        self.first_wins = [0, 0]
+        self.win_turns = [0, 0]
+        self.knockouts = [0, 0]
+        self.decision: Optional[int] = None
+        self.settled_after: Optional[int] = None
+
+    def record(self, winner: int, first_player: int, turns: int, knockouts: Sequence[int] = (0, 0)) -> None:
+        """Add one game: winner is 1, 2 or 0 for a draw, first_player is 0 or 1."""
+        self.games += 1
+        self.first_games[first_player] += 1
+        self.knockouts[0] += knockouts[0]
+        self.knockouts[1] += knockouts[1]
+        if not winner:
+            self.draws += 1
+            return
+        self.wins[winner - 1] += 1
+        self.win_turns[winner - 1] += turns
+        if winner - 1 == first_player:
+            self.first_wins[first_player] += 1
+
+    @property
+    def decisive(self) -> int:
+        return self.wins[0] + self.wins[1]
+
+    @property
+    def win_rate(self) -> float:
+        """Deck 1's share of the decisive games."""
+        return self.wins[0] / self.decisive if self.decisive else 0.5
+
+    def first_player_win_rate(self) -> float:
+        """Share of decisive games won by whichever deck went first."""
+        first_wins = self.first_wins[0] + self.first_wins[1]
+        return first_wins / self.decisive if self.decisive else 0.5
+
+    def average_turns_to_win(self, deck: int) -> float:
+        """Average final turn of deck (0 or 1)'s wins."""
+        return self.win_turns[deck] / self.wins[deck] if self.wins[deck] else 0.0
+
+    def wilson(self, confidence: float = 0.95) -> Tuple[float, float]:
+        return wilson_interval(self.wins[0], self.decisive, confidence)
+
+    def credible(self, confidence: float = 0.95) -> Tuple[float, float]:
+        return credible_interval(self.wins[0], self.wins[1], confidence)
+
+    def probability_deck1_better(self) -> float:
+        """Posterior probability (uniform prior) that deck 1 wins more than half its decisive games."""
+        return 1 - beta_cdf(0.5, 1 + self.wins[0], 1 + self.wins[1])
+
+    def check(self, sprt: SPRT) -> bool:
+        """Run the SPRT on the results so far; True once the matchup is settled."""
+        if self.decision is None:
+            self.decision = sprt.decide(self.wins[0], self.wins[1])
+            if self.decision is not None:
+                self.settled_after = self.games
+        return self.decision is not None
+
+    def summary(self, names: Tuple[str, str] = ("Deck 1", "Deck 2")) -> str:
+        low, high = self.wilson()
+        credible_low, credible_high = self.credible()
+        lines = [f"{names[0]} vs {names[1]}: {self.wins[0]}-{self.wins[1]} ({self.draws} draws), "
+                 f"{names[0]} wins {self.win_rate:.1%} [Wilson {low:.1%}-{high:.1%}, "
+                 f"Bayes {credible_low:.1%}-{credible_high:.1%}]",
+                 f"    going first wins {self.first_player_win_rate():.1%}; "
+                 f"avg turns to win {self.average_turns_to_win(0):.1f}/{self.average_turns_to_win(1):.1f}; "
+                 f"KOs {self.knockouts[0]}/{self.knockouts[1]}"]
+        if self.decision is not None:
+            verdict = "as even" if self.decision == 0 else f"for {names[0 if self.decision > 0 else 1]}"
+            lines[-1] += f"; settled {verdict} after {self.settled_after} games"
+        return "\n".join(lines)
@@ -0,0 +1,266 @@
+"""Monte Carlo Tree Search agent.
+
+The search runs on the live GameState: every iteration applies moves with
+the reversible GameState operations and rolls them back with undo(), so no
+positions are copied.
+
+Chance is handled open-loop. Each iteration first re-deals the hidden
+information (deck orders, the opponent's hand) and reseeds the game RNG, so
+energy zone draws, coin flips, card draws and random bench targets are
+sampled afresh every time a node is passed through. Tree nodes are
+therefore keyed by the action sequence only; as the legal moves can differ
+between samples, selection uses each child's availability count (the
+number of visits in which it was legal) in the UCB term.
+"""
+import math
+import random
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, TYPE_CHECKING
+
+from .actions import ATTACK, PROMOTE, Action, apply_action, legal_actions, to_move
+from .agents import Agent, GreedyAgent
+from .zobrist import TranspositionTable, information_set_hash
+
+if TYPE_CHECKING:
+    from .game_state import GameState
+
+
+class _Node:
+    __slots__ = ('parent', 'action', 'player', 'children', 'visits', 'value', 'available')
+
+    def __init__(self, parent: Optional['_Node'], action: Optional[Action], player: int):
+        self.parent = parent
+        self.action = action
+        self.player = player  # Who chose the action leading here; value is from their side
+        self.children: Dict[Action, '_Node'] = {}
+        self.visits = 0
+        self.value = 0.0
+        self.available = 1
+
+
+class SearchStats:
+    """Totals over every search an agent ran."""
+
+    def __init__(self):
+        self.searches = 0
+        self.iterations = 0
+        self.nodes = 0
+        self.elapsed = 0.0
+
+    @classmethod
+    def combine(cls, stats: Iterable['SearchStats']) -> 'SearchStats':
+        """Totals over several agents' stats, e.g. one agent per game."""
+        total = cls()
+        for item in stats:
+            total.searches += item.searches
+            total.iterations += item.iterations
+            total.nodes += item.nodes
+            total.elapsed += item.elapsed
+        return total
+
+    @property
+    def nodes_per_sec(self) -> float:
+        """Tree nodes expanded per second of search."""
+        return self.nodes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def iterations_per_sec(self) -> float:
+        return self.iterations / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.searches} searches, {self.iterations} iterations, {self.nodes} nodes in "
+                f"{self.elapsed:.2f}s ({self.nodes_per_sec:.0f} nodes/sec, "
+                f"{self.iterations_per_sec:.0f} iterations/sec)")
+
+
+class MCTSAgent(Agent):
+    """Chooses main-phase actions by open-loop MCTS with greedy rollouts.
+
+    Args:
+        time_budget: Wall-clock seconds per move (None for no limit)
+        node_budget: Iterations per move, each expanding at most one node (None for no limit)
+        exploration: UCB exploration constant
+        rollout_turns: Turns a rollout may play past the root before it is scored heuristically
+        check_interval: Iterations between clock reads
+        rng: Source of the search's own randomness (determinization, tie-breaks)
+        rollout_agent: Policy for rollouts; defaults to GreedyAgent
+        transposition_table: Table of leaf evaluations by position hash, which may be shared
+            with other agents; a leaf already in it is scored from the table instead of a rollout
+
+    At least one budget must be set. Setup, promotion and target choices use
+    the base Agent behaviour; attach/retreat targets are part of the searched
+    actions.
+    """
+
+    def __init__(self, time_budget: Optional[float] = 0.1, node_budget: Optional[int] = None,
+                 exploration: float = 1.4, rollout_turns: int = 6, check_interval: int = 16,
+                 rng: Optional[random.Random] = None, rollout_agent: Optional[Agent] = None,
+                 transposition_table: Optional[TranspositionTable] = None):
+        if time_budget is None and node_budget is None:
+            raise ValueError("MCTSAgent needs a time_budget or a node_budget")
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.exploration = exploration
+        self.rollout_turns = rollout_turns
+        self.check_interval = max(1, check_interval)
+        self.rng = rng or random.Random()
+        self.rollout_agent = rollout_agent or GreedyAgent()
+        self.table = transposition_table
+        self.stats = SearchStats()
+
+    def choose_promotion(self, state: 'GameState', player_idx: int, bench_indices: List[int]) -> int:
+        # Bring in the healthiest benched Pokemon
+        bench = state.benched_pokemon[player_idx]
+        return max(bench_indices, key=lambda idx: bench[idx].current_hp)
+
+    def choose_action(self, state: 'GameState', player_idx: int, actions: Sequence[Action]) -> Action:
+        if len(actions) == 1:
+            return actions[0]
+        root = self.search(state, player_idx, actions)
+        best = max((root.children[action] for action in actions if action in root.children),
+                   key=lambda child: child.visits)
+        return best.action
+
+    def search(self, state: 'GameState', player_idx: int, actions: Sequence[Action]) -> _Node:
+        """Run one budgeted search from the current position and return the root node.
+
+        The state is left exactly as it was found.
+        """
+        start = time.perf_counter()
+        deadline = start + self.time_budget if self.time_budget is not None else None
+        root = _Node(None, None, 1 - player_idx)
+        callback, verbose, event_log = getattr(state, 'faint_callback', None), state.verbose, state.event_log
+        # Promotions become PROMOTE moves in the tree instead of calls back into the game
+        state.faint_callback = None
+        state.verbose = False
+        state.event_log = None  # Searched moves must not reach a replay
+        started_recording = not state.recording
+        if started_recording:
+            state.start_recording()
+        started_hashing = self.table is not None and not state.hashing
+        if started_hashing:
+            state.start_hashing()
+        base_depth = state.undo_depth
+        iterations = nodes = 0
+        try:
+            while True:
+                nodes += self._iterate(state, root, player_idx, actions)
+                iterations += 1
+                while state.undo_depth > base_depth:
+                    state.undo()
+                if self.node_budget is not None and iterations >= self.node_budget:
+                    break
+                if deadline is not None and iterations % self.check_interval == 0 and time.perf_counter() >= deadline:
+                    break
+        finally:
+            while state.undo_depth > base_depth:
+                state.undo()
+            if started_recording:
+                state.stop_recording()
+            if started_hashing:
+                state.stop_hashing()
+            state.faint_callback = callback
+            state.verbose = verbose
+            state.event_log = event_log
+        stats = self.stats
+        stats.searches += 1
+        stats.iterations += iterations
+        stats.nodes += nodes
+        stats.elapsed += time.perf_counter() - start
+        return root
+
+    def _iterate(self, state: 'GameState', root: _Node, player_idx: int, root_actions: Sequence[Action]) -> int:
+        """Sample hidden information, select, expand one node, roll out, back up. Returns nodes added."""
+        state.resample_hidden(player_idx, self.rng)
+        node = root
+        added = 0
+        winner = None
+        legal = list(root_actions)
+        mover = player_idx
+        while True:
+            children = node.children
+            untried = [action for action in legal if action not in children]
+            for action in legal:
+                child = children.get(action)
+                if child is not None:
+                    child.available += 1
+            if untried:
+                # legal_actions order: plays and attachments first, END_TURN last
+                action = untried[0]
+                child = children[action] = _Node(node, action, mover)
+                added = 1
+            else:
+                child = self._select(node, legal)
+            winner = self._play(state, child.action)
+            node = child
+            if added or winner is not None:
+                break
+            mover = to_move(state)
+            legal = legal_actions(state, mover)
+        if winner is not None:
+            reward0 = self._reward(state, winner)
+        elif self.table is None:
+            reward0 = self._reward(state, self._rollout(state, state.turn_number + self.rollout_turns))
+        else:
+            # Hidden cards are re-dealt every iteration, so positions are looked up as the searcher sees them
+            key = information_set_hash(state, player_idx)
+            entry = self.table.probe(key)
+            if entry is not None:
+                reward0 = entry.value
+            else:
+                reward0 = self._reward(state, self._rollout(state, state.turn_number + self.rollout_turns))
+                self.table.store(key, reward0, depth=1)
+        # Back up: rewards are from the side of the player who chose each node's action
+        while node is not None:
+            node.visits += 1
+            node.value += reward0 if node.player == 0 else 1.0 - reward0
+            node = node.parent
+        return added
+
+    def _select(self, node: _Node, legal: Sequence[Action]) -> _Node:
+        c = self.exploration
+        best, best_score = None, -1.0
+        for action in legal:
+            child = node.children[action]
+            score = child.value / child.visits + c * math.sqrt(math.log(child.available) / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    @staticmethod
+    def _play(state: 'GameState', action: Action) -> Optional[int]:
+        """Apply an action with the engine's turn structure (an attack ends the turn); returns the winner if any."""
+        apply_action(state, action)
+        winner = state.check_win_condition()
+        if winner is None and action[0] == ATTACK:
+            state.pass_turn()
+            winner = state.check_win_condition()
+        return winner
+
+    def _rollout(self, state: 'GameState', turn_limit: int) -> Optional[int]:
+        agent = self.rollout_agent
+        while state.turn_number <= turn_limit:
+            mover = to_move(state)
+            legal = legal_actions(state, mover)
+            if legal[0][0] == PROMOTE:
+                action = (PROMOTE, agent.choose_promotion(state, mover, [a[1] for a in legal]))
+            else:
+                action = agent.choose_action(state, mover, legal)
+            winner = self._play(state, action)
+            if winner is not None:
+                return winner
+        return None
+
+    @staticmethod
+    def _reward(state: 'GameState', winner: Optional[int]) -> float:
+        """Player 0's reward in [0, 1]: the result, or a score/HP estimate for unfinished rollouts."""
+        if winner is not None:
+            return 1.0 if winner == 1 else 0.0
+        # Points dominate; then remaining HP, board size and attached energy
+        material = [0.0, 0.0]
+        for player in (0, 1):
+            for _, pokemon in state.board_slots(player):
+                material[player] += (0.1 + 0.1 * (pokemon.hp - pokemon.damage_counters) / 100
+                                     + 0.03 * pokemon.get_total_energy())
+        estimate = 0.5 + 0.15 * (state.scores[0] - state.scores[1]) + 0.1 * (material[0] - material[1])
+        return min(1.0, max(0.0, estimate))
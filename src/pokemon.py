@@ -1,6 +1,7 @@
 """Pokemon card implementation."""
-from typing import Dict, Any, List, TYPE_CHECKING
+from typing import Dict, Any, Union, TYPE_CHECKING
 from .cards import Card
+from .card_spec import CardSpec
 from .elementTypes import ElementType, StatusCondition
 
 if TYPE_CHECKING:
@@ -9,27 +10,22 @@ if TYPE_CHECKING:
 
 
 class Pokemon(Card):
-    def __init__(self, card_data: Dict[str, Any]):
+    KIND = 'pokemon'
+
+    def __init__(self, card_data: Union[CardSpec, Dict[str, Any]]):
         super().__init__(card_data)
-        self.name = card_data.get('name', 'Unknown')
-        self.hp = int(card_data.get('hp', 0))
-        self.evolution_type = card_data.get('evolution_type', 'Basic')
-        self.element_type = self._parse_element_type(card_data)
-        self.weakness = card_data.get('weakness')
-        self.retreat_cost = int(card_data.get('retreat', 0))
-        self.is_ex = card_data.get('ex', 'No') == 'Yes'
-        #json data will have line like: "card_type": "Pokémon - Stage 1 - Evolves from Bidoof",
-        self.evolves_from = False if not 'evolves from' in card_data['card_type'].lower() else card_data['card_type'].lower().split('evolves from ')[-1]
-        
-        # Parse attacks
-        self.attacks = self._parse_attacks(card_data.get('attacks', []))
-        
-        # Parse ability
-        ability_data = card_data.get('ability', {})
-        self.ability = {
-            'name': ability_data.get('name') if ability_data else 'No ability',
-            'effect': ability_data.get('effect') if ability_data else 'N/A'
-        }
+        spec = self.spec
+        self.hp = spec.hp
+        self.evolution_type = spec.evolution_type
+        self.element_type = spec.element_type
+        self.weakness = spec.weakness
+        self.retreat_cost = spec.retreat_cost
+        self.is_ex = spec.is_ex
+        # Lower-cased name of the previous stage, or False for Basic Pokemon
+        self.evolves_from = spec.evolves_from
+        # Pre-parsed attacks and ability are shared with every other copy of this card
+        self.attacks = spec.attacks
+        self.ability = spec.ability
         
     def play(self, game_state: 'GameState', current_turn: int) -> bool:
         """Play this Pokemon card according to game rules."""
@@ -41,25 +37,3 @@ class Pokemon(Card):
     def calculate_points(self) -> int:
         """Calculate points value when knocked out."""
         return 2 if self.is_ex else 1
-        
-    def _parse_element_type(self, card_data: Dict[str, Any]) -> ElementType:
-        """Parse the element type from card data."""
-        # Extract type from card_type field, e.g., "Pokémon - Basic Fire" -> "Fire"
-        type_str = card_data.get('type', '').split()[-1]
-        try:
-            return ElementType[type_str.upper()]
-        except (KeyError, AttributeError):
-            return ElementType.COLORLESS
-
-    def _parse_attacks(self, attacks_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Parse attacks data from card definition, including target field."""
-        parsed_attacks = []
-        for attack in attacks_data:
-            parsed_attacks.append({
-                'name': attack.get('name', ''),
-                'cost': [ElementType[cost.upper()] for cost in attack.get('cost', [])],
-                'damage': attack.get('damage', '0'),
-                'effect': attack.get('effect', ''),
-                'target': attack.get('target', 'opponent_active')  # Default to opponent's active
-            })
-        return parsed_attacks
@@ -0,0 +1,187 @@
+"""Profiling of simulation batches: flamegraph stacks and hot-function reports.
+
+A Profiler samples the Python stack on a CPU-time timer (SIGPROF): every
+interval of CPU time the interrupted stack is counted once, in collapsed
+form ("outer;inner;leaf count"), which flamegraph.pl, speedscope and
+inferno read directly. Sampling costs little and doesn't change which code
+is slow. With calls=True it also runs cProfile, for exact call counts and
+per-function times (the samples then include cProfile's own overhead).
+
+Worker processes save their profiles to a directory, one set of files per
+process, and load_dir merges them:
+
+    stacks-<pid>.folded    collapsed stacks
+    profile-<pid>.pstats   cProfile stats (with calls=True)
+
+Sampling needs SIGPROF, so on platforms without it only cProfile is available.
+"""
+import cProfile
+import os
+import pstats
+import signal
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SAMPLING = hasattr(signal, 'SIGPROF')
+
+_labels: Dict[object, str] = {}
+
+
+def _label(code) -> str:
+    """'src/game_state.py:GameState.execute_attack' for a code object (cached per code object)."""
+    label = _labels.get(code)
+    if label is None:
+        path = os.path.abspath(code.co_filename)
+        path = os.path.relpath(path, ROOT) if path.startswith(ROOT + os.sep) else os.path.basename(path)
+        label = _labels[code] = f"{path.replace(os.sep, '/')}:{getattr(code, 'co_qualname', code.co_name)}"
+    return label
+
+
+class Profiler:
+    """Collapsed stack samples (and optionally cProfile stats) for one process.
+
+    Args:
+        interval: Seconds of CPU time between stack samples
+        calls: Also run cProfile
+    """
+
+    def __init__(self, interval: float = 0.001, calls: bool = False):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.calls = calls
+        self._profile = cProfile.Profile() if calls else None
+        self._previous_handler = None
+        self.running = False
+
+    def _sample(self, signum, frame) -> None:
+        stack = []
+        while frame is not None:
+            stack.append(_label(frame.f_code))
+            frame = frame.f_back
+        self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        if SAMPLING:
+            self._previous_handler = signal.signal(signal.SIGPROF, self._sample)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        if self._profile is not None:
+            self._profile.enable()
+        self.running = True
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        if self._profile is not None:
+            self._profile.disable()
+        if SAMPLING:
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        self.running = False
+
+    def save(self, directory: str, tag: Optional[str] = None) -> None:
+        """Write this process's stacks (and stats) to directory, replacing what it wrote before."""
+        tag = tag or str(os.getpid())
+        write_collapsed(self.stacks, os.path.join(directory, f"stacks-{tag}.folded"))
+        if self._profile is not None:
+            running = self.running
+            # dump_stats stops the profiler; it keeps its totals when enabled again
+            self._profile.dump_stats(os.path.join(directory, f"profile-{tag}.pstats"))
+            if running:
+                self._profile.enable()
+
+
+def write_collapsed(stacks: Counter, path: str) -> None:
+    """Write collapsed stacks, heaviest first, one 'frame;frame;frame count' line each."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    os.replace(tmp_path, path)
+
+
+def read_collapsed(path: str) -> Counter:
+    stacks: Counter = Counter()
+    with open(path) as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack:
+                stacks[stack] += int(count)
+    return stacks
+
+
+def load_dir(directory: str) -> Tuple[Counter, Optional[pstats.Stats]]:
+    """Merge every process's stacks and cProfile stats saved in a directory."""
+    stacks: Counter = Counter()
+    stats = None
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.startswith('stacks-') and name.endswith('.folded'):
+            stacks.update(read_collapsed(path))
+        elif name.startswith('profile-') and name.endswith('.pstats'):
+            if stats is None:
+                stats = pstats.Stats(path)
+            else:
+                stats.add(path)
+    return stacks, stats
+
+
+def hot_functions(stacks: Counter, prefix: str = 'src/', limit: int = 25) -> List[Tuple[str, int, int]]:
+    """(function, self samples, total samples) for functions under prefix, by self samples."""
+    own: Counter = Counter()
+    total: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(';')
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    rows = [(frame, own[frame], total[frame]) for frame in total if frame.startswith(prefix)]
+    rows.sort(key=lambda row: (-row[1], -row[2]))
+    return rows[:limit]
+
+
+def report(stacks: Counter, stats: Optional[pstats.Stats] = None, prefix: str = 'src/', limit: int = 25) -> str:
+    """Ranked hot-function table for modules under prefix, from the samples and (if given) cProfile."""
+    samples = sum(stacks.values())
+    lines = []
+    if samples:
+        lines.append(f"{samples} samples; functions in {prefix} by self time")
+        lines.append(f"{'self':>7} {'total':>7}  function")
+        for frame, own, total in hot_functions(stacks, prefix, limit):
+            lines.append(f"{own / samples:>7.1%} {total / samples:>7.1%}  {frame}")
+    if stats is not None:
+        rows = []
+        for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+            path = os.path.abspath(filename)
+            where = os.path.relpath(path, ROOT).replace(os.sep, '/')
+            # The sampler's own handler shows up in cProfile too
+            if path.startswith(ROOT + os.sep) and where.startswith(prefix) and path != os.path.abspath(__file__):
+                rows.append((own, cumulative, calls, f"{where}:{line}({name})"))
+        rows.sort(reverse=True)
+        if lines:
+            lines.append("")
+        lines.append(f"cProfile; functions in {prefix} by own time")
+        lines.append(f"{'own s':>8} {'cum s':>8} {'calls':>10}  function")
+        for own, cumulative, calls, where in rows[:limit]:
+            lines.append(f"{own:>8.3f} {cumulative:>8.3f} {calls:>10}  {where}")
+    return "\n".join(lines)
+
+
+def write_outputs(directory: str, parts: Optional[str] = None) -> str:
+    """Merge per-process files into stacks.folded, profile.pstats and hot.txt in directory; returns the report.
+
+    Args:
+        parts: Directory holding this run's per-process files (directory itself by default);
+            give each run a fresh one, or earlier runs' files are merged in too
+    """
+    stacks, stats = load_dir(directory if parts is None else parts)
+    write_collapsed(stacks, os.path.join(directory, 'stacks.folded'))
+    pstats_path = os.path.join(directory, 'profile.pstats')
+    if stats is not None:
+        stats.dump_stats(pstats_path)
+    elif os.path.exists(pstats_path):
+        os.remove(pstats_path)  # From an earlier run with cProfile
+    text = report(stacks, stats)
+    with open(os.path.join(directory, 'hot.txt'), 'w') as f:
+        f.write(text + "\n")
+    return text
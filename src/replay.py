@@ -0,0 +1,505 @@
+"""Compact binary replay logs.
+
+A replay shard file is ``MAGIC`` followed by game records back to back,
+appended one finished game at a time. Each record is:
+
+    RECORD_HEADER   fixed size: body length, format version, winner, first
+                    player, turns, RNG seed, both decks' fingerprints
+    body            unsigned LEB128 varints: for each player the deck list
+                    (card count, card codes, energy count, element codes),
+                    then the game's event stream (see src.events) to the end
+
+The fixed header lets a reader filter on outcome, length or deck and skip
+a whole record by its length without decoding the body.
+
+Workers each append to their own shard (``ReplayWriter.for_shard``), so no
+locking is needed; a shard only ever grows by whole records.
+``ReplayReader`` memory-maps shards and ``resimulate`` replays a record
+through ``Game`` to rebuild its states.
+"""
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from . import events
+from .actions import ATTACH_ENERGY, ATTACK, END_TURN, EVOLVE, PLAY_BASIC, PROMOTE, RETREAT, Action
+from .agents import Agent
+from .card_registry import get_registry
+from .card_spec import CardSpec
+from .deck import Deck, deck_fingerprint
+from .events import card_code, element_code, element_of
+from .game import Game
+from .pokemon import ElementType
+from .rng import GameRandom
+
+MAGIC = b'PTCGRPL\x01'
+FORMAT_VERSION = 1
+# body length, version, winner, first player, turns, seed, deck fingerprints (player 1, player 2)
+RECORD_HEADER = struct.Struct('<IBBBHQQQ')
+SHARD_PATTERN = 'replays-{}.bin'
+
+# Encoded bytes of every value below 2**14 (one or two bytes); card codes and
+# event fields all fit, so encoding is a table lookup per value
+_SMALL_VARINTS = [bytes((value,)) for value in range(0x80)] + \
+    [bytes(((value & 0x7F) | 0x80, value >> 7)) for value in range(0x80, 0x4000)]
+
+
+def encode_varints(values: Sequence[int]) -> bytearray:
+    """Unsigned LEB128: 7 bits per byte, high bit set on all but the last byte of a value."""
+    try:
+        out = bytearray(values)
+        if out.isascii():
+            return out  # Every value below 0x80 is its own byte, as in most event streams
+    except ValueError:
+        pass  # A value of 256 or more
+    try:
+        return bytearray(b''.join(map(_SMALL_VARINTS.__getitem__, values)))
+    except IndexError:
+        pass  # A value of 2**14 or more
+    out = bytearray()
+    append = out.append
+    for value in values:
+        while value > 0x7F:
+            append((value & 0x7F) | 0x80)
+            value >>= 7
+        append(value)
+    return out
+
+
+def decode_varints(data: Sequence[int], start: int = 0, end: Optional[int] = None) -> List[int]:
+    """Decode every varint in data[start:end]."""
+    end = len(data) if end is None else end
+    values = []
+    append = values.append
+    pos = start
+    while pos < end:
+        byte = data[pos]
+        pos += 1
+        if byte < 0x80:
+            append(byte)
+            continue
+        value = byte & 0x7F
+        shift = 7
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        append(value)
+    return values
+
+
+DeckList = Tuple[Tuple[CardSpec, ...], Tuple[ElementType, ...]]
+
+
+@lru_cache(maxsize=1024)
+def _deck_lists(decks: Tuple[DeckList, ...]) -> Tuple[bytes, Tuple[int, ...]]:
+    """Encoded deck lists and fingerprints of both players' decks.
+
+    The same few decks are recorded over and over in a campaign, so this is
+    computed once per pairing.
+    """
+    values = []
+    for specs, energy_types in decks:
+        values.append(len(specs))
+        values.extend(card_code(spec) for spec in specs)
+        values.append(len(energy_types))
+        values.extend(element_code(element) for element in energy_types)
+    fingerprints = tuple(deck_fingerprint(specs, energy_types) for specs, energy_types in decks)
+    return bytes(encode_varints(values)), fingerprints
+
+
+class GameRecorder:
+    """Captures one game's events; create it before ``game.run()``.
+
+    The seed is the game RNG's starting state (GameRandom only; 0 otherwise)
+    and the decks are captured before play starts drawing from them.
+    """
+
+    def __init__(self, game: 'Game'):
+        state = game.state
+        self.seed = state.rng.getstate() if isinstance(state.rng, GameRandom) else 0
+        self.decks = tuple((tuple(card.spec for card in deck.cards), tuple(deck.energy_types))
+                           for deck in game._player_decks)
+        self.game = game
+        self.events: List[int] = []
+        state.event_log = self.events
+
+    def record(self, winner: int) -> bytes:
+        """Encode the finished game as one replay record and stop recording."""
+        game = self.game
+        game.state.event_log = None
+        decks, fingerprints = _deck_lists(self.decks)
+        events_body = encode_varints(self.events)
+        header = RECORD_HEADER.pack(len(decks) + len(events_body), FORMAT_VERSION, winner,
+                                    game.first_player_idx or 0, min(game.state.turn_number, 0xFFFF),
+                                    self.seed, *fingerprints)
+        return header + decks + events_body
+
+
+class ReplayWriter:
+    """Buffered, append-only writer for one replay shard file.
+
+    Records collect in memory and go to disk in ``buffer_size`` chunks (and
+    on flush/close), each as a single append.
+
+    Args:
+        path: Shard file; created with the MAGIC header if missing or empty
+        buffer_size: Bytes to buffer before writing
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1 << 20):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.games = 0
+        fresh = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'ab')
+        self._buffer = bytearray(MAGIC if fresh else b'')
+
+    @classmethod
+    def for_shard(cls, directory: str, shard: Optional[object] = None, **kwargs) -> 'ReplayWriter':
+        """Open ``directory/replays-<shard>.bin``; the shard defaults to this process's pid."""
+        os.makedirs(directory, exist_ok=True)
+        shard = os.getpid() if shard is None else shard
+        return cls(os.path.join(directory, SHARD_PATTERN.format(shard)), **kwargs)
+
+    def record(self, game: 'Game') -> GameRecorder:
+        """Start recording a game; pass the recorder to ``finish`` after it has run."""
+        return GameRecorder(game)
+
+    def finish(self, recorder: GameRecorder, winner: int) -> None:
+        self.write(recorder.record(winner))
+
+    def write(self, record: bytes) -> None:
+        self._buffer += record
+        self.games += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self._buffer.clear()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self) -> 'ReplayWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _read_varint(data: Sequence[int], pos: int) -> Tuple[int, int]:
+    """One varint at pos; returns (value, position after it)."""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class ReplayRecord:
+    """One game in a replay shard, decoded on demand.
+
+    Records read from a ReplayReader point into its memory maps and can only
+    be decoded while the reader is open.
+    """
+
+    __slots__ = ('winner', 'first_player', 'turns', 'seed', 'fingerprints',
+                 '_data', '_start', '_end', '_decks', '_events_start', '_values')
+
+    def __init__(self, header: Tuple[int, ...], data: Sequence[int], start: int):
+        length, _, self.winner, self.first_player, self.turns, self.seed, fingerprint1, fingerprint2 = header
+        self.fingerprints = (fingerprint1, fingerprint2)
+        self._data = data
+        self._start = start
+        self._end = start + length
+        self._decks: Optional[List[Tuple[List[int], List[int]]]] = None
+        self._events_start = 0
+        self._values: Optional[List[int]] = None
+
+    @property
+    def decks(self) -> List[Tuple[List[int], List[int]]]:
+        """Each player's (card codes, element codes), in the order the deck was dealt from."""
+        if self._decks is None:
+            data, pos, decks = self._data, self._start, []
+            for _ in range(2):
+                lists = []
+                for _ in range(2):
+                    count, pos = _read_varint(data, pos)
+                    codes = []
+                    for _ in range(count):
+                        code, pos = _read_varint(data, pos)
+                        codes.append(code)
+                    lists.append(codes)
+                decks.append((lists[0], lists[1]))
+            self._decks, self._events_start = decks, pos
+        return self._decks
+
+    def card_codes(self) -> set:
+        """Codes of every card in either deck (see src.events.card_code)."""
+        return {code for cards, _ in self.decks for code in cards}
+
+    @property
+    def event_values(self) -> List[int]:
+        """The flat event stream, as GameState.event_log recorded it."""
+        if self._values is None:
+            self.decks  # Decoding the deck lists finds where the events start
+            self._values = decode_varints(self._data, self._events_start, self._end)
+        return self._values
+
+    def events(self) -> Iterator[Tuple[int, ...]]:
+        """Yield each event as a (kind, *args) tuple."""
+        values = self.event_values
+        arity = events.ARITY
+        pos = 0
+        while pos < len(values):
+            end = pos + 1 + arity[values[pos]]
+            yield tuple(values[pos:end])
+            pos = end
+
+    def build_decks(self) -> List[Deck]:
+        """Both players' decks, rebuilt from the card registry."""
+        registry = get_registry()
+        built = []
+        for cards, elements in self.decks:
+            if not all(cards):
+                raise ValueError("Replay has cards that aren't in the card registry")
+            built.append(Deck.from_specs(registry.specs(code - 1 for code in cards),
+                                         [element_of(code) for code in elements]))
+        return built
+
+
+def _card_code_of(card) -> int:
+    if isinstance(card, int):
+        return card + 1
+    return card_code(getattr(card, 'spec', card))
+
+
+def shard_paths(paths: Union[str, Iterable[str]]) -> List[str]:
+    """Expand shard files and directories of shards into a sorted list of files."""
+    if isinstance(paths, str):
+        paths = [paths]
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                if name.startswith('replays-') and name.endswith('.bin')))
+        else:
+            found.append(path)
+    return found
+
+
+class ReplayReader:
+    """Streams records from replay shards through read-only memory maps.
+
+    Filters are checked against the fixed record header first, so records
+    that don't match on deck, turns or outcome are skipped without decoding
+    anything; a card filter only decodes the deck lists. A trailing partial
+    record (from a writer that was killed mid-append) is ignored.
+
+    Args:
+        paths: A shard file, a directory of shards, or a list of either
+    """
+
+    def __init__(self, paths: Union[str, Iterable[str]]):
+        self.paths = shard_paths(paths)
+        self._maps: List[mmap.mmap] = []
+
+    def _map(self, path: str) -> Optional[mmap.mmap]:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if data[:len(MAGIC)] != MAGIC:
+            data.close()
+            raise ValueError(f"{path} is not a replay file")
+        self._maps.append(data)
+        return data
+
+    def __iter__(self) -> Iterator[ReplayRecord]:
+        return self.records()
+
+    def records(self, deck: Union[Deck, int, None] = None, card=None, turns: Optional[Tuple[int, int]] = None,
+                winner: Optional[int] = None) -> Iterator[ReplayRecord]:
+        """Yield the records that match every filter given.
+
+        Args:
+            deck: A Deck or deck fingerprint that either player used
+            card: A card, CardSpec or registry uid that either deck contains
+            turns: Inclusive (first, last) range for the game's final turn number
+            winner: 1, 2, or 0 for draws
+        """
+        fingerprint = deck.fingerprint if isinstance(deck, Deck) else deck
+        code = _card_code_of(card) if card is not None else None
+        size, unpack = RECORD_HEADER.size, RECORD_HEADER.unpack_from
+        for path in self.paths:
+            data = self._map(path)
+            if data is None:
+                continue
+            pos, total = len(MAGIC), len(data)
+            while pos + size <= total:
+                header = unpack(data, pos)
+                start = pos + size
+                pos = start + header[0]
+                if pos > total:
+                    break
+                if header[1] != FORMAT_VERSION:
+                    raise ValueError(f"{path}: unsupported replay format version {header[1]}")
+                if winner is not None and header[2] != winner:
+                    continue
+                if turns is not None and not turns[0] <= header[4] <= turns[1]:
+                    continue
+                if fingerprint is not None and fingerprint not in header[6:]:
+                    continue
+                record = ReplayRecord(header, data, start)
+                if code is not None and code not in record.card_codes():
+                    continue
+                yield record
+
+    def close(self) -> None:
+        for data in self._maps:
+            data.close()
+        self._maps.clear()
+
+    def __enter__(self) -> 'ReplayReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class _Paused(Exception):
+    """Raised by _ReplayAgent to stop a re-simulation at a decision point."""
+
+
+class _ReplayAgent(Agent):
+    """Checks a re-simulation against the record at every decision and makes the recorded choice.
+
+    With an ``inner`` agent, the choice is left to it instead (for agents
+    whose decisions draw from the game's RNG).
+    """
+
+    def __init__(self, record: ReplayRecord, until: Optional[int], inner: Optional[Agent] = None):
+        self.recorded = record.event_values
+        # Offset of every event in the flat stream, to turn offsets into event indices
+        self.starts = []
+        pos = 0
+        while pos < len(self.recorded):
+            self.starts.append(pos)
+            pos += 1 + events.ARITY[self.recorded[pos]]
+        self.until = until
+        self.inner = inner
+        self.checked = 0
+
+    def start_game(self, state, player_idx: int) -> None:
+        if self.inner is not None:
+            self.inner.start_game(state, player_idx)
+
+    def _next(self, state) -> Tuple[int, ...]:
+        """The recorded event at the current position, after checking everything since the last decision."""
+        log, recorded = state.event_log, self.recorded
+        pos = len(log)
+        if log[self.checked:] != recorded[self.checked:pos]:
+            mismatch = next(i for i in range(self.checked, pos) if i >= len(recorded) or log[i] != recorded[i])
+            raise ValueError(f"Re-simulation diverged from the replay at event "
+                             f"{bisect_left(self.starts, mismatch + 1) - 1}")
+        self.checked = pos
+        if pos >= len(recorded) or (self.until is not None and bisect_left(self.starts, pos) >= self.until):
+            raise _Paused
+        return tuple(recorded[pos:pos + 1 + events.ARITY[recorded[pos]]])
+
+    def choose_setup(self, state, player_idx: int, basic_indices: List[int]) -> Tuple[int, List[int]]:
+        self._next(state)
+        if self.inner is not None:
+            return self.inner.choose_setup(state, player_idx, basic_indices)
+        # The Active and bench placements follow one another in the log
+        hand, remaining, chosen = state.players[player_idx].hand, list(basic_indices), []
+        pos = len(state.event_log)
+        while pos < len(self.recorded) and self.recorded[pos] in (events.SETUP_ACTIVE, events.SETUP_BENCH) \
+                and self.recorded[pos + 1] == player_idx:
+            code = self.recorded[pos + 2]
+            idx = next(i for i in remaining if card_code(hand[i].spec) == code)
+            remaining.remove(idx)
+            chosen.append(idx)
+            pos += 3
+        return chosen[0], chosen[1:]
+
+    def choose_promotion(self, state, player_idx: int, bench_indices: List[int]) -> int:
+        event = self._next(state)
+        if self.inner is not None:
+            return self.inner.choose_promotion(state, player_idx, bench_indices)
+        return event[2]
+
+    def choose_action(self, state, player_idx: int, actions: Sequence[Action]) -> Action:
+        event = self._next(state)
+        if self.inner is not None:
+            return self.inner.choose_action(state, player_idx, actions)
+        kind = event[0]
+        hand = state.players[player_idx].hand
+        if kind == events.PLAY_BASIC:
+            matches = [a for a in actions if a[0] == PLAY_BASIC and card_code(hand[a[1]].spec) == event[2]]
+        elif kind == events.EVOLVE:
+            matches = [a for a in actions if a[0] == EVOLVE and a[2] == event[3]
+                       and card_code(hand[a[1]].spec) == event[2]]
+        elif kind == events.ATTACH:
+            matches = [(ATTACH_ENERGY, event[2])]
+        elif kind == events.RETREAT:
+            matches = [(RETREAT, event[2])]
+        elif kind == events.ATTACK:
+            matches = [(ATTACK, event[2])]
+        elif kind == events.PROMOTE:
+            matches = [(PROMOTE, event[2])]
+        else:
+            matches = [(END_TURN,)]
+        if not matches or matches[0] not in actions:
+            raise ValueError(f"Recorded move {events.KIND_NAMES[kind]} {event[1:]} is not legal in the re-simulation")
+        return matches[0]
+
+
+def resimulate(record: ReplayRecord, until: Optional[int] = None,
+               agents: Optional[Sequence[Agent]] = None) -> Game:
+    """Play a recorded game again from its seed, checking every event against the record.
+
+    The RNG is restarted from the recorded seed, so shuffles, draws, energy
+    and coin flips come out the same, and the recorded decisions are made
+    again. Any difference from the recorded event stream raises ValueError.
+
+    Args:
+        record: A record from ReplayReader (written with a GameRandom game RNG)
+        until: Stop at the first decision at or after this event index and return
+            the game there (``game.winner`` is None); play to the end if not given
+        agents: The game's original agents, to re-run instead of following the
+            recorded decisions; needed when they drew from the game's RNG
+
+    Returns:
+        The Game, with its state as of the stopping point
+    """
+    deck1, deck2 = record.build_decks()
+    # A draw stopped at the turn limit; replaying with that limit ends it at the same point
+    max_turns = record.turns - 1 if record.winner == 0 else record.turns
+    inner = list(agents) if agents is not None else [None, None]
+    game = Game("Player 1", deck1, "Player 2", deck2, headless=True,
+                agents=[_ReplayAgent(record, until, agent) for agent in inner],
+                max_turns=max_turns, rng=GameRandom(record.seed))
+    game.state.event_log = []
+    try:
+        game.winner = game.run()
+    except _Paused:
+        game.winner = None
+    if game.winner is not None and (game.state.event_log != record.event_values or game.winner != record.winner):
+        raise ValueError("Re-simulation diverged from the replay")
+    return game
@@ -0,0 +1,140 @@
+"""Persistent store of finished tournament games.
+
+Each game is stored under the key that fully determines its result:
+
+    engine   fingerprint of the rules code (ENGINE_FILES) and the card data
+    agents   agent classes and turn cap (see agent_config)
+    deck1    fingerprint of player 1's deck (src.deck.deck_fingerprint)
+    deck2    fingerprint of player 2's deck
+    seed     campaign seed
+    game     game number within the matchup; the game was played with game_rng(seed, game)
+
+so a runner can look up a seed range of a matchup and only simulate the
+games that are missing. Opening a store drops every game recorded under a
+different engine fingerprint, so edits to the rules invalidate old results
+without anyone having to remember to clear the cache.
+
+The database is SQLite in WAL mode (readers don't block the writer), and
+games are inserted in batches, each in a single transaction.
+"""
+import os
+import sqlite3
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from .agents import Agent
+from .card_registry import CARDLIST_PATH
+
+# Modules whose code decides game results: turn flow, rules, move generation,
+# the agents' policies, card compilation and the RNG
+ENGINE_FILES = ('game.py', 'game_state.py', 'active_pokemon.py', 'actions.py', 'agents.py', 'mcts.py',
+                'zobrist.py', 'card_spec.py', 'cards.py', 'pokemon.py', 'trainer.py', 'deck.py', 'rng.py')
+
+# winner, first player, turns, knock outs by player 1 and player 2
+StoredGame = Tuple[int, int, int, int, int]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    engine TEXT NOT NULL,
+    agents TEXT NOT NULL,
+    deck1 INTEGER NOT NULL,
+    deck2 INTEGER NOT NULL,
+    seed INTEGER NOT NULL,
+    game INTEGER NOT NULL,
+    winner INTEGER NOT NULL,
+    first_player INTEGER NOT NULL,
+    turns INTEGER NOT NULL,
+    knockouts1 INTEGER NOT NULL,
+    knockouts2 INTEGER NOT NULL,
+    PRIMARY KEY (engine, agents, deck1, deck2, seed, game)
+) WITHOUT ROWID
+"""
+
+
+@lru_cache(maxsize=None)
+def engine_fingerprint() -> str:
+    """Hash of the rules modules' source and the card list; changes whenever either does."""
+    digest = blake2b(digest_size=8)
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in ENGINE_FILES:
+        with open(os.path.join(here, name), 'rb') as f:
+            digest.update(name.encode() + b'\0' + f.read())
+    with open(CARDLIST_PATH, 'rb') as f:
+        digest.update(b'CardList.json\0' + f.read())
+    return digest.hexdigest()
+
+
+def agent_config(agent_classes: Sequence[Type[Agent]], max_turns: Optional[int]) -> str:
+    """Canonical description of everything besides decks and seed that decides a game."""
+    names = ",".join(f"{cls.__module__}.{cls.__qualname__}" for cls in agent_classes)
+    return f"{names};max_turns={max_turns}"
+
+
+def _signed(value: int) -> int:
+    """SQLite integers are signed 64-bit; store unsigned hashes and seeds as their two's complement."""
+    value &= (1 << 64) - 1
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class ResultStore:
+    """SQLite-backed cache of finished games.
+
+    Args:
+        path: Database file (created if missing)
+        batch_size: Games to buffer before inserting them in one transaction
+        engine: Engine fingerprint to read and write under; defaults to the current code's
+    """
+
+    def __init__(self, path: str, batch_size: int = 1000, engine: Optional[str] = None):
+        self.path = path
+        self.batch_size = batch_size
+        self.engine = engine or engine_fingerprint()
+        self._pending: List[Tuple] = []
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.execute(_SCHEMA)
+            self.invalidated = self._db.execute("DELETE FROM games WHERE engine != ?", (self.engine,)).rowcount
+
+    def fetch(self, agents: str, deck1: int, deck2: int, seed: int, games: range) -> Dict[int, StoredGame]:
+        """Stored results of a matchup's games in a seed range, by game number."""
+        self.flush()
+        rows = self._db.execute(
+            "SELECT game, winner, first_player, turns, knockouts1, knockouts2 FROM games "
+            "WHERE engine = ? AND agents = ? AND deck1 = ? AND deck2 = ? AND seed = ? AND game >= ? AND game < ?",
+            (self.engine, agents, _signed(deck1), _signed(deck2), _signed(seed), games.start, games.stop))
+        return {row[0]: row[1:] for row in rows}
+
+    def add(self, agents: str, deck1: int, deck2: int, seed: int, game: int, result: StoredGame) -> None:
+        """Queue one game for the next batch insert."""
+        self._pending.append((self.engine, agents, _signed(deck1), _signed(deck2), _signed(seed), game, *result))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, agents: str, deck1: int, deck2: int, seed: int,
+                 games: Iterable[Tuple[int, StoredGame]]) -> None:
+        for game, result in games:
+            self.add(agents, deck1, deck2, seed, game, result)
+
+    def flush(self) -> None:
+        if self._pending:
+            with self._db:
+                self._db.executemany("INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                     self._pending)
+            self._pending.clear()
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._db.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def close(self) -> None:
+        self.flush()
+        self._db.close()
+
+    def __enter__(self) -> 'ResultStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
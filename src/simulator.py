@@ -0,0 +1,102 @@
+"""Headless batch simulation of games between two decks."""
+import random
+import time
+from typing import Callable, List, Optional, Sequence
+
+from .agents import Agent, GreedyAgent
+from .deck import Deck
+from .game import Game
+from .replay import ReplayWriter
+from .rng import game_rng, new_campaign_seed
+from .spectator import Spectator
+
+
+class SimulationReport:
+    """Outcome counts and throughput for a batch of simulated games."""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed  # Campaign seed; game i used src.rng.game_rng(seed, i)
+        self.games = 0
+        self.wins = [0, 0]
+        self.draws = 0
+        self.total_turns = 0
+        self.elapsed = 0.0
+
+    def record(self, winner: int, turns: int) -> None:
+        """Add one finished game (winner is 1, 2 or 0 for a draw)."""
+        self.games += 1
+        self.total_turns += turns
+        if winner:
+            self.wins[winner - 1] += 1
+        else:
+            self.draws += 1
+
+    @property
+    def games_per_sec(self) -> float:
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def average_turns(self) -> float:
+        return self.total_turns / self.games if self.games else 0.0
+
+    def win_rate(self, player_idx: int) -> float:
+        """Fraction of games won by player_idx (0 or 1)."""
+        return self.wins[player_idx] / self.games if self.games else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.games} games (seed {self.seed}) in {self.elapsed:.2f}s ({self.games_per_sec:.1f} games/sec) - "
+                f"P1 {self.wins[0]}, P2 {self.wins[1]}, draws {self.draws}, "
+                f"avg {self.average_turns:.1f} turns")
+
+
+def play_game(deck1: Deck, deck2: Deck, agents: Optional[Sequence[Agent]] = None,
+              max_turns: Optional[int] = None, rng: Optional[random.Random] = None,
+              replay: Optional[ReplayWriter] = None, spectator: Optional[Spectator] = None) -> Game:
+    """Play one headless game with fresh copies of both decks and return the finished Game.
+
+    The winner (1, 2, or 0 for a draw) is stored on ``game.winner``. With a
+    replay writer, the game's event stream is appended to it as one record;
+    with a (started) spectator, the game is drawn live.
+    """
+    game = Game("Player 1", deck1.copy(), "Player 2", deck2.copy(), headless=True,
+                agents=agents, max_turns=max_turns, rng=rng, spectator=spectator)
+    recorder = replay.record(game) if replay is not None else None
+    game.winner = game.run()
+    if spectator is not None:
+        spectator.publish(game.state, final=True)
+    if recorder is not None:
+        replay.finish(recorder, game.winner)
+    return game
+
+
+def simulate(deck1: Deck, deck2: Deck, games: int,
+             agent_factory: Optional[Callable[[], List[Agent]]] = None,
+             max_turns: Optional[int] = None, seed: Optional[int] = None,
+             replay: Optional[ReplayWriter] = None,
+             spectator: Optional[Spectator] = None) -> SimulationReport:
+    """Play a batch of headless games between two decks.
+
+    Args:
+        deck1: Deck for player 1 (never mutated; each game plays a fresh copy)
+        deck2: Deck for player 2
+        games: Number of games to play
+        agent_factory: Returns the two agents for a game; defaults to two GreedyAgents
+        max_turns: Turn cap per game (defaults to the engine's DEFAULT_MAX_TURNS)
+        seed: Campaign seed; game i is played with game_rng(seed, i). A fresh seed
+              is picked (and stored on the report) when not given.
+        replay: Writer to log every game to (see src.replay)
+        spectator: Started Spectator to draw the games live (see src.spectator)
+
+    Returns:
+        SimulationReport with results and games/sec
+    """
+    report = SimulationReport(new_campaign_seed() if seed is None else seed)
+    start = time.perf_counter()
+    for game_index in range(games):
+        agents = agent_factory() if agent_factory else [GreedyAgent(), GreedyAgent()]
+        if spectator is not None:
+            spectator.label = f"Game {game_index + 1}/{games}"
+        game = play_game(deck1, deck2, agents, max_turns, game_rng(report.seed, game_index), replay, spectator)
+        report.record(game.winner, game.state.turn_number)
+    report.elapsed = time.perf_counter() - start
+    return report
@@ -0,0 +1,193 @@
+"""Watching AI-vs-AI games live without slowing the engine down.
+
+The engine and the display never wait for each other. At each step (setup,
+every action, start and end of turn) the game calls Spectator.publish, which
+only checks a flag: the display thread raises it once per frame, and the
+next step then copies the bits of the state the board shows (see snapshot)
+and hands the copy over. Steps between two frames are never copied or drawn,
+and drawing (BoardView.refresh, which rewrites only the changed lines)
+happens on the display thread.
+
+Keys are read with readchar on a thread of their own:
+
+    p, space   pause the display (the game keeps running) / resume
+    f          fast-forward: ignore the pace and run at full speed
+    q          stop watching; the rest runs at full speed, undrawn
+
+A pace (seconds the engine waits after every step) makes fast games
+watchable; without one the game runs at full engine speed.
+"""
+import _thread
+import copy
+import sys
+import threading
+import time
+from typing import List, Optional
+
+from .board_view import BoardView
+from .game_state import GameState
+
+
+def snapshot(state: GameState) -> GameState:
+    """A copy of everything BoardView reads, safe to draw while the engine keeps changing the original.
+
+    Cards are shared (they never change); the containers and in-play Pokemon
+    holding the position are copied.
+    """
+    view = copy.copy(state)
+    view.players = [copy.copy(player) for player in state.players]
+    for player in view.players:
+        player.deck = list(player.deck)
+    view.active_pokemon = {idx: _pokemon(pokemon) for idx, pokemon in state.active_pokemon.items()}
+    view.benched_pokemon = {idx: [_pokemon(pokemon) for pokemon in bench]
+                            for idx, bench in state.benched_pokemon.items()}
+    view.hands = {idx: list(hand) for idx, hand in state.hands.items()}
+    view.card_discard_piles = {idx: list(pile) for idx, pile in state.card_discard_piles.items()}
+    view.energy_discard_piles = {idx: list(pile) for idx, pile in state.energy_discard_piles.items()}
+    for name in ('scores', 'energy_zones', 'next_energy', 'active_hand_card'):
+        setattr(view, name, dict(getattr(state, name)))
+    return view
+
+
+def _pokemon(pokemon):
+    if pokemon is None:
+        return None
+    pokemon = copy.copy(pokemon)
+    pokemon.attached_energies = dict(pokemon.attached_energies)
+    return pokemon
+
+
+class Spectator:
+    """Draws the games it is given on its own thread, at most fps frames a second.
+
+    Use it as a context manager (or start() / stop()) around the games, and
+    pass it to Game (or play_game / simulate) as spectator. Games should be
+    headless, so their log lines don't print over the board.
+
+    Args:
+        fps: Frames drawn per second at most
+        pace: Seconds the engine waits after every step; 0 runs at full speed
+        view: BoardView to draw with (a new one, writing to stdout, by default)
+        keys: Read the pause / fast-forward / quit keys (only when stdin is a terminal)
+    """
+
+    def __init__(self, fps: float = 10.0, pace: float = 0.0, view: Optional[BoardView] = None, keys: bool = True):
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+        self.fps = fps
+        self.pace = pace
+        self.view = view if view is not None else BoardView()
+        self.keys = keys
+        self.label = ""  # Shown in the status line, e.g. "Game 3/10"
+        self.paused = False
+        self.fast_forward = False
+        self.watching = True
+        self.steps = 0  # Steps published by the engine
+        self.frames = 0  # Frames drawn
+        self._wanted = True  # Raised by the display thread; the engine's next step answers it
+        self._latest: Optional[GameState] = None
+        self._drawn: Optional[GameState] = None
+        self._drawn_status: Optional[str] = None
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._terminal = None  # Saved terminal settings, restored by stop()
+
+    # --- Engine side ----------------------------------------------------------
+
+    def publish(self, state: GameState, final: bool = False) -> None:
+        """Called by the engine after every step; copies the state only when a frame wants it.
+
+        Args:
+            final: Always copy (the position a game ended in)
+        """
+        self.steps += 1
+        if self._wanted or final:
+            self._wanted = False
+            self._latest = snapshot(state)
+        if self.pace and not self.fast_forward and self.watching:
+            time.sleep(self.pace)
+
+    # --- Display side ---------------------------------------------------------
+
+    def status(self) -> str:
+        mode = "PAUSED" if self.paused else "FAST-FORWARD" if self.fast_forward else f"{self.fps:g} fps"
+        return f"{self.label}  [{mode}]  p: pause  f: fast-forward  q: stop watching".lstrip()
+
+    def draw(self) -> bool:
+        """Draw the latest snapshot if it (or the status line) is new; True if a frame was drawn."""
+        self._wanted = True  # Ask for a fresh sample at the engine's next step
+        state = self._drawn if self.paused else self._latest
+        if state is None or not self.watching:
+            return False
+        status = self.status()
+        if state is self._drawn and status == self._drawn_status:
+            return False
+        self.view.refresh(state, [status])
+        self._drawn, self._drawn_status = state, status
+        self.frames += 1
+        return True
+
+    def press(self, key: str) -> None:
+        """Handle a key press."""
+        if key in ('p', 'P', ' '):
+            self.paused = not self.paused
+        elif key in ('f', 'F'):
+            self.fast_forward = not self.fast_forward
+        elif key in ('q', 'Q'):
+            self.watching = False
+
+    def _draw_loop(self) -> None:
+        interval = 1.0 / self.fps
+        while not self._stop.wait(interval):
+            self.draw()
+
+    def _key_loop(self) -> None:
+        import readchar
+        while not self._stop.is_set():
+            try:
+                key = readchar.readkey()
+            except KeyboardInterrupt:
+                # readchar turns Ctrl-C into an exception on this thread; pass it on
+                _thread.interrupt_main()
+                return
+            self.press(key)
+
+    def _reads_keys(self) -> bool:
+        return self.keys and sys.stdin is not None and sys.stdin.isatty()
+
+    def start(self) -> 'Spectator':
+        self._stop.clear()
+        self.view.invalidate()
+        self._threads = [threading.Thread(target=self._draw_loop, name="spectator-draw", daemon=True)]
+        if self._reads_keys():
+            try:
+                import termios
+                self._terminal = termios.tcgetattr(sys.stdin.fileno())
+            except ImportError:
+                pass
+            # readkey blocks until a key comes; the thread is left behind at stop()
+            self._threads.append(threading.Thread(target=self._key_loop, name="spectator-keys", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the display thread and draw the final position."""
+        self._stop.set()
+        if self._threads:
+            self._threads[0].join()
+        self._threads = []
+        if self.watching:
+            self.paused = False
+            self.draw()
+        if self._terminal is not None:
+            # The key thread may still be blocked in readkey with echo off
+            import termios
+            termios.tcsetattr(sys.stdin.fileno(), termios.TCSADRAIN, self._terminal)
+            self._terminal = None
+
+    def __enter__(self) -> 'Spectator':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
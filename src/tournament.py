@@ -0,0 +1,419 @@
+"""Multiprocess tournament runner: many headless games across many deck matchups.
+
+Games are sharded into chunks and submitted to a process pool. Each worker
+loads the card database once (in the pool initializer), rebuilds every deck
+from its card uids, and returns a chunk's results packed into one bytes
+object of fixed-size records, so little is pickled per game.
+
+Game k of every matchup is played with ``game_rng(campaign_seed, k)``, so
+results don't depend on how games were split between workers or on which
+other matchups are in the tournament (and matchups share common random
+numbers). With a ResultStore, games already played under the same decks,
+seed, agents and rules are read back instead of simulated again.
+"""
+import multiprocessing
+import os
+import struct
+import time
+from collections import deque
+from itertools import combinations, islice
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+from .agents import Agent, GreedyAgent
+from .card_registry import get_registry
+from .deck import Deck, deck_fingerprint
+from .elementTypes import ElementType
+from .game import Game
+from . import instrument, profiling
+from .match_stats import SPRT, MatchupStats
+from .replay import ReplayWriter
+from .result_store import ResultStore, agent_config
+from .rng import game_rng, new_campaign_seed
+
+# game index, deck ids (player 1, player 2), winner (0 = draw), first player (0/1), turns,
+# knock outs by player 1 and player 2
+RESULT_RECORD = struct.Struct('<IHHBBHBB')
+
+
+class DeckEntry(NamedTuple):
+    """A deck by reference: registry card uids plus energy type names."""
+    name: str
+    card_uids: Tuple[int, ...]
+    energy_types: Tuple[str, ...]
+
+    @classmethod
+    def from_deck(cls, name: str, deck: Deck) -> 'DeckEntry':
+        """Describe a deck whose cards all come from the card registry."""
+        uids = tuple(spec.uid for spec in deck.specs)
+        if any(uid < 0 for uid in uids):
+            raise ValueError(f"Deck {name!r} has cards that aren't in the card registry")
+        return cls(name, uids, tuple(energy.name for energy in deck.energy_types))
+
+    def build(self) -> Deck:
+        """Build the Deck from the (already loaded) card registry."""
+        return Deck.from_specs(get_registry().specs(self.card_uids),
+                               [ElementType[energy] for energy in self.energy_types])
+
+    def fingerprint(self) -> int:
+        """The deck's fingerprint (see src.deck.deck_fingerprint), without building its cards."""
+        return deck_fingerprint(get_registry().specs(self.card_uids),
+                                [ElementType[energy] for energy in self.energy_types])
+
+
+class GameResult(NamedTuple):
+    """One finished tournament game."""
+    game_index: int
+    deck1: int
+    deck2: int
+    winner: int        # 1, 2 or 0 for a draw
+    first_player: int  # 0 or 1
+    turns: int
+    knockouts1: int = 0
+    knockouts2: int = 0
+
+
+def iter_records(data: bytes) -> Iterator[GameResult]:
+    """Unpack a chunk of RESULT_RECORDs."""
+    for fields in RESULT_RECORD.iter_unpack(data):
+        yield GameResult(*fields)
+
+
+# --- Worker side --------------------------------------------------------------
+
+_worker_decks: List[Deck] = []
+_worker_config: Dict = {}
+_worker_replay: Optional[ReplayWriter] = None
+_worker_counters: Optional[str] = None
+_worker_profiler: Optional[profiling.Profiler] = None
+_worker_profile_dir: Optional[str] = None
+
+
+def _init_worker(deck_entries: Sequence[DeckEntry], agent_classes: Tuple[Type[Agent], Type[Agent]],
+                 max_turns: Optional[int], campaign_seed: int, games_per_pair: int,
+                 replay_dir: Optional[str] = None, instrument_dir: Optional[str] = None,
+                 profile: Optional[Tuple[str, bool]] = None) -> None:
+    """Pool initializer: load the card database and every deck once per worker.
+
+    With a replay_dir, the worker appends its games to its own replay shard there.
+    With an instrument_dir, the worker times the engine's phases (see src.instrument)
+    and keeps its counters in its own file there. With a profile (directory, cProfile
+    too?), the worker profiles its games (see src.profiling) and saves them there.
+    """
+    global _worker_decks, _worker_config, _worker_replay, _worker_counters, _worker_profiler, _worker_profile_dir
+    _worker_decks = [entry.build() for entry in deck_entries]
+    _worker_config = {'agent_classes': agent_classes, 'max_turns': max_turns, 'campaign_seed': campaign_seed,
+                      'games_per_pair': games_per_pair}
+    if _worker_replay is not None:
+        _worker_replay.close()
+    _worker_replay = ReplayWriter.for_shard(replay_dir) if replay_dir else None
+    _worker_counters = None
+    if instrument_dir:
+        os.makedirs(instrument_dir, exist_ok=True)
+        _worker_counters = os.path.join(instrument_dir, f"counters-{os.getpid()}.json")
+        instrument.enable()
+    if _worker_profiler is not None:
+        _worker_profiler.stop()
+    _worker_profiler = _worker_profile_dir = None
+    if profile:
+        _worker_profile_dir = profile[0]
+        os.makedirs(_worker_profile_dir, exist_ok=True)
+        _worker_profiler = profiling.Profiler(calls=profile[1])
+        _worker_profiler.start()
+
+
+def _play_chunk(task: Tuple[int, int, int, int]) -> bytes:
+    """Play games [start, start + count) of the (deck1, deck2) matchup and pack the results."""
+    deck1, deck2, start, count = task
+    agent_classes = _worker_config['agent_classes']
+    campaign_seed = _worker_config['campaign_seed']
+    games_per_pair = _worker_config['games_per_pair']
+    out = bytearray()
+    for game_index in range(start, start + count):
+        # Matchups take consecutive blocks of game indices; the seed only depends on the game's place in its block
+        game = Game("Player 1", _worker_decks[deck1].copy(), "Player 2", _worker_decks[deck2].copy(),
+                    headless=True, agents=[cls() for cls in agent_classes], max_turns=_worker_config['max_turns'],
+                    rng=game_rng(campaign_seed, game_index % games_per_pair))
+        recorder = _worker_replay.record(game) if _worker_replay is not None else None
+        winner = game.run()
+        if recorder is not None:
+            _worker_replay.finish(recorder, winner)
+        out += RESULT_RECORD.pack(game_index, deck1, deck2, winner, game.first_player_idx,
+                                  min(game.state.turn_number, 0xFFFF), *game.knockouts)
+    if _worker_replay is not None:
+        # Workers can be replaced or terminated at any time; keep every finished chunk on disk
+        _worker_replay.flush()
+    if _worker_counters is not None:
+        instrument.current().save(_worker_counters)
+    if _worker_profiler is not None:
+        _worker_profiler.save(_worker_profile_dir)
+    return bytes(out)
+
+
+# --- Driver side --------------------------------------------------------------
+
+class TournamentReport:
+    """Per-matchup outcome counts, running statistics and overall throughput."""
+
+    def __init__(self, deck_names: Sequence[str], seed: Optional[int] = None):
+        self.deck_names = list(deck_names)
+        self.seed = seed
+        self.games = 0
+        self.elapsed = 0.0
+        # (deck1, deck2) -> [draws, deck1 wins, deck2 wins]
+        self.matchups: Dict[Tuple[int, int], List[int]] = {}
+        self.stats: Dict[Tuple[int, int], MatchupStats] = {}
+
+    def record(self, result: GameResult) -> None:
+        pair = (result.deck1, result.deck2)
+        self.games += 1
+        self.matchups.setdefault(pair, [0, 0, 0])[result.winner] += 1
+        stats = self.stats.get(pair)
+        if stats is None:
+            stats = self.stats[pair] = MatchupStats()
+        stats.record(result.winner, result.first_player, result.turns, (result.knockouts1, result.knockouts2))
+
+    @property
+    def games_per_sec(self) -> float:
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        lines = [f"{self.games} games (seed {self.seed}) in {self.elapsed:.2f}s ({self.games_per_sec:.1f} games/sec)"]
+        for (deck1, deck2), stats in sorted(self.stats.items()):
+            lines.append("  " + stats.summary((self.deck_names[deck1], self.deck_names[deck2])))
+        return "\n".join(lines)
+
+
+def round_robin(deck_count: int) -> List[Tuple[int, int]]:
+    """Every pairing of distinct decks once."""
+    return list(combinations(range(deck_count), 2))
+
+
+class TournamentRunner:
+    """Shards games for many deck matchups across a process pool.
+
+    Args:
+        decks: Decks to play; a deck's id is its position in this list
+        workers: Pool size; defaults to os.cpu_count(). 0 plays every game in this process.
+        chunk_size: Games per submitted task (bigger chunks mean less IPC per game)
+        worker_game_budget: Games a worker plays before it is replaced by a fresh
+            process (rounded to whole chunks); None keeps workers for the whole run
+        agent_classes: Agent class for each player, instantiated per game
+        max_turns: Turn cap per game
+        campaign_seed: Seed every game's RNG derives from; a fresh one is picked if not given
+        replay_dir: Directory to log every game to, one replay shard per worker process
+        store: Result store to reuse finished games from and save new ones to
+        instrument_dir: Directory for per-process phase timings (see src.instrument);
+            merge them with instrument.Counters.load_dir
+        profile_dir: Directory for per-process profiles (see src.profiling);
+            merge them with profiling.write_outputs
+        profile_calls: Profile with cProfile as well as stack sampling
+    """
+
+    def __init__(self, decks: Sequence[DeckEntry], workers: Optional[int] = None, chunk_size: int = 50,
+                 worker_game_budget: Optional[int] = None,
+                 agent_classes: Tuple[Type[Agent], Type[Agent]] = (GreedyAgent, GreedyAgent),
+                 max_turns: Optional[int] = None, campaign_seed: Optional[int] = None,
+                 replay_dir: Optional[str] = None, store: Optional[ResultStore] = None,
+                 instrument_dir: Optional[str] = None, profile_dir: Optional[str] = None,
+                 profile_calls: bool = False):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.decks = list(decks)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = chunk_size
+        self.worker_game_budget = worker_game_budget
+        self.agent_classes = tuple(agent_classes)
+        self.max_turns = max_turns
+        self.campaign_seed = new_campaign_seed() if campaign_seed is None else campaign_seed
+        self.replay_dir = replay_dir
+        self.store = store
+        self.instrument_dir = instrument_dir
+        self.profile = (profile_dir, profile_calls) if profile_dir else None
+        self.simulated = 0  # Games actually played (not read from the store) by the last run
+        self._fingerprints: Optional[List[int]] = None
+
+    def tasks(self, pairs: Iterable[Tuple[int, int]], games_per_pair: int) -> List[Tuple[int, int, int, int]]:
+        """Split every matchup into (deck1, deck2, first game index, game count) chunks.
+
+        Game indices are unique across the whole tournament: each matchup takes
+        the next block of games_per_pair of them.
+        """
+        tasks = []
+        base = 0
+        for deck1, deck2 in pairs:
+            for start in range(0, games_per_pair, self.chunk_size):
+                tasks.append((deck1, deck2, base + start, min(self.chunk_size, games_per_pair - start)))
+            base += games_per_pair
+        return tasks
+
+    def _init_args(self, games_per_pair: int) -> Tuple:
+        return (self.decks, self.agent_classes, self.max_turns, self.campaign_seed, games_per_pair,
+                self.replay_dir, self.instrument_dir, self.profile)
+
+    def _finish(self) -> None:
+        """Flush the store and stop timing and profiling games played in this process."""
+        if self.store is not None:
+            self.store.flush()
+        if self.workers == 0 and self.instrument_dir:
+            instrument.disable()
+        if self.workers == 0 and _worker_profiler is not None:
+            _worker_profiler.stop()
+
+    def _pool(self, games_per_pair: int) -> 'multiprocessing.pool.Pool':
+        max_tasks = None
+        if self.worker_game_budget:
+            max_tasks = max(1, self.worker_game_budget // self.chunk_size)
+        return multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=self._init_args(games_per_pair),
+                                    maxtasksperchild=max_tasks)
+
+    # --- Result store ---
+
+    def _plan(self, tasks: List[Tuple[int, int, int, int]],
+              games_per_pair: int) -> List[Tuple[Tuple[int, int, int, int], bytes, List[Tuple[int, int, int, int]]]]:
+        """Pair every chunk with the packed results the store already has for it and the sub-chunks left to play."""
+        if self.store is None:
+            return [(task, b'', [task]) for task in tasks]
+        if self._fingerprints is None:
+            self._fingerprints = [entry.fingerprint() for entry in self.decks]
+        agents = agent_config(self.agent_classes, self.max_turns)
+        stored: Dict[Tuple[int, int, int], Dict] = {}
+        plans = []
+        for task in tasks:
+            deck1, deck2, start, count = task
+            base = start - start % games_per_pair
+            games = stored.get((deck1, deck2, base))
+            if games is None:
+                games = stored[deck1, deck2, base] = self.store.fetch(
+                    agents, self._fingerprints[deck1], self._fingerprints[deck2], self.campaign_seed,
+                    range(games_per_pair))
+            cached, missing, run_start = bytearray(), [], None
+            for game_index in range(start, start + count):
+                result = games.get(game_index - base)
+                if result is None:
+                    run_start = game_index if run_start is None else run_start
+                    continue
+                if run_start is not None:
+                    missing.append((deck1, deck2, run_start, game_index - run_start))
+                    run_start = None
+                cached += RESULT_RECORD.pack(game_index, deck1, deck2, *result)
+            if run_start is not None:
+                missing.append((deck1, deck2, run_start, start + count - run_start))
+            plans.append((task, bytes(cached), missing))
+        return plans
+
+    def _played(self, data: bytes, games_per_pair: int) -> bytes:
+        """Count freshly simulated results and queue them for the store."""
+        self.simulated += len(data) // RESULT_RECORD.size
+        if self.store is not None:
+            agents = agent_config(self.agent_classes, self.max_turns)
+            for result in iter_records(data):
+                self.store.add(agents, self._fingerprints[result.deck1], self._fingerprints[result.deck2],
+                               self.campaign_seed, result.game_index % games_per_pair, tuple(result[3:]))
+        return data
+
+    @staticmethod
+    def _merge(chunks: Iterable[bytes]) -> bytes:
+        """Join packed results and put them back in game order."""
+        data = b''.join(chunks)
+        size = RESULT_RECORD.size
+        records = sorted((data[i:i + size] for i in range(0, len(data), size)),
+                         key=lambda record: RESULT_RECORD.unpack_from(record)[0])
+        return b''.join(records)
+
+    def iter_results(self, pairs: Iterable[Tuple[int, int]], games_per_pair: int) -> Iterator[GameResult]:
+        """Play the tournament, yielding results as chunks finish (in no particular order)."""
+        self.simulated = 0
+        plans = self._plan(self.tasks(pairs, games_per_pair), games_per_pair)
+        for _, cached, _ in plans:
+            yield from iter_records(cached)
+        missing = [sub for _, _, subs in plans for sub in subs]
+        try:
+            if not missing:
+                return
+            if self.workers == 0:
+                _init_worker(*self._init_args(games_per_pair))
+                for task in missing:
+                    yield from iter_records(self._played(_play_chunk(task), games_per_pair))
+                return
+            with self._pool(games_per_pair) as pool:
+                for data in pool.imap_unordered(_play_chunk, missing):
+                    yield from iter_records(self._played(data, games_per_pair))
+        finally:
+            self._finish()
+
+    def iter_sequential(self, pairs: Iterable[Tuple[int, int]], games_per_pair: int,
+                        settled: Callable[[GameResult], bool]) -> Iterator[GameResult]:
+        """Play the tournament, yielding each matchup's results in game order until it is settled.
+
+        ``settled`` is called after each result has been consumed; once it
+        returns True for a matchup, the matchup's remaining games are
+        dropped: queued chunks are never sent and results still in flight
+        are discarded. Only a few chunks per worker are in flight at a
+        time, and results are taken in the order chunks were sent, so where
+        a matchup stops doesn't depend on the number of workers.
+        """
+        self.simulated = 0
+        queues: Dict[Tuple[int, int], deque] = {}
+        for plan in self._plan(self.tasks(pairs, games_per_pair), games_per_pair):
+            queues.setdefault(plan[0][:2], deque()).append(plan)
+        done = set()
+
+        def next_tasks() -> Iterator[Tuple]:
+            # Round robin over the matchups still being played
+            while queues:
+                for pair in list(queues):
+                    if pair in done or not queues[pair]:
+                        del queues[pair]
+                    else:
+                        yield queues[pair].popleft()
+
+        def settle(task: Tuple[int, int, int, int], data: bytes) -> Iterator[GameResult]:
+            if task[:2] in done:
+                return
+            for result in iter_records(data):
+                yield result
+                if settled(result):
+                    done.add(task[:2])
+                    return
+
+        source = next_tasks()
+        try:
+            if self.workers == 0:
+                _init_worker(*self._init_args(games_per_pair))
+                for task, cached, missing in source:
+                    played = [self._played(_play_chunk(sub), games_per_pair) for sub in missing]
+                    yield from settle(task, self._merge([cached] + played))
+                return
+            with self._pool(games_per_pair) as pool:
+                in_flight = deque()
+                while True:
+                    for task, cached, missing in islice(source, 2 * self.workers - len(in_flight)):
+                        in_flight.append((task, cached, [pool.apply_async(_play_chunk, (sub,)) for sub in missing]))
+                    if not in_flight:
+                        return
+                    task, cached, pending = in_flight.popleft()
+                    played = [self._played(result.get(), games_per_pair) for result in pending]
+                    yield from settle(task, self._merge([cached] + played))
+        finally:
+            self._finish()
+
+    def run(self, pairs: Optional[Iterable[Tuple[int, int]]] = None, games_per_pair: int = 100,
+            sprt: Optional[SPRT] = None) -> TournamentReport:
+        """Play games_per_pair games for each matchup (default: round robin) and tally them.
+
+        With an SPRT, each matchup stops as soon as the test settles which
+        deck is better; games_per_pair caps the matchups that stay close.
+        """
+        if pairs is None:
+            pairs = round_robin(len(self.decks))
+        report = TournamentReport([deck.name for deck in self.decks], self.campaign_seed)
+        start = time.perf_counter()
+        if sprt is None:
+            results = self.iter_results(pairs, games_per_pair)
+        else:
+            results = self.iter_sequential(
+                pairs, games_per_pair, lambda result: report.stats[result.deck1, result.deck2].check(sprt))
+        for result in results:
+            report.record(result)
+        report.elapsed = time.perf_counter() - start
+        return report
@@ -0,0 +1,174 @@
+"""Zobrist hashing of game positions and a bounded transposition table.
+
+A position's hash is the sum (mod 2**64) of one random 64-bit key per
+feature of the position:
+
+    ('card', player, slot, spec)          a Pokemon's card in a board slot
+    ('damage', player, slot, damage)      its damage counters, when non-zero
+    ('energy', player, slot, element, n)  n attached energies of one element
+    ('status', player, slot, status)      its special condition
+    ('hand', player, spec)                one per card in hand (a multiset)
+    ('score', player, points)
+    ('zone', player, element)             the energy zone
+    ('next', player, element)             the next energy
+    ('retreated', player)                 retreated this turn
+    ('parity',)                           odd turn numbers
+
+Keys are added rather than XORed so that two copies of a card in hand
+don't cancel out. Because every feature contributes independently,
+GameState can keep the hash up to date by subtracting the keys of what an
+operation changes and adding the new ones (see GameState.start_hashing),
+instead of rehashing the whole position.
+"""
+from typing import Dict, Hashable, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+
+from .rng import GameRandom
+
+if TYPE_CHECKING:
+    from .active_pokemon import ActivePokemon
+    from .game_state import GameState
+
+MASK64 = (1 << 64) - 1
+# Keys are drawn from this stream in the order features are first seen, so a
+# position's hash is deterministic for a given order of first use and only
+# comparable within one process (not across runs or worker processes)
+_KEY_SEED = 0x5A0B_9157
+
+
+class ZobristKeys:
+    """Random 64-bit keys for position features, drawn the first time a feature is seen."""
+
+    __slots__ = ('_keys', '_rng')
+
+    def __init__(self, seed: int = _KEY_SEED):
+        self._keys: Dict[Hashable, int] = {}
+        self._rng = GameRandom(seed)
+
+    def __getitem__(self, feature: Hashable) -> int:
+        key = self._keys.get(feature)
+        if key is None:
+            key = self._keys[feature] = self._rng.getrandbits(64)
+        return key
+
+
+KEYS = ZobristKeys()
+
+
+def pokemon_key(player: int, slot: int, pokemon: 'ActivePokemon') -> int:
+    """Sum of the keys for one Pokemon in a board slot."""
+    keys = KEYS
+    total = keys['card', player, slot, pokemon.card.spec]
+    if pokemon.damage_counters:
+        total += keys['damage', player, slot, pokemon.damage_counters]
+    for element, count in pokemon.attached_energies.items():
+        if count:
+            total += keys['energy', player, slot, element, count]
+    if pokemon.status is not None:
+        total += keys['status', player, slot, pokemon.status]
+    return total
+
+
+def board_key(state: 'GameState', player: int) -> int:
+    """Sum of the keys for all of a player's Pokemon in play."""
+    return sum(pokemon_key(player, slot, pokemon) for slot, pokemon in state.board_slots(player))
+
+
+def hand_key(state: 'GameState', player: int) -> int:
+    hand = state.players[player].hand if state.players else state.hands[player]
+    return sum(KEYS['hand', player, card.spec] for card in hand)
+
+
+def energy_key(name: str, player: int, element) -> int:
+    """Key of an energy zone ('zone') or next-energy ('next') entry; 0 when empty."""
+    return KEYS[name, player, element] if element is not None else 0
+
+
+def position_hash(state: 'GameState') -> int:
+    """Hash a position from scratch; GameState.zobrist keeps the same value up to date incrementally."""
+    total = KEYS['parity',] if state.turn_number & 1 else 0
+    for player in (0, 1):
+        total += board_key(state, player) + hand_key(state, player)
+        total += KEYS['score', player, state.scores[player]]
+        total += energy_key('zone', player, state.energy_zones[player])
+        total += energy_key('next', player, state.next_energy[player])
+        if state.retreated_this_turn[player]:
+            total += KEYS['retreated', player]
+    return total & MASK64
+
+
+def information_set_hash(state: 'GameState', viewer: int) -> int:
+    """The position as ``viewer`` sees it: the incremental hash with the opponent's hand reduced to its size."""
+    opponent = 1 - viewer
+    hand = state.players[opponent].hand if state.players else state.hands[opponent]
+    return (state.zobrist - hand_key(state, opponent) + KEYS['hand size', opponent, len(hand)]) & MASK64
+
+
+class TTEntry(NamedTuple):
+    key: int
+    depth: int
+    value: float
+    move: Optional[Tuple[int, ...]]
+
+
+class TranspositionTable:
+    """Fixed-size hash table of search results, safe to share between agents.
+
+    Each bucket has two entries: one kept for the deepest result seen (a
+    store only replaces it with an equal or deeper one) and one that is
+    always replaced. That way the expensive results survive while new
+    positions still get in.
+
+    Args:
+        size: Number of entries (rounded up to a power of two, two per bucket)
+    """
+
+    def __init__(self, size: int = 1 << 16):
+        buckets = 1
+        while 2 * buckets < size:
+            buckets <<= 1
+        self._mask = buckets - 1
+        self._entries: List[Optional[TTEntry]] = [None] * (2 * buckets)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self._entries)
+
+    @property
+    def capacity(self) -> int:
+        return len(self._entries)
+
+    def probe(self, key: int) -> Optional[TTEntry]:
+        """The stored entry for a position hash, if it is still in the table."""
+        index = 2 * (key & self._mask)
+        entries = self._entries
+        for entry in (entries[index], entries[index + 1]):
+            if entry is not None and entry.key == key:
+                self.hits += 1
+                return entry
+        self.misses += 1
+        return None
+
+    def store(self, key: int, value: float, depth: int = 0, move: Optional[Tuple[int, ...]] = None) -> None:
+        """Record a result for a position hash; ``depth`` ranks how much search backs it."""
+        index = 2 * (key & self._mask)
+        entries = self._entries
+        entry = TTEntry(key, depth, value, move)
+        self.stores += 1
+        preferred = entries[index]
+        if preferred is None or preferred.key == key or depth >= preferred.depth:
+            if preferred is not None and preferred.key != key:
+                self.overwrites += 1
+                # The displaced result still gets the always-replace slot
+                entries[index + 1] = preferred
+            entries[index] = entry
+            return
+        if entries[index + 1] is not None and entries[index + 1].key != key:
+            self.overwrites += 1
+        entries[index + 1] = entry
+
+    def clear(self) -> None:
+        self._entries = [None] * len(self._entries)
+        self.hits = self.misses = self.stores = self.overwrites = 0
@@ -7,6 +7,7 @@ from src.active_pokemon import ActivePokemon
 from src.trainer import Tool, Item, Supporter
 from src.game import Player
 from src.cards import Card
+from colorama import Fore, Style
 
 class MockCard(Card):
     def __init__(self, data: dict):
@@ -576,6 +577,68 @@ def test_full_game_state():
     mewtwo_energies = game_state.active_pokemon[1].attached_energies
     assert mewtwo_energies[ElementType.PSYCHIC] == 2  # 2 Psychic energy
 
+def _started_game(seed=3):
+    from src.deck_factory import create_real_test_deck
+    from src.game import Game as EngineGame
+    game = EngineGame("Ash", create_real_test_deck(), "Gary", create_real_test_deck(), headless=True, seed=seed)
+    game.setup_game()
+    game._start_turn_phase()
+    return game
+
+def test_refresh_rewrites_only_changed_lines():
+    import io
+    state = _started_game().state
+    out = io.StringIO()
+    board_view = BoardView(stream=out)
+    lines = board_view.frame(state)
+    # First frame clears the screen and draws everything
+    assert board_view.refresh(state) == len(lines)
+    assert out.getvalue().startswith("\x1b[H\x1b[2J")
+    # Nothing changed: only the cursor moves
+    out.seek(0); out.truncate()
+    assert board_view.refresh(state) == 0
+    assert out.getvalue() == f"\x1b[{len(lines) + 1};1H"
+    # Damage changes the active card's HP line only
+    out.seek(0); out.truncate()
+    state.active_pokemon[1].damage_counters += 10
+    assert board_view.refresh(state) == 1
+    assert "\x1b[2J" not in out.getvalue()
+    # render() draws in full, so the next refresh starts over
+    board_view.render(state)
+    out.seek(0); out.truncate()
+    assert board_view.refresh(state) == len(lines)
+
+def test_refresh_blanks_rows_of_a_longer_frame():
+    import io
+    state = _started_game().state
+    out = io.StringIO()
+    board_view = BoardView(stream=out)
+    board_view.refresh(state)
+    before = len(board_view.frame(state))
+    state.turn_number = 0  # Setup phase: no selected card section
+    after = len(board_view.frame(state))
+    assert after < before
+    out.seek(0); out.truncate()
+    board_view.refresh(state)
+    for row in range(after + 1, before + 1):
+        assert f"\x1b[{row};1H\x1b[K" in out.getvalue()
+
+def test_card_boxes_are_cached_per_battle_state():
+    state = _started_game().state
+    board_view = BoardView()
+    pokemon = state.active_pokemon[0]
+    box = board_view._draw_pokemon_card(pokemon)
+    assert board_view._draw_pokemon_card(pokemon) is box
+    pokemon.attach_energy(ElementType.FIRE)
+    assert board_view._draw_pokemon_card(pokemon) != box
+    pokemon.remove_energy(ElementType.FIRE)
+    assert board_view._draw_pokemon_card(pokemon) is box
+
+def test_visible_length_ignores_colors():
+    board_view = BoardView()
+    assert board_view._get_visible_length("\x1b[31mabc\x1b[0m") == 3
+    assert board_view._pad_line(f"{Fore.RED}ab{Style.RESET_ALL}", 5).endswith("   ")
+
 if __name__ == '__main__':
     # Run all visualization tests
     test_board_visualization()
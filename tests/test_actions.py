@@ -0,0 +1,74 @@
+"""Test legal move generation."""
+import random
+import pytest
+from src.actions import (ATTACH_ENERGY, ATTACK, END_TURN, EVOLVE, PLAY_BASIC, PROMOTE, RETREAT,
+                         apply_action, legal_actions)
+from src.deck_factory import create_real_test_deck
+from src.elementTypes import ElementType
+from src.game import Game
+from src.game_state import GameState
+from src.pokemon import Pokemon
+
+def create_pokemon(name, evolution_type='Basic', evolves_from=None, retreat='1'):
+    card_type = f"Pokémon - {evolution_type}" + (f" - Evolves from {evolves_from}" if evolves_from else '')
+    return Pokemon({
+        'name': name, 'hp': '60', 'type': 'Fire', 'card_type': card_type, 'evolution_type': evolution_type,
+        'retreat': retreat, 'attacks': [{'name': 'Ember', 'cost': ['Fire'], 'damage': '30', 'effect': ''}],
+    })
+
+@pytest.fixture
+def state():
+    state = GameState()
+    state.turn_number = 4
+    state.set_active_pokemon(0, create_pokemon("Charmander"))
+    state.add_benched_pokemon(0, create_pokemon("Charmander"))
+    state.set_active_pokemon(1, create_pokemon("Squirtle"))
+    state.hands[0] = [create_pokemon("Charmeleon", 'Stage 1', 'Charmander'), create_pokemon("Vulpix")]
+    return state
+
+def test_legal_actions_cover_every_kind(state):
+    state.energy_zones[0] = ElementType.FIRE
+    state.active_pokemon[0].attach_energy(ElementType.FIRE)
+    actions = legal_actions(state, 0)
+    assert actions == [(EVOLVE, 0, 0), (EVOLVE, 0, 1), (PLAY_BASIC, 1),
+                       (ATTACH_ENERGY, 0), (ATTACH_ENERGY, 1), (RETREAT, 0), (ATTACK, 0), (END_TURN,)]
+
+def test_legal_actions_respect_rules(state):
+    state.active_pokemon[0].turn_played = 4  # Can't evolve the turn it was played
+    state.retreated_this_turn[0] = True
+    assert legal_actions(state, 0) == [(EVOLVE, 0, 1), (PLAY_BASIC, 1), (END_TURN,)]
+
+def test_empty_active_must_promote(state):
+    state.active_pokemon[0] = None
+    assert legal_actions(state, 0) == [(PROMOTE, 0)]
+    assert apply_action(state, (PROMOTE, 0))
+    assert state.benched_pokemon[0] == []
+
+def test_no_pokemon_left_only_ends_the_turn(state):
+    state.active_pokemon[0] = None
+    state.benched_pokemon[0] = []
+    assert legal_actions(state, 0) == [(END_TURN,)]
+    state.energy_types = {0: [ElementType.FIRE], 1: [ElementType.WATER]}
+    assert apply_action(state, (END_TURN,))
+
+def test_every_legal_action_applies():
+    rng = random.Random(5)
+    game = Game("Ash", create_real_test_deck(), "Gary", create_real_test_deck(), headless=True, seed=5)
+    game.state.faint_callback = None
+    game.setup_game()
+    state = game.state
+    state.start_turn()
+    for _ in range(300):
+        if state.check_win_condition() is not None:
+            break
+        action = rng.choice(legal_actions(state, state.current_player_idx))
+        assert apply_action(state, action)
+
+def test_menu_is_built_from_legal_actions():
+    game = Game("Ash", create_real_test_deck(), "Gary", create_real_test_deck(), headless=True, seed=1)
+    game.setup_game()
+    player = game.state.current_player_idx
+    legal = legal_actions(game.state, player)
+    options = {option['group']: option for option in game._get_player_options(player)}
+    assert options['retreat']['enabled'] == any(action[0] == RETREAT for action in legal)
+    assert options['assign_energy']['enabled'] == any(action[0] == ATTACH_ENERGY for action in legal)
@@ -0,0 +1,58 @@
+"""Test active Pokemon battle state."""
+import pytest
+from src.active_pokemon import ActivePokemon
+from src.card_spec import DamageModifier, parse_damage
+from src.elementTypes import ElementType, StatusCondition
+from src.pokemon import Pokemon
+
+def create_pokemon(cost, damage='30'):
+    return ActivePokemon(Pokemon({
+        'name': 'Charmeleon', 'hp': '90', 'type': 'Fire', 'card_type': 'Pokémon - Stage 1 - Evolves from Charmander',
+        'evolution_type': 'Stage 1',
+        'attacks': [{'name': 'Fire Claws', 'cost': cost, 'damage': damage, 'effect': ''}],
+    }), turn_played=1)
+
+def test_attack_cost_is_compiled_to_vector():
+    attack = create_pokemon(['Fire', 'Fire', 'Colorless']).card.attacks[0]
+    assert attack.colored_cost == ((ElementType.FIRE, 2),)
+    assert attack.colorless_cost == 1
+    assert attack.total_cost == 3
+    assert sum(attack.cost_vector) == 2
+
+def test_can_perform_attack_checks_colored_then_colorless():
+    pokemon = create_pokemon(['Fire', 'Colorless', 'Colorless'])
+    attack = pokemon.card.attacks[0]
+    pokemon.attach_energy(ElementType.WATER)
+    pokemon.attach_energy(ElementType.WATER)
+    assert not pokemon.can_perform_attack(attack)
+    pokemon.attach_energy(ElementType.FIRE)
+    assert pokemon.can_perform_attack(attack)
+    pokemon.remove_energy(ElementType.WATER)
+    assert not pokemon.can_perform_attack(attack)
+
+def test_can_perform_attack_respects_status():
+    pokemon = create_pokemon(['Colorless'])
+    pokemon.attach_energy(ElementType.GRASS)
+    pokemon.apply_status(StatusCondition.PARALYSIS, 2)
+    assert not pokemon.can_perform_attack(pokemon.card.attacks[0])
+
+def test_can_perform_attack_accepts_legacy_dicts():
+    pokemon = create_pokemon([])
+    pokemon.attach_energy(ElementType.FIRE)
+    assert pokemon.can_perform_attack({'name': 'Ember', 'cost': ['Fire'], 'damage': '30'})
+    assert not pokemon.can_perform_attack({'name': 'Ember', 'cost': [ElementType.FIRE, 'Fire'], 'damage': '30'})
+
+def test_legacy_dict_with_unknown_energy_names_the_card_and_attack():
+    pokemon = create_pokemon([])
+    with pytest.raises(ValueError, match=r"Charmeleon.*'Ember'.*'Fyre'"):
+        pokemon.can_perform_attack({'name': 'Ember', 'cost': ['Fyre'], 'damage': '30'})
+
+@pytest.mark.parametrize('text, base, modifier', [
+    ('30', 30, DamageModifier.NONE),
+    ('40+', 40, DamageModifier.PLUS),
+    ('50x', 50, DamageModifier.TIMES),
+    ('Arrow', 0, DamageModifier.NONE),
+    (None, 0, DamageModifier.NONE),
+])
+def test_damage_text_is_parsed(text, base, modifier):
+    assert parse_damage(text) == (base, modifier)
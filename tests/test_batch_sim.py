@@ -0,0 +1,44 @@
+"""Test the lockstep batch simulator against the scalar engine."""
+import math
+import pytest
+from src.batch_sim import BatchSimulator, simulate_batched
+from src.deck import Deck
+from src.deck_factory import create_real_test_deck
+from src.elementTypes import ElementType
+from src.pokemon import Pokemon
+from src.simulator import simulate
+
+def create_pokemon(name, target='opponent_active'):
+    return Pokemon({
+        'name': name, 'hp': '60', 'type': 'Fire', 'card_type': 'Pokémon - Basic', 'evolution_type': 'Basic',
+        'attacks': [{'name': 'Ember', 'cost': ['Fire'], 'damage': '30', 'effect': '', 'target': target}],
+    })
+
+def test_same_seed_same_games():
+    deck = create_real_test_deck()
+    first = BatchSimulator(deck, deck, seed=11).run(200)
+    second = BatchSimulator(deck, deck, seed=11).run(200)
+    assert (first.winners == second.winners).all()
+    assert (first.turns == second.turns).all()
+
+def test_matches_scalar_engine():
+    deck = create_real_test_deck()
+    scalar = simulate(deck, deck, 400, seed=1)
+    batched = simulate_batched(deck, deck, 8000, batch_size=3000, seed=1)
+    assert batched.games == 8000
+    # Within four standard errors of the scalar estimate
+    p = scalar.win_rate(0)
+    assert abs(batched.win_rate(0) - p) < 4 * math.sqrt(p * (1 - p) / scalar.games)
+    assert abs(batched.average_turns - scalar.average_turns) < 0.6
+
+def test_turn_cap_and_scores():
+    deck = create_real_test_deck()
+    result = BatchSimulator(deck, deck, max_turns=6, seed=2).run(100)
+    assert ((result.winners == 0) == (result.turns == 7)).all()
+    assert (result.winners == 0).any()
+    assert (result.scores[result.winners == 0] < 3).all()
+
+def test_rejects_random_target_attacks():
+    deck = Deck([create_pokemon(f"Mon {i // 2}", 'random_opponent') for i in range(20)], [ElementType.FIRE])
+    with pytest.raises(ValueError):
+        BatchSimulator(deck, deck)
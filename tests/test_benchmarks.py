@@ -0,0 +1,21 @@
+"""Test the benchmark suite's baselines and regression check."""
+from benchmarks.suite import Result, compare, run, to_json
+
+def test_compare_flags_regressions_in_either_direction():
+    baseline = to_json({'games': Result(100.0, "games/s"), 'db_warm_load': Result(50.0, "ms", False),
+                        'render': Result(10.0, "frames/s")})
+    results = {'games': Result(85.0, "games/s"), 'db_warm_load': Result(60.0, "ms", False),
+               'render': Result(9.5, "frames/s"), 'new': Result(1.0, "ops/s")}
+    assert compare(results, baseline, 0.1) == ['games', 'db_warm_load']
+    assert compare(results, baseline, 0.25) == []
+
+def test_suite_runs():
+    results = run(['legal_actions', 'apply_undo'], repeat=1, scale=1)
+    assert set(results) == {'legal_actions', 'apply_undo'}
+    assert all(result.value > 0 for result in results.values())
+
+def test_replay_cost_is_relative_to_unlogged_games():
+    results = run(['replay_games', 'replay_cost'], repeat=1, scale=1)
+    assert results['replay_games'].unit == "games/s" and results['replay_games'].value > 0
+    assert results['replay_cost'].unit == "%" and not results['replay_cost'].higher_is_better
+    assert results['replay_cost'].value > 0
@@ -0,0 +1,80 @@
+"""Test the indexed card registry."""
+import pytest
+from src.card_registry import CardRegistry, Q
+from src.elementTypes import ElementType
+
+CARDS = [
+    {'id': '1', 'name': 'Charmander', 'type': 'Fire', 'card_type': 'Pokémon - Basic',
+     'evolution_type': 'Basic', 'set_details': 'Genetic Apex  (A1)'},
+    {'id': '2', 'name': 'Charmeleon', 'type': 'Fire', 'card_type': 'Pokémon - Stage 1 - Evolves from Charmander',
+     'evolution_type': 'Stage 1', 'set_details': 'Genetic Apex  (A1)'},
+    {'id': '3', 'name': 'Squirtle', 'type': 'Water', 'card_type': 'Pokémon - Basic',
+     'evolution_type': 'Basic', 'set_details': 'Genetic Apex  (A1)'},
+    {'id': '1', 'name': 'Charmander', 'type': 'Fire', 'card_type': 'Pokémon - Basic',
+     'evolution_type': 'Basic', 'set_details': 'Promo-A'},
+    {'id': '4', 'name': 'Potion', 'type': 'Unknown Type', 'card_type': 'Trainer - Item',
+     'evolution_type': 'Item', 'set_details': 'Genetic Apex  (A1)'},
+]
+
+@pytest.fixture
+def registry():
+    return CardRegistry(CARDS)
+
+def test_name_lookup_is_case_insensitive(registry):
+    assert registry.get_pokemon_by_name('CHARMANDER') is CARDS[0]
+    assert registry.get_pokemon_by_name('Potion') is None
+
+def test_card_id_lookup(registry):
+    assert registry.by_card_id('1') == [CARDS[0], CARDS[3]]
+    assert registry.by_card_id('1', set_name='Promo-A') == [CARDS[3]]
+    assert registry.by_card_id('1', set_name='a1') == [CARDS[0]]
+
+def test_evolves_from_index(registry):
+    assert registry.evolutions_of('Charmander') == [CARDS[1]]
+
+def test_composed_queries(registry):
+    fire_basics = Q(type=ElementType.FIRE) & Q(evolution_type='Basic')
+    assert registry.query_uids(fire_basics) == [0, 3]
+    assert registry.query_uids(Q(name='Squirtle') | Q(evolves_from='charmander')) == [1, 2]
+    assert registry.query_uids(kind='pokemon', type=['Water', 'Fire'], limit=2) == [0, 1]
+
+def test_predicates_only_see_indexed_candidates(registry):
+    seen = []
+    def predicate(card):
+        seen.append(card['name'])
+        return card['set_details'] == 'Promo-A'
+    assert registry.query_uids(Q(kind='pokemon', name='charmander').where(predicate)) == [3]
+    assert seen == ['Charmander', 'Charmander']
+
+def test_unknown_field_raises(registry):
+    with pytest.raises(KeyError):
+        registry.query(Q(color='red'))
+
+def test_full_card_list_indexes():
+    registry = CardRegistry.from_json()
+    charmeleon = registry.get_pokemon_by_name('charmeleon')
+    assert charmeleon['name'] == 'Charmeleon'
+    assert charmeleon in registry.evolutions_of('Charmander')
+
+def test_registry_snapshot_skips_json_on_warm_load(tmp_path, monkeypatch):
+    import json
+    from src import card_registry
+    source = tmp_path / 'cards.json'
+    source.write_text(json.dumps(CARDS), encoding='utf-8')
+    cold = card_registry.load_registry(str(source), cache_dir=str(tmp_path / 'cache'))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("warm load parsed the JSON")
+    monkeypatch.setattr(card_registry.json, 'load', fail)
+    warm = card_registry.load_registry(str(source), cache_dir=str(tmp_path / 'cache'))
+    assert warm.cards == cold.cards
+    assert warm.query_uids(kind='pokemon', evolution_type='Basic') == [0, 2, 3]
+
+def test_registry_snapshot_rebuilds_when_json_changes(tmp_path):
+    import json
+    from src import card_registry
+    source = tmp_path / 'cards.json'
+    source.write_text(json.dumps(CARDS), encoding='utf-8')
+    card_registry.load_registry(str(source), cache_dir=str(tmp_path))
+    source.write_text(json.dumps(CARDS[:2]), encoding='utf-8')
+    assert len(card_registry.load_registry(str(source), cache_dir=str(tmp_path))) == 2
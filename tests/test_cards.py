@@ -3,6 +3,7 @@ import pytest
 from src.cards import Card
 from src.pokemon import Pokemon
 from src.game_state import GameState
+from src.elementTypes import ElementType
 
 def test_pokemon_creation():
     card_data = {
@@ -37,3 +38,34 @@ def test_pokemon_damage():
     
     pokemon.damage_counters = 60
     assert pokemon.is_knocked_out()
+
+def test_card_spec_is_compiled_once_and_shared():
+    from src.card_registry import get_registry
+    from src.deck import card_from_spec
+    registry = get_registry()
+    uid = registry.query_uids(kind='pokemon', name='Charmeleon', limit=1)[0]
+    first, second = card_from_spec(registry.spec(uid)), card_from_spec(registry.spec(uid))
+    assert first is not second
+    assert first.spec is second.spec
+    assert first.attacks is second.attacks
+    assert first.evolves_from == 'charmander'
+    assert first.element_type == ElementType.FIRE
+    assert registry.spec(uid).weakness_type == ElementType.WATER
+
+def test_card_spec_is_immutable():
+    import pickle
+    spec = Pokemon({'name': 'Pikachu', 'card_type': 'Pokémon - Basic Lightning', 'hp': '60'}).spec
+    with pytest.raises(AttributeError):
+        spec.hp = 999
+    assert pickle.loads(pickle.dumps(spec)).hp == 60
+
+def test_attack_spec_keeps_dict_interface():
+    pokemon = Pokemon({
+        'name': 'Pikachu', 'type': 'Lightning', 'card_type': 'Pokémon - Basic',
+        'attacks': [{'name': 'Gnaw', 'cost': ['Lightning', 'Colorless'], 'damage': '20', 'effect': ''}],
+    })
+    attack = pokemon.attacks[0]
+    assert attack['name'] == 'Gnaw'
+    assert attack.get('cost', []) == (ElementType.LIGHTNING, ElementType.COLORLESS)
+    assert attack['target'] == 'opponent_active'
+    assert attack.get('missing', 'default') == 'default'
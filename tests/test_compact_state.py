@@ -0,0 +1,46 @@
+"""Test the compact array-backed game state."""
+import pytest
+from src.compact_state import CompactState
+from src.deck_factory import create_real_test_deck
+from src.elementTypes import ElementType, StatusCondition
+from src.game import Game
+
+@pytest.fixture
+def game():
+    game = Game("Ash", create_real_test_deck(), "Gary", create_real_test_deck(), headless=True, seed=7)
+    game.setup_game()
+    state = game.state
+    state.active_pokemon[0].attach_energy(ElementType.FIRE)
+    state.active_pokemon[0].damage_counters = 20
+    state.active_pokemon[1].apply_status(StatusCondition.POISON, 1)
+    state.scores[1] = 1
+    return game
+
+def test_views_mirror_game_state(game):
+    state = game.state
+    compact = CompactState.from_game_state(state)
+    assert compact.player_active.name == state.player_active.name
+    assert compact.player_active.current_hp == state.player_active.current_hp
+    assert compact.player_active.attached_energies == state.player_active.attached_energies
+    assert compact.opponent_active.status is StatusCondition.POISON
+    assert [p.name for p in compact.opponent_bench] == [p.name for p in state.opponent_bench]
+    assert [spec.name for spec in compact.player_hand] == [card.name for card in state.player_hand]
+    assert compact.opponent_score == 1
+
+def test_clone_is_independent(game):
+    compact = CompactState.from_game_state(game.state)
+    clone = compact.clone()
+    clone.damage[0] += 30
+    clone.hands[0].pop()
+    assert compact.player_active.damage_counters == 20
+    assert len(compact.player_hand) == len(clone.player_hand) + 1
+    assert clone.catalog is compact.catalog
+
+def test_round_trip_to_game_state(game):
+    compact = CompactState.from_game_state(game.state)
+    rebuilt = compact.to_game_state()
+    again = CompactState.from_game_state(rebuilt, compact.catalog)
+    for field in ('card', 'hp', 'damage', 'status', 'energy', 'scores', 'energy_zone', 'next_energy'):
+        assert getattr(again, field) == getattr(compact, field)
+    assert again.hands == compact.hands and again.decks == compact.decks
+    assert rebuilt.rng.random() == game.state.rng.random()
@@ -0,0 +1,50 @@
+"""Test the precomputed damage / hits-to-KO matrix."""
+import numpy as np
+import pytest
+from src.card_registry import get_registry
+from src.card_spec import compile_card
+from src.damage_matrix import NEVER, DamageMatrix, get_damage_matrix, load_damage_matrix
+from src.game_state import GameState
+from src.pokemon import Pokemon
+
+def pokemon(name, element, weakness, hp=60, damage='30', cost=('Fire', 'Fire')):
+    return compile_card({'name': name, 'hp': str(hp), 'type': element, 'weakness': weakness,
+                         'card_type': 'Pokémon - Basic', 'evolution_type': 'Basic',
+                         'attacks': [{'name': 'Hit', 'cost': list(cost), 'damage': damage, 'effect': ''}]})
+
+def test_damage_hits_and_energy_turns():
+    fire = pokemon("Fire", 'Fire', 'Water')
+    grass = pokemon("Grass", 'Grass', 'Fire', hp=70)
+    wall = pokemon("Wall", 'Water', 'Grass', damage='0', cost=())
+    matrix = DamageMatrix([fire, grass, wall])
+    assert matrix.damage[0, 0, 1] == 50 and matrix.damage[1, 0, 0] == 30
+    assert matrix.hits_to_ko[0, 0, 1] == 2 and matrix.hits_to_ko[1, 0, 0] == 2
+    assert matrix.energy_turns_to_ko[0, 0, 1] == 3
+    assert matrix.hits_to_ko[2, 0, 1] == NEVER and matrix.hits_to_ko[2, 0, 0] == 3  # Weakness alone deals 20
+    # The extra last row is "no card"
+    assert matrix.damage[-1, 0, 0] == 0 and matrix.hits_to_ko[0, 0, -1] == NEVER
+    assert matrix.matchup([0, 1], [0, 1, 2]).tolist() == [[2, 2, 2], [2, 3, 2]]
+
+def test_matches_engine_damage():
+    registry = get_registry()
+    matrix = get_damage_matrix()
+    attacker = registry.spec(registry.query_uids(name='Charmander')[0])
+    for name in ('Bulbasaur', 'Squirtle', 'Charmander'):
+        defender = registry.spec(registry.query_uids(name=name)[0])
+        state = GameState()
+        state.set_active_pokemon(0, Pokemon(attacker))
+        state.set_active_pokemon(1, Pokemon(defender))
+        state.current_player_idx = 0
+        [(_, damage)] = state.execute_attack(state.active_pokemon[0], attacker.attacks[0], turn=2)
+        assert matrix.effective_damage(attacker, 0, defender) == damage
+    assert matrix.best_attack(attacker, defender)[1] == matrix.hits(attacker, 0, defender)
+    with pytest.raises(KeyError):
+        matrix.row(pokemon("Loose", 'Fire', 'Water'))
+
+def test_cache_round_trip(tmp_path):
+    built = load_damage_matrix(cache_dir=str(tmp_path))
+    assert list(tmp_path.iterdir())
+    cached = load_damage_matrix(cache_dir=str(tmp_path))
+    assert len(cached) == len(get_registry())
+    for name in DamageMatrix.ARRAYS:
+        assert np.array_equal(getattr(built, name), getattr(cached, name))
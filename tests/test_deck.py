@@ -61,3 +61,24 @@ def test_no_energy_types():
     ]
     with pytest.raises(ValueError, match="Deck must declare at least 1 energy type"):
         Deck(cards, [])
+
+def test_fingerprint_follows_card_stats():
+    from src.card_spec import compile_card
+    from src.deck import deck_fingerprint
+    from src.elementTypes import ElementType
+
+    def spec(**changes):
+        data = {'name': 'Charmander', 'hp': '60', 'type': 'Fire', 'card_type': 'Pokémon - Basic',
+                'evolution_type': 'Basic', 'weakness': 'Water', 'retreat': '1',
+                'attacks': [{'name': 'Ember', 'cost': ['Fire'], 'damage': '30', 'effect': ''}]}
+        data.update(changes)
+        return compile_card(data, uid=7)
+
+    energy = [ElementType.FIRE]
+    base = deck_fingerprint([spec()], energy)
+    assert deck_fingerprint([spec()], energy) == base
+    assert deck_fingerprint([spec(hp='70')], energy) != base
+    assert deck_fingerprint([spec(retreat='2')], energy) != base
+    for attack in ({'cost': ['Fire', 'Colorless']}, {'damage': '40'}):
+        changed = [{'name': 'Ember', 'cost': ['Fire'], 'damage': '30', 'effect': '', **attack}]
+        assert deck_fingerprint([spec(attacks=changed)], energy) != base
@@ -0,0 +1,76 @@
+"""Test the genetic deck optimizer's operators, cache and search loop."""
+from collections import Counter
+import pytest
+from src.card_registry import Q, get_registry
+from src.deck_factory import create_real_test_deck
+from src.deck_optimizer import DECK_SIZE, DeckOptimizer, energy_types_for
+from src.tournament import DeckEntry
+
+@pytest.fixture(scope="module")
+def optimizer():
+    gauntlet = [DeckEntry.from_deck("test", create_real_test_deck())]
+    return DeckOptimizer(gauntlet, population=4, elite=1, games_per_matchup=4, workers=0, seed=7)
+
+def assert_legal(optimizer, deck):
+    assert len(deck) == DECK_SIZE and list(deck) == sorted(deck)
+    names = Counter(optimizer.specs[uid].name.lower() for uid in deck)
+    assert max(names.values()) <= 2
+    assert any(optimizer.specs[uid].evolution_type == 'Basic' for uid in deck)
+    for uid in deck:
+        spec = optimizer.specs[uid]
+        assert spec.evolution_type == 'Basic' or spec.evolves_from in names
+    assert optimizer.entry(deck, "check").build().energy_types
+
+def test_operators_keep_decks_legal(optimizer):
+    for _ in range(50):
+        first, second = optimizer.random_deck(), optimizer.random_deck()
+        assert_legal(optimizer, first)
+        assert_legal(optimizer, optimizer.mutate(first))
+        assert_legal(optimizer, optimizer.crossover(first, second))
+
+def test_crossover_of_a_deck_with_itself_is_the_deck(optimizer):
+    deck = optimizer.random_deck()
+    assert optimizer.crossover(deck, deck) == deck
+
+def test_repair_drops_orphaned_evolutions(optimizer):
+    uids = [spec.uid for spec in create_real_test_deck().specs]
+    without_charmander = [uid for uid in uids if optimizer.specs[uid].name != 'Charmander']
+    repaired = optimizer.repair(without_charmander)
+    assert_legal(optimizer, repaired)
+    # Bulbasaur's line is legal and already complete, so it survives as is
+    assert Counter(optimizer.specs[uid].name for uid in repaired)['Venusaur'] == 2
+
+def test_energy_types_follow_attack_costs():
+    deck = create_real_test_deck()
+    assert set(energy_types_for(deck.specs)) <= {spec.element_type for spec in deck.specs}
+
+def test_fitness_is_cached(optimizer):
+    deck = optimizer.random_deck()
+    (fitness,), simulated = optimizer.evaluate([deck])
+    assert simulated == 1 and 0 <= fitness <= 1
+    assert optimizer.evaluate([deck, deck]) == ([fitness, fitness], 0)
+
+def test_run_reports_best(optimizer):
+    report = optimizer.run(generations=2)
+    assert len(report.history) == 2
+    assert report.fitness == max(stats.best for stats in report.history)
+    assert report.history[1].cache_hits >= 1  # the elite deck isn't simulated again
+    assert len(report.best_deck()) == DECK_SIZE
+
+def unplayable_pool():
+    """5 Basics nothing evolves from, plus 10 Stage 1 cards whose Basic isn't in the pool."""
+    registry = get_registry()
+    specs = [registry.spec(uid) for uid in registry.query_uids(Q(kind='pokemon'))]
+    parents = {spec.evolves_from for spec in specs if spec.evolves_from}
+    basics = list({spec.name.lower(): spec.uid for spec in specs
+                   if spec.evolution_type == 'Basic' and spec.name.lower() not in parents}.values())[:5]
+    # Nothing evolves from those Basics, so no Stage 1 card has its Basic in the pool
+    orphans = list({spec.name.lower(): spec.uid for spec in specs if spec.evolution_type == 'Stage 1'}.values())[:10]
+    return basics + orphans
+
+def test_pool_too_small_to_play_is_rejected():
+    gauntlet = [DeckEntry.from_deck("test", create_real_test_deck())]
+    pool = unplayable_pool()
+    assert len({get_registry().spec(uid).name.lower() for uid in pool}) == 15
+    with pytest.raises(ValueError, match="too small"):
+        DeckOptimizer(gauntlet, pool=pool, seed=1, workers=0)
@@ -0,0 +1,64 @@
+"""Test exact draw probabilities."""
+from math import comb
+import pytest
+from src.deck_factory import create_real_test_deck
+from src.draw_odds import DrawOdds, hypergeometric
+from src.game import Game
+
+@pytest.fixture(scope="module")
+def deck():
+    return create_real_test_deck()
+
+def spec(deck, name):
+    return next(s for s in deck.specs if s.name == name)
+
+def test_hypergeometric():
+    assert hypergeometric(20, 2, 5, 0) == pytest.approx(comb(18, 5) / comb(20, 5))
+    assert sum(hypergeometric(20, 4, 7, k) for k in range(5)) == pytest.approx(1.0)
+    assert hypergeometric(20, 2, 5, 3) == 0.0
+
+def test_opening_hand_is_conditioned_on_a_basic(deck):
+    charmander, charizard = spec(deck, "Charmander"), spec(deck, "Charizard")
+    odds = DrawOdds([charmander] + [charizard] * 19)
+    assert odds.opening_hand("Charmander") == 1.0
+    assert odds.opening_hand(charizard, at_least=5) == 0.0
+    assert odds.mulligan_rate() == pytest.approx(0.75)
+    # Without the guarantee it is a plain hypergeometric
+    assert odds.without([]).probability("Charmander", draws=5) == pytest.approx(0.25)
+
+def test_by_turn(deck):
+    odds = DrawOdds.for_deck(deck)
+    none_first = comb(18, 7) / comb(20, 7)
+    # Charizard is not Basic, but the guarantee still shifts its odds slightly
+    assert 1 - odds.by_turn("Charizard", 3, first=True) == pytest.approx(none_first, abs=0.01)
+    assert odds.by_turn("Charizard", 3, first=False) == odds.probability("Charizard", draws=3)
+    assert odds.by_turn("Charizard", 16) == 1.0
+    dist = odds.distribution("Charmeleon", draws=4)
+    assert len(dist) == 3 and sum(dist) == pytest.approx(1.0)
+    both = odds.probability_all({"Charmander": 1, "Charmeleon": 1}, draws=2)
+    assert both < min(odds.probability("Charmander", draws=2), odds.probability("Charmeleon", draws=2))
+    assert odds.probability(("Charmander", "Charmeleon"), 4, draws=15) == 1.0
+
+def test_matches_initial_draw(deck):
+    odds = DrawOdds.for_deck(deck)
+    games, hits = 3000, {"Charmander": 0, "Charizard": 0}
+    for seed in range(games):
+        game = Game("A", deck.copy(), "B", deck.copy(), headless=True, seed=seed)
+        game._perform_initial_draw()
+        player = game.state.players[0]
+        seen = {card.name for card in player.hand + player.deck[-2:]}
+        for name in hits:
+            hits[name] += name in seen
+    for name, count in hits.items():
+        assert count / games == pytest.approx(odds.by_turn(name, 3), abs=0.03)
+
+def test_mid_game_odds(deck):
+    game = Game("A", deck.copy(), "B", deck.copy(), headless=True, seed=3)
+    game.setup_game()
+    player = game.state.players[0]
+    known = player.hand + [slot.card for _, slot in game.state.board_slots(0)]
+    odds = DrawOdds.for_deck(deck).without(known)
+    current = DrawOdds.for_player(game.state, 0)
+    assert odds.counts == current.counts and odds.size == len(player.deck)
+    left = sum(card.name == "Charizard" for card in player.deck)
+    assert current.probability("Charizard", draws=1) == pytest.approx(left / len(player.deck))
@@ -0,0 +1,78 @@
+"""Test the game engine running headless with agents."""
+import pytest
+from src.agents import GreedyAgent, RandomAgent
+from src.deck import Deck
+from src.elementTypes import ElementType
+from src.game import Game
+from src.game_state import GameState
+from src.pokemon import Pokemon
+from src.simulator import simulate
+
+def create_pokemon(name, hp=60, damage='30', cost=('Fire',)):
+    return Pokemon({
+        'name': name, 'hp': str(hp), 'type': 'Fire', 'card_type': 'Pokémon - Basic',
+        'evolution_type': 'Basic',
+        'attacks': [{'name': 'Ember', 'cost': list(cost), 'damage': damage, 'effect': ''}],
+    })
+
+def create_deck():
+    return Deck([create_pokemon(f"Mon {i // 2}") for i in range(20)], [ElementType.FIRE])
+
+def test_headless_game_is_silent(capsys):
+    game = Game("Ash", create_deck(), "Gary", create_deck(), headless=True)
+    winner = game.run()
+    assert winner in (0, 1, 2)
+    assert capsys.readouterr().out == ""
+
+def test_headless_game_reaches_a_winner():
+    game = Game("Ash", create_deck(), "Gary", create_deck(), headless=True,
+                agents=[GreedyAgent(), RandomAgent()])
+    winner = game.run()
+    assert winner in (1, 2)
+    assert game.state.scores[winner - 1] >= 3 or not game.state.active_pokemon[2 - winner]
+
+def test_turn_cap_ends_in_draw():
+    deck = Deck([create_pokemon(f"Mon {i // 2}", damage='0') for i in range(20)], [ElementType.FIRE])
+    game = Game("Ash", deck, "Gary", create_deck().copy(), headless=True, max_turns=10)
+    assert game.run() in (0, 2)
+    assert game.state.turn_number <= 11
+
+def test_knockout_scores_for_attacker():
+    state = GameState()
+    state.set_active_pokemon(0, create_pokemon("Attacker"))
+    state.set_active_pokemon(1, create_pokemon("Defender", hp=30))
+    state.current_player_idx = 0
+    attacker = state.active_pokemon[0]
+    state.execute_attack(attacker, attacker.card.attacks[0], turn=2)
+    assert state.scores == {0: 1, 1: 0}
+    assert state.active_pokemon[1] is None
+
+def test_add_energy_empties_zone():
+    state = GameState()
+    state.set_active_pokemon(0, create_pokemon("Mon"))
+    state.energy_zones[0] = ElementType.FIRE
+    state.next_energy[0] = ElementType.FIRE
+    assert state.add_energy(state.active_pokemon[0])
+    assert state.energy_zones[0] is None
+    assert not state.add_energy(state.active_pokemon[0])
+
+def test_simulate_reports_throughput():
+    report = simulate(create_deck(), create_deck(), games=5)
+    assert report.games == 5
+    assert sum(report.wins) + report.draws == 5
+    assert report.games_per_sec > 0
+
+def play_seeded(seed):
+    game = Game("Ash", create_deck(), "Gary", create_deck(), headless=True,
+                agents=[RandomAgent(), RandomAgent()], seed=seed)
+    winner = game.run()
+    return winner, game.state.turn_number, game.first_player_idx, tuple(game.state.scores.values())
+
+def test_seeded_games_replay_exactly():
+    assert play_seeded(1234) == play_seeded(1234)
+    assert len({play_seeded(seed) for seed in range(20)}) > 1
+
+def test_derived_seeds_are_distinct():
+    from src.rng import derive_seed
+    seeds = {derive_seed(campaign, index) for campaign in range(3) for index in range(100)}
+    assert len(seeds) == 300
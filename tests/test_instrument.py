@@ -0,0 +1,47 @@
+"""Test the opt-in engine instrumentation."""
+import pytest
+from src import instrument
+from src.deck_factory import create_real_test_deck
+from src.game import Game
+from src.game_state import GameState
+from src.simulator import simulate
+from src.tournament import DeckEntry, TournamentRunner
+
+@pytest.fixture(scope="module")
+def deck():
+    return create_real_test_deck()
+
+def test_disabled_leaves_engine_untouched(deck):
+    run, attack = Game.run, GameState.execute_attack
+    counters = instrument.enable()
+    assert Game.run is not run and instrument.enabled()
+    simulate(deck, deck, 3, seed=1)
+    assert instrument.disable() is counters
+    assert Game.run is run and GameState.execute_attack is attack
+    assert not instrument.enabled() and instrument.current() is None
+
+def test_counts_phases_and_actions(deck, tmp_path):
+    counters = instrument.enable(allocations=False)
+    try:
+        report = simulate(deck, deck, 4, seed=2)
+    finally:
+        instrument.disable()
+    totals = counters.totals
+    assert totals['game'][0] == totals['setup'][0] == 4
+    assert totals['start_turn'][0] == report.total_turns
+    assert totals['action:attack'][0] == totals['attack'][0]
+    assert totals['game'][1] >= totals['main_phase'][1] > 0
+    assert all(entry[2] == 0 for entry in totals.values())
+    path = str(tmp_path / "counters.json")
+    counters.save(path)
+    assert instrument.Counters.load(path).totals == totals
+    assert "main_phase" in counters.summary()
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_runner_merges_worker_counters(deck, tmp_path, workers):
+    entries = [DeckEntry.from_deck("A", deck), DeckEntry.from_deck("B", deck)]
+    runner = TournamentRunner(entries, workers=workers, chunk_size=3, campaign_seed=5, instrument_dir=str(tmp_path))
+    report = runner.run(games_per_pair=8)
+    counters = instrument.Counters.load_dir(str(tmp_path))
+    assert counters.totals['game'][0] == report.games == 8
+    assert not instrument.enabled()
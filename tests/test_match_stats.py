@@ -0,0 +1,61 @@
+"""Test streaming matchup statistics and SPRT early stopping."""
+import pytest
+from src.deck_factory import create_real_test_deck
+from src.match_stats import SPRT, MatchupStats, beta_cdf, credible_interval, wilson_interval
+from src.tournament import DeckEntry, TournamentRunner
+
+def test_wilson_interval():
+    low, high = wilson_interval(60, 100)
+    assert low == pytest.approx(0.5020, abs=1e-4) and high == pytest.approx(0.6906, abs=1e-4)
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    assert wilson_interval(10, 10)[1] == 1.0
+
+def test_beta_posterior():
+    assert beta_cdf(0.3, 1, 1) == pytest.approx(0.3)
+    assert beta_cdf(0.3, 2, 1) == pytest.approx(0.09)
+    assert beta_cdf(0.5, 40, 40) == pytest.approx(0.5)
+    low, high = credible_interval(60, 40)
+    assert low == pytest.approx(0.5017, abs=1e-3) and high == pytest.approx(0.6907, abs=1e-3)
+
+def test_sprt_decisions():
+    sprt = SPRT(margin=0.1)
+    assert sprt.decide(5, 5) is None
+    assert sprt.decide(40, 10) == 1
+    assert sprt.decide(10, 40) == -1
+    assert sprt.decide(500, 500) == 0
+    with pytest.raises(ValueError):
+        SPRT(margin=0.5)
+
+def test_matchup_stats_record():
+    stats = MatchupStats()
+    stats.record(1, 0, 10, (3, 1))
+    stats.record(2, 0, 14, (0, 3))
+    stats.record(1, 1, 12, (3, 2))
+    stats.record(0, 1, 200, (1, 1))
+    assert (stats.games, stats.draws, stats.wins) == (4, 1, [2, 1])
+    assert stats.win_rate == pytest.approx(2 / 3)
+    assert stats.first_player_win_rate() == pytest.approx(1 / 3)
+    assert stats.average_turns_to_win(0) == 11 and stats.average_turns_to_win(1) == 14
+    assert stats.knockouts == [7, 7]
+    assert stats.probability_deck1_better() > 0.5
+    assert not stats.check(SPRT(margin=0.2))
+
+@pytest.fixture(scope="module")
+def decks():
+    deck = create_real_test_deck()
+    return [DeckEntry.from_deck("A", deck), DeckEntry.from_deck("B", deck)]
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_sprt_stops_matchup_early(decks, workers):
+    runner = TournamentRunner(decks, workers=workers, chunk_size=7, campaign_seed=11)
+    report = runner.run(games_per_pair=1000, sprt=SPRT(margin=0.3))
+    stats = report.stats[0, 1]
+    assert stats.decision is not None
+    assert report.games == stats.games == stats.settled_after < 1000
+    assert sum(report.matchups[0, 1]) == stats.games
+
+def test_sprt_stop_does_not_depend_on_sharding(decks):
+    reports = [TournamentRunner(decks, workers=workers, chunk_size=chunk, campaign_seed=3)
+               .run(games_per_pair=1000, sprt=SPRT(margin=0.3)) for workers, chunk in ((0, 50), (2, 3))]
+    assert reports[0].stats[0, 1].wins == reports[1].stats[0, 1].wins
+    assert reports[0].games == reports[1].games
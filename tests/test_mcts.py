@@ -0,0 +1,66 @@
+"""Test the MCTS agent."""
+import random
+import pytest
+from src.actions import legal_actions
+from src.agents import GreedyAgent
+from src.compact_state import CompactState
+from src.deck_factory import create_real_test_deck
+from src.game import Game
+from src.mcts import MCTSAgent
+
+def started_game(seed):
+    game = Game("Ash", create_real_test_deck(), "Gary", create_real_test_deck(), headless=True,
+                agents=[GreedyAgent(), GreedyAgent()], seed=seed)
+    game.setup_game()
+    game.state.start_turn()
+    return game
+
+def snapshot(state):
+    compact = CompactState.from_game_state(state)
+    return {field: getattr(compact, field) for field in CompactState.__slots__[1:]}
+
+def test_needs_a_budget():
+    with pytest.raises(ValueError):
+        MCTSAgent(time_budget=None, node_budget=None)
+
+@pytest.mark.parametrize("seed", range(3))
+def test_search_leaves_state_untouched(seed):
+    state = started_game(seed).state
+    player = state.current_player_idx
+    actions = legal_actions(state, player)
+    before = snapshot(state)
+    agent = MCTSAgent(time_budget=None, node_budget=50, rng=random.Random(seed))
+    action = agent.choose_action(state, player, actions)
+    assert action in actions
+    assert snapshot(state) == before
+    assert not state.recording
+
+def test_node_budget_and_stats():
+    state = started_game(7).state
+    player = state.current_player_idx
+    agent = MCTSAgent(time_budget=None, node_budget=40, rng=random.Random(7))
+    root = agent.search(state, player, legal_actions(state, player))
+    assert agent.stats.iterations == 40
+    assert root.visits == 40
+    assert 0 < agent.stats.nodes <= 40
+    assert agent.stats.nodes_per_sec > 0
+
+def test_plays_a_full_game():
+    agents = [MCTSAgent(time_budget=None, node_budget=20, rng=random.Random(1)), GreedyAgent()]
+    game = Game("Ash", create_real_test_deck(), "Gary", create_real_test_deck(), headless=True,
+                agents=agents, seed=3)
+    assert game.run() in (0, 1, 2)
+
+def test_shared_transposition_table():
+    from src.zobrist import TranspositionTable
+    table = TranspositionTable(1 << 12)
+    state = started_game(5).state
+    player = state.current_player_idx
+    actions = legal_actions(state, player)
+    before = snapshot(state)
+    for seed in (1, 2):
+        agent = MCTSAgent(time_budget=None, node_budget=60, rng=random.Random(seed), transposition_table=table)
+        agent.search(state, player, actions)
+    assert table.stores > 0 and table.hits > 0
+    assert snapshot(state) == before
+    assert not state.hashing
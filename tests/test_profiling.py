@@ -0,0 +1,66 @@
+"""Test batch profiling: collapsed stacks, merging and the hot-function report."""
+import os
+import pstats
+import subprocess
+import sys
+from collections import Counter
+import pytest
+from src import profiling
+from src.deck_factory import create_real_test_deck
+from src.simulator import simulate
+from src.tournament import DeckEntry, TournamentRunner
+
+@pytest.fixture(scope="module")
+def deck():
+    return create_real_test_deck()
+
+def test_collapsed_round_trip_and_report(tmp_path):
+    stacks = Counter({"main;src/game.py:Game.run;src/actions.py:legal_actions": 3,
+                      "main;src/game.py:Game.run": 1, "main;other.py:f": 2})
+    path = str(tmp_path / "stacks-1.folded")
+    profiling.write_collapsed(stacks, path)
+    assert profiling.read_collapsed(path) == stacks
+    rows = profiling.hot_functions(stacks)
+    assert rows == [("src/actions.py:legal_actions", 3, 3), ("src/game.py:Game.run", 1, 4)]
+    assert "legal_actions" in profiling.report(stacks)
+
+@pytest.mark.skipif(not profiling.SAMPLING, reason="needs SIGPROF")
+def test_sampling_sees_the_engine(deck):
+    profiler = profiling.Profiler()
+    profiler.start()
+    try:
+        simulate(deck, deck, 150, seed=1)
+    finally:
+        profiler.stop()
+    assert sum(profiler.stacks.values()) > 0
+    assert any("src/game.py:Game.run" in stack for stack in profiler.stacks)
+
+def test_runner_merges_worker_profiles(deck, tmp_path):
+    entries = [DeckEntry.from_deck("A", deck), DeckEntry.from_deck("B", deck)]
+    TournamentRunner(entries, workers=2, chunk_size=5, campaign_seed=2, profile_dir=str(tmp_path),
+                     profile_calls=True).run(games_per_pair=20)
+    text = profiling.write_outputs(str(tmp_path))
+    _, stats = profiling.load_dir(str(tmp_path))
+    assert sum(1 for name in os.listdir(tmp_path) if name.startswith('profile-')) >= 1
+    calls = sum(entry[1] for (filename, _, name), entry in stats.stats.items() if name == 'run'
+                and filename.endswith(os.path.join('src', 'game.py')))
+    assert calls == 20
+    assert "cProfile" in text and (tmp_path / "stacks.folded").exists()
+
+def test_profiling_twice_into_one_directory_starts_over(tmp_path):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, os.path.join(root, 'simulate.py'), '--games', '20', '--seed', '3',
+               '--profile', str(tmp_path), '--profile-calls']
+    runs = []
+    for _ in range(2):
+        subprocess.run(command, cwd=root, check=True, capture_output=True, env={**os.environ, 'PYTHONPATH': root})
+        stats = pstats.Stats(str(tmp_path / 'profile.pstats'))
+        runs.append((sum(profiling.read_collapsed(str(tmp_path / 'stacks.folded')).values()),
+                     sum(entry[1] for (filename, _, name), entry in stats.stats.items()
+                         if name == 'run' and filename.endswith(os.path.join('src', 'game.py')))))
+        # Only the merged outputs are left behind
+        assert sorted(os.listdir(tmp_path)) == ['hot.txt', 'profile.pstats', 'stacks.folded']
+    # Exact call counts: the second run's report holds its own 20 games, not 40
+    assert [calls for _, calls in runs] == [20, 20]
+    first, second = (samples for samples, _ in runs)
+    assert second < 1.5 * first + 50
@@ -0,0 +1,147 @@
+"""Test replay event logging and the binary replay writer."""
+import os
+import pytest
+from src import events
+from src.deck_factory import create_real_test_deck
+from src.agents import RandomAgent
+from src.replay import (MAGIC, RECORD_HEADER, ReplayReader, ReplayWriter, decode_varints, encode_varints,
+                        resimulate)
+from src.simulator import play_game, simulate
+from src.tournament import DeckEntry, TournamentRunner
+
+@pytest.fixture(scope="module")
+def deck():
+    return create_real_test_deck()
+
+def read_records(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert data.startswith(MAGIC)
+    pos, records = len(MAGIC), []
+    while pos < len(data):
+        header = RECORD_HEADER.unpack_from(data, pos)
+        pos += RECORD_HEADER.size
+        records.append((header, decode_varints(data, pos, pos + header[0])))
+        pos += header[0]
+    return records
+
+def event_kinds(values):
+    # Skip the two deck lists, then walk the event stream by arity
+    pos = 0
+    for _ in range(2):
+        pos += 1 + values[pos]
+        pos += 1 + values[pos]
+    kinds = []
+    while pos < len(values):
+        kinds.append(values[pos])
+        pos += 1 + events.ARITY[values[pos]]
+    assert pos == len(values)
+    return kinds
+
+def test_varints_round_trip():
+    values = [0, 1, 127, 128, 300, 2 ** 32, 2 ** 64 - 1, 5]
+    encoded = encode_varints(values)
+    assert decode_varints(encoded) == values
+    assert len(encode_varints([5, 127])) == 2
+
+def test_game_records_events(deck, tmp_path):
+    with ReplayWriter(str(tmp_path / "games.bin")) as writer:
+        game = play_game(deck, deck, replay=writer)
+    assert game.state.event_log is None
+    [(header, values)] = read_records(writer.path)
+    _, version, winner, first, turns, seed, fp1, fp2 = header
+    assert (winner, first, turns) == (game.winner, game.first_player_idx, game.state.turn_number)
+    assert fp1 == fp2 == deck.fingerprint
+    assert values[0] == len(deck) and values[1:21] == [card.spec.uid + 1 for card in deck.cards]
+    kinds = event_kinds(values)
+    assert kinds.count(events.SETUP_HAND) == 2 and kinds.index(events.SETUP_HAND) < kinds.index(events.TURN)
+    assert kinds.count(events.FIRST_PLAYER) == 1
+    assert events.TURN in kinds and events.ATTACK in kinds
+    if winner:
+        assert events.KNOCKOUT in kinds
+
+def test_writer_appends(deck, tmp_path):
+    path = str(tmp_path / "games.bin")
+    for seed in (1, 2):
+        with ReplayWriter(path, buffer_size=1) as writer:
+            simulate(deck, deck, 3, seed=seed, replay=writer)
+        assert writer.games == 3
+    records = read_records(path)
+    assert len(records) == 6
+    assert len({header[5] for header, _ in records}) == 6
+
+def test_same_seed_same_record(deck, tmp_path):
+    for name in ("a", "b"):
+        with ReplayWriter.for_shard(str(tmp_path), name) as writer:
+            simulate(deck, deck, 2, seed=9, replay=writer)
+    with open(tmp_path / "replays-a.bin", 'rb') as a, open(tmp_path / "replays-b.bin", 'rb') as b:
+        assert a.read() == b.read()
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_tournament_writes_shards(deck, tmp_path, workers):
+    entries = [DeckEntry.from_deck("A", deck), DeckEntry.from_deck("B", deck)]
+    TournamentRunner(entries, workers=workers, chunk_size=3, replay_dir=str(tmp_path)).run(games_per_pair=7)
+    shards = [str(tmp_path / name) for name in os.listdir(tmp_path)]
+    assert sum(len(read_records(path)) for path in shards) == 7
+
+@pytest.fixture(scope="module")
+def shard(deck, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("replays") / "replays-0.bin")
+    with ReplayWriter(path) as writer:
+        simulate(deck, deck, 30, seed=4, replay=writer)
+    return path
+
+def test_reader_matches_raw_records(shard):
+    raw = read_records(shard)
+    with ReplayReader(os.path.dirname(shard)) as reader:
+        records = list(reader)
+        assert [record.winner for record in records] == [header[2] for header, _ in raw]
+        assert records[0].decks[0][0] == raw[0][1][1:21]
+        assert sum(len(event) for event in records[0].events()) == len(records[0].event_values)
+
+def test_reader_filters(deck, shard):
+    with ReplayReader(shard) as reader:
+        records = list(reader)
+        assert len(list(reader.records(winner=1))) == sum(record.winner == 1 for record in records)
+        short = list(reader.records(turns=(0, 10)))
+        assert short and all(record.turns <= 10 for record in short)
+        assert len(list(reader.records(deck=deck))) == len(records)
+        assert not list(reader.records(deck=deck.fingerprint + 1))
+        assert len(list(reader.records(card=deck.cards[0]))) == len(records)
+        assert not list(reader.records(card=deck.cards[0].spec.uid + 10000))
+
+def test_reader_ignores_partial_record(shard, tmp_path):
+    with open(shard, 'rb') as f:
+        data = f.read()
+    truncated = tmp_path / "replays-cut.bin"
+    truncated.write_bytes(data[:-3])
+    with ReplayReader(str(truncated)) as reader:
+        assert len(list(reader)) == len(read_records(shard)) - 1
+
+def test_resimulate_reproduces_games(shard):
+    with ReplayReader(shard) as reader:
+        for record in reader:
+            game = resimulate(record)
+            assert game.winner == record.winner
+            assert game.state.turn_number == record.turns
+
+def test_resimulate_stops_at_event(shard):
+    with ReplayReader(shard) as reader:
+        record = next(iter(reader))
+        game = resimulate(record, until=25)
+        assert game.winner is None
+        logged = game.state.event_log
+        assert len(logged) < len(record.event_values)
+        assert logged == record.event_values[:len(logged)]
+
+def test_resimulate_detects_divergence(deck, tmp_path):
+    path = str(tmp_path / "random.bin")
+    with ReplayWriter(path) as writer:
+        # RandomAgent draws from the game's RNG, so following the record alone can't reproduce it
+        simulate(deck, deck, 3, seed=5, replay=writer, agent_factory=lambda: [RandomAgent(), RandomAgent()])
+    with ReplayReader(path) as reader:
+        for record in reader:
+            resimulate(record, agents=[RandomAgent(), RandomAgent()])
+        with pytest.raises(ValueError):
+            for record in reader:
+                resimulate(record)
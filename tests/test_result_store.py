@@ -0,0 +1,77 @@
+"""Test the SQLite result store and the runner's reuse of stored games."""
+import pytest
+from src.deck_factory import create_real_test_deck
+from src.result_store import ResultStore, agent_config, engine_fingerprint
+from src.agents import GreedyAgent, RandomAgent
+from src.tournament import DeckEntry, TournamentRunner
+
+@pytest.fixture(scope="module")
+def decks():
+    deck = create_real_test_deck()
+    uids = tuple(spec.uid for spec in deck.specs)
+    # Different energy types make different decks
+    return [DeckEntry.from_deck("A", deck), DeckEntry("B", uids, ("GRASS",)), DeckEntry("C", uids, ("FIRE",))]
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / "results.db")
+    with ResultStore(path, batch_size=2) as store:
+        store.add("agents", 2 ** 64 - 1, 5, 2 ** 63, 0, (1, 0, 12, 3, 1))
+        store.add_many("agents", 2 ** 64 - 1, 5, 2 ** 63, [(1, (2, 1, 14, 2, 3)), (7, (0, 0, 200, 1, 1))])
+        assert store.fetch("agents", 2 ** 64 - 1, 5, 2 ** 63, range(0, 2)) == {0: (1, 0, 12, 3, 1), 1: (2, 1, 14, 2, 3)}
+        assert store.fetch("other agents", 2 ** 64 - 1, 5, 2 ** 63, range(10)) == {}
+    with ResultStore(path) as store:
+        assert len(store) == 3
+        assert store.invalidated == 0
+
+def test_engine_change_invalidates(tmp_path):
+    path = str(tmp_path / "results.db")
+    with ResultStore(path, engine="old rules") as store:
+        store.add("agents", 1, 2, 3, 0, (1, 0, 10, 3, 0))
+    with ResultStore(path) as store:
+        assert store.engine == engine_fingerprint() != "old rules"
+        assert store.invalidated == 1 and len(store) == 0
+
+def test_engine_fingerprint_covers_card_data(tmp_path, monkeypatch):
+    from src import result_store
+    original = engine_fingerprint()
+    cards = tmp_path / "CardList.json"
+    with open(result_store.CARDLIST_PATH, 'rb') as f:
+        cards.write_bytes(f.read())
+    monkeypatch.setattr(result_store, 'CARDLIST_PATH', str(cards))
+    engine_fingerprint.cache_clear()
+    try:
+        assert engine_fingerprint() == original
+        cards.write_bytes(cards.read_bytes().replace(b'"60"', b'"70"', 1))
+        engine_fingerprint.cache_clear()
+        assert engine_fingerprint() != original
+    finally:
+        engine_fingerprint.cache_clear()
+
+def test_agent_config_names_classes():
+    assert agent_config((GreedyAgent, RandomAgent), 50) == "src.agents.GreedyAgent,src.agents.RandomAgent;max_turns=50"
+
+def test_runner_reuses_stored_games(decks, tmp_path):
+    path = str(tmp_path / "results.db")
+    plain = TournamentRunner(decks, workers=0, chunk_size=4, campaign_seed=5).run([(0, 1)], games_per_pair=10)
+    with ResultStore(path) as store:
+        runner = TournamentRunner(decks, workers=0, chunk_size=4, campaign_seed=5, store=store)
+        first = runner.run([(0, 1)], games_per_pair=10)
+        assert runner.simulated == 10
+        again = runner.run([(0, 1)], games_per_pair=10)
+        assert runner.simulated == 0
+        assert first.matchups == again.matchups == plain.matchups
+        # A longer run only plays the new seeds; a new matchup doesn't disturb the old one's
+        longer = runner.run([(0, 2), (0, 1)], games_per_pair=13)
+        assert runner.simulated == 13 + 3
+        assert len(store) == 26
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_stored_games_match_fresh_games(decks, tmp_path, workers):
+    with ResultStore(str(tmp_path / "results.db")) as store:
+        runner = TournamentRunner(decks, workers=workers, chunk_size=3, campaign_seed=8, store=store)
+        partial = sorted(runner.iter_results([(1, 0)], games_per_pair=5))
+        full = sorted(runner.iter_results([(1, 0)], games_per_pair=11))
+        assert runner.simulated == 6
+    fresh = sorted(TournamentRunner(decks, workers=0, campaign_seed=8).iter_results([(1, 0)], games_per_pair=11))
+    assert full == fresh
+    assert [result[3:] for result in partial] == [result[3:] for result in fresh[:5]]
@@ -0,0 +1,81 @@
+"""Test live spectating of AI games."""
+import io
+from src.board_view import BoardView
+from src.deck_factory import create_real_test_deck
+from src.game import Game
+from src.pokemon import ElementType
+from src.simulator import simulate
+from src.spectator import Spectator, snapshot
+
+def started_game(seed=3):
+    game = Game("Ash", create_real_test_deck(), "Gary", create_real_test_deck(), headless=True, seed=seed)
+    game.setup_game()
+    game._start_turn_phase()
+    return game
+
+def quiet_spectator(**kwargs):
+    return Spectator(view=BoardView(stream=io.StringIO()), keys=False, **kwargs)
+
+def test_snapshot_is_unaffected_by_later_moves():
+    state = started_game().state
+    view = BoardView()
+    copy = snapshot(state)
+    before = view.frame(state)
+    assert view.frame(copy) == before
+    state.active_pokemon[0].attach_energy(ElementType.FIRE)
+    state.active_pokemon[1].damage_counters += 20
+    state.hands[0].pop()
+    state.players[0].deck.pop()
+    state.scores[1] += 1
+    assert view.frame(state) != before
+    assert view.frame(copy) == before
+
+def test_engine_only_copies_when_a_frame_wants_it():
+    state = started_game().state
+    spectator = quiet_spectator()
+    spectator.publish(state)
+    first = spectator._latest
+    assert first is not None
+    spectator.publish(state)
+    assert spectator._latest is first and spectator.steps == 2
+    assert spectator.draw()
+    assert not spectator.draw()  # Nothing new was published
+    spectator.publish(state)
+    assert spectator._latest is not first
+    # The final position is always copied
+    last = spectator._latest
+    spectator.publish(state, final=True)
+    assert spectator._latest is not last
+
+def test_pause_freezes_the_display_but_not_the_game():
+    state = started_game().state
+    spectator = quiet_spectator()
+    spectator.publish(state)
+    spectator.draw()
+    drawn = spectator._drawn
+    spectator.press('p')
+    assert spectator.draw()  # Status line shows PAUSED
+    assert "PAUSED" in spectator.view.stream.getvalue()
+    spectator.publish(state)
+    assert not spectator.draw() and spectator._drawn is drawn
+    spectator.press('p')
+    assert spectator.draw() and spectator._drawn is not drawn
+    spectator.press('q')
+    spectator.publish(state)
+    assert not spectator.draw()
+
+def test_fast_forward_skips_the_pace():
+    state = started_game().state
+    spectator = quiet_spectator(pace=60.0)
+    spectator.press('f')
+    spectator.publish(state)  # Would sleep a minute otherwise
+    assert spectator.steps == 1
+
+def test_spectated_games_play_out_the_same():
+    deck = create_real_test_deck()
+    plain = simulate(deck, deck, 5, seed=11)
+    with quiet_spectator(fps=1000) as spectator:
+        watched = simulate(deck, deck, 5, seed=11, spectator=spectator)
+    assert (watched.wins, watched.draws, watched.total_turns) == (plain.wins, plain.draws, plain.total_turns)
+    assert spectator.frames >= 1 and spectator.steps > 5
+    assert "Game 5/5" in spectator.view.stream.getvalue()
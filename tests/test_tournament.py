@@ -0,0 +1,45 @@
+"""Test the multiprocess tournament runner."""
+import pytest
+from src.deck_factory import create_real_test_deck
+from src.tournament import (RESULT_RECORD, DeckEntry, GameResult, TournamentRunner, iter_records,
+                            round_robin)
+
+@pytest.fixture(scope="module")
+def decks():
+    deck = create_real_test_deck()
+    return [DeckEntry.from_deck("A", deck), DeckEntry.from_deck("B", deck)]
+
+def test_deck_entry_round_trips(decks):
+    deck = decks[0].build()
+    assert tuple(spec.uid for spec in deck.specs) == decks[0].card_uids
+    assert len(deck) == 20
+
+def test_tasks_cover_every_game_once(decks):
+    runner = TournamentRunner(decks, workers=0, chunk_size=4)
+    tasks = runner.tasks([(0, 1), (1, 0)], games_per_pair=10)
+    assert [count for *_, count in tasks] == [4, 4, 2, 4, 4, 2]
+    indices = [i for _, _, start, count in tasks for i in range(start, start + count)]
+    assert indices == list(range(20))
+
+def test_result_records_round_trip():
+    result = GameResult(7, 1, 2, 2, 1, 33)
+    assert list(iter_records(RESULT_RECORD.pack(*result) * 2)) == [result, result]
+
+def test_round_robin():
+    assert round_robin(3) == [(0, 1), (0, 2), (1, 2)]
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_run_tallies_every_game(decks, workers):
+    runner = TournamentRunner(decks, workers=workers, chunk_size=3, worker_game_budget=6)
+    report = runner.run(games_per_pair=8)
+    assert report.games == 8
+    assert sum(report.matchups[(0, 1)]) == 8
+
+def test_results_do_not_depend_on_sharding(decks):
+    results = []
+    for chunk_size in (1, 5):
+        runner = TournamentRunner(decks, workers=0, chunk_size=chunk_size, campaign_seed=99)
+        results.append(sorted(runner.iter_results([(0, 1)], games_per_pair=10)))
+    assert results[0] == results[1]
+    subset = TournamentRunner(decks, workers=0, campaign_seed=99).tasks([(0, 1)], 10)
+    assert subset[0] == (0, 1, 0, 10)
@@ -0,0 +1,57 @@
+"""Test reversible GameState operations."""
+import random
+import pytest
+from src.actions import apply_action, legal_actions
+from src.agents import RandomAgent
+from src.compact_state import CompactState
+from src.deck_factory import create_real_test_deck
+from src.game import Game
+
+FIELDS = CompactState.__slots__[1:]
+
+class FirstPromotionAgent(RandomAgent):
+    # Promotions happen inside engine operations, so they must not depend on the agent's own RNG
+    def choose_promotion(self, state, player_idx, bench_indices):
+        return bench_indices[0]
+
+def snapshot(state, catalog):
+    compact = CompactState.from_game_state(state, catalog)
+    return {field: getattr(compact, field) for field in FIELDS}
+
+@pytest.mark.parametrize("seed", range(5))
+def test_undo_restores_every_step(seed):
+    # Agents get their own RNGs so the game RNG only moves inside engine operations
+    agents = [FirstPromotionAgent(random.Random(seed)), FirstPromotionAgent(random.Random(-seed))]
+    game = Game("Ash", create_real_test_deck(), "Gary", create_real_test_deck(), headless=True,
+                agents=agents, seed=seed)
+    game.setup_game()
+    state = game.state
+    catalog = CompactState.from_game_state(state).catalog
+    state.start_turn()
+    state.start_recording()
+    history = []
+    for _ in range(200):
+        if state.check_win_condition() is not None:
+            break
+        player = state.current_player_idx
+        action = game.agents[player].choose_action(state, player, legal_actions(state, player))
+        before = snapshot(state, catalog)
+        assert apply_action(state, action)
+        history.append(before)
+        # Every step can be rolled back and replayed
+        after = snapshot(state, catalog)
+        state.undo()
+        assert snapshot(state, catalog) == before
+        apply_action(state, action)
+        assert snapshot(state, catalog) == after
+    # Unwind the whole game
+    while history:
+        state.undo()
+        assert snapshot(state, catalog) == history.pop()
+    assert state.undo_depth == 0
+
+def test_undo_without_history_raises():
+    game = Game("Ash", create_real_test_deck(), "Gary", create_real_test_deck(), headless=True, seed=1)
+    game.state.start_recording()
+    with pytest.raises(IndexError):
+        game.state.undo()
@@ -0,0 +1,78 @@
+"""Test incremental position hashing and the transposition table."""
+import random
+import pytest
+from src.actions import ATTACH_ENERGY, ATTACK, PLAY_BASIC, apply_action, legal_actions, to_move
+from src.agents import RandomAgent
+from src.deck_factory import create_real_test_deck
+from src.game import Game
+from src.zobrist import TranspositionTable, position_hash
+
+class FirstPromotionAgent(RandomAgent):
+    def choose_promotion(self, state, player_idx, bench_indices):
+        return bench_indices[0]
+
+def started_game(seed):
+    agents = [FirstPromotionAgent(random.Random(seed)), FirstPromotionAgent(random.Random(-seed))]
+    game = Game("Ash", create_real_test_deck(), "Gary", create_real_test_deck(), headless=True,
+                agents=agents, seed=seed)
+    game.setup_game()
+    game.state.start_turn()
+    return game
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_hash_matches_full_rehash(seed):
+    game = started_game(seed)
+    state = game.state
+    state.start_hashing()
+    state.start_recording()
+    hashes = [state.zobrist]
+    for _ in range(300):
+        if state.check_win_condition() is not None:
+            break
+        player = to_move(state)
+        action = game.agents[player].choose_action(state, player, legal_actions(state, player))
+        apply_action(state, action)
+        hashes.append(state.zobrist)
+        if action[0] == ATTACK and state.check_win_condition() is None:
+            state.pass_turn()
+            hashes.append(state.zobrist)
+        assert state.zobrist == position_hash(state)
+    while state.undo_depth:
+        state.undo()
+        hashes.pop()
+        assert state.zobrist == hashes[-1] == position_hash(state)
+
+def test_transposed_move_orders_hash_equal():
+    game = started_game(3)
+    state = game.state
+    for _ in range(2):
+        state.pass_turn()  # Reach a turn with energy in the zone
+    player = state.current_player_idx
+    plays = [action for action in legal_actions(state, player) if action[0] == PLAY_BASIC]
+    if not plays:
+        pytest.skip("no Basic in hand for this seed")
+    state.start_hashing()
+    state.start_recording()
+    apply_action(state, (ATTACH_ENERGY, 0))  # Attach to the Active first...
+    apply_action(state, plays[0])
+    attach_first = state.zobrist
+    state.undo()
+    state.undo()
+    apply_action(state, plays[0])  # ...or play the Basic first
+    apply_action(state, (ATTACH_ENERGY, 0))
+    assert state.zobrist == attach_first
+    state.pass_turn()
+    assert state.zobrist != attach_first
+
+def test_table_replacement_keeps_deepest_entry():
+    table = TranspositionTable(size=2)  # One bucket
+    table.store(1, 0.5, depth=10)
+    table.store(2, 0.1, depth=1)
+    table.store(3, 0.2, depth=2)
+    assert table.probe(1).value == 0.5  # Deep entry survives
+    assert table.probe(2) is None  # Always-replace slot was overwritten
+    assert table.probe(3).depth == 2
+    table.store(4, 0.9, depth=20)
+    assert table.probe(4).value == 0.9
+    assert table.probe(1).value == 0.5  # Displaced into the second slot
+    assert table.hits == 4 and table.misses == 1